@@ -0,0 +1,574 @@
+"""Generator of synthetic Rekordbox XML collections and playlist configs.
+
+The collections are deterministic for a seed: the same options always write
+the same XML. Tracks have genre tags and MyTags drawn from vocabularies whose
+tags are used with Zipf-like frequencies, so that a few tags are on many
+tracks and most tags are on few, along with beat grids of a configurable
+density, hot cues, and transition annotations in their comments. Playlists
+are a tree of folders of a configurable depth and fanout whose leaves are
+playlists of randomly chosen tracks.
+
+The playlist config for a collection has a "tags" section of folders of the
+genre tags of each style, including a "Pure" playlist for each style, and of
+MyTags, including folders that the playlist filters apply to, and a "combiner"
+section of expressions mixing tags, wildcards, and numerical, date, string,
+and playlist selectors.
+
+The XML is written as it's generated, so collections of hundreds of
+thousands of tracks don't need to fit in memory.
+
+Usage:
+    python benchmarks/collection_generator.py PATH [--tracks N] [--seed N]
+        [--genres N] [--tags N] [--beat-grid N] [--hot-cues N] [--depth N]
+        [--fanout N] [--playlist-tracks N] [--combiner N]
+        [--music-dir PATH] [--playlist-config PATH]
+"""
+
+import argparse
+import random
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, TextIO
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+import yaml
+
+from djtools.collection.rekordbox_track import LOCATION_PREFIX
+
+# Styles of the genre tags, which are also the folders of the "tags" section.
+STYLES = (
+    "House",
+    "Techno",
+    "Dubstep",
+    "Trap",
+    "Hip Hop",
+    "Drum & Bass",
+    "Breaks",
+    "Garage",
+    "Trance",
+    "Electro",
+    "Disco",
+    "R&B",
+    "Jungle",
+    "Ambient",
+    "Footwork",
+    "Grime",
+)
+
+# Prefixes combined with the styles to make the rest of the genre tags.
+PREFIXES = (
+    "Deep",
+    "Tech",
+    "Hard",
+    "Melodic",
+    "Minimal",
+    "Progressive",
+    "Acid",
+    "Bass",
+    "Future",
+    "Dark",
+    "Liquid",
+)
+
+# MyTags, which are followed by numbered tags if more are needed.
+MY_TAGS = (
+    "Dark",
+    "Vocal",
+    "Chill",
+    "Peak",
+    "Warmup",
+    "Groovy",
+    "Happy",
+    "Sad",
+    "Weird",
+    "Scratch",
+    "Piano",
+    "Instrumental",
+    "Uplifting",
+    "Hypnotic",
+    "Bouncy",
+    "Funky",
+)
+
+# Values of the Tonality attribute.
+KEYS = tuple(f"{number}{mode}" for number in range(1, 13) for mode in "AB")
+
+# Values of the Rating attribute for zero to five stars.
+RATINGS = ("0", "51", "102", "153", "204", "255")
+
+# Entities of the characters escaped in attribute values besides "&", "<",
+# and ">".
+ENTITIES = {'"': "&quot;"}
+
+# Range of the dates that tracks were added.
+FIRST_DATE = date(2015, 1, 1)
+LAST_DATE = date(2025, 12, 31)
+
+
+class Vocabulary(NamedTuple):
+    "Words of an attribute of tracks and their cumulative weights."
+
+    words: List[str]
+    weights: List[float]
+
+
+class CollectionSpec(NamedTuple):
+    "Options of a generated collection."
+
+    tracks: int = 1_000
+    seed: int = 0
+    genres: int = 40
+    tags: int = 30
+    beat_grid: int = 2
+    hot_cues: int = 2
+    depth: int = 3
+    fanout: int = 4
+    playlist_tracks: int = 50
+    combiner: int = 20
+    music_dir: Path = Path("/Users/me/Music/DJ")
+
+
+def _choose(
+    rng: random.Random, vocabulary: Vocabulary, count: int
+) -> List[str]:
+    """Chooses distinct words of a vocabulary by their weights.
+
+    Args:
+        rng: Random number generator.
+        vocabulary: Words and their cumulative weights.
+        count: Number of words to choose.
+
+    Returns:
+        Distinct words in the order they were chosen.
+    """
+    total = vocabulary.weights[-1]
+    chosen: List[str] = []
+    while len(chosen) < min(count, len(vocabulary.words)):
+        word = vocabulary.words[
+            bisect_left(vocabulary.weights, rng.random() * total)
+        ]
+        if word not in chosen:
+            chosen.append(word)
+
+    return chosen
+
+
+def _get_vocabulary(words: List[str]) -> Vocabulary:
+    """Weights the words of a vocabulary by a Zipf-like distribution.
+
+    Args:
+        words: Words in order of their frequency.
+
+    Returns:
+        The words and their cumulative weights.
+    """
+    return Vocabulary(
+        words, list(accumulate(1 / (rank + 1) for rank in range(len(words))))
+    )
+
+
+def _write_playlists(
+    _file: TextIO,
+    rng: random.Random,
+    spec: CollectionSpec,
+    name: str,
+    depth: int,
+    indent: str,
+) -> Dict[str, List[int]]:
+    """Writes the folders and playlists of a level of the playlist tree.
+
+    Args:
+        _file: File to write to.
+        rng: Random number generator.
+        spec: Options of the collection.
+        name: Suffix of the names of the folders and playlists in this level.
+        depth: Number of levels of folders below this one.
+        indent: Indentation of the nodes of this level.
+
+    Returns:
+        Dict of the names of the playlists written to the IDs of their
+            tracks.
+    """
+    playlists = {}
+    for number in range(1, spec.fanout + 1):
+        if depth:
+            folder = f"{name}.{number}" if name else str(number)
+            _file.write(
+                f'{indent}<NODE Type="0" Name="Folder {folder}" '
+                f'Count="{spec.fanout}">\n'
+            )
+            playlists.update(
+                _write_playlists(
+                    _file, rng, spec, folder, depth - 1, indent + "  "
+                )
+            )
+            _file.write(f"{indent}</NODE>\n")
+            continue
+
+        playlist = (
+            f"Playlist {name}.{number}" if name else f"Playlist {number}"
+        )
+        track_ids = rng.sample(
+            range(1, spec.tracks + 1),
+            min(rng.randint(1, 2 * spec.playlist_tracks), spec.tracks),
+        )
+        _file.write(
+            f'{indent}<NODE Name="{playlist}" Type="1" KeyType="0" '
+            f'Entries="{len(track_ids)}">\n'
+        )
+        for track_id in track_ids:
+            _file.write(f'{indent}  <TRACK Key="{track_id}"/>\n')
+        _file.write(f"{indent}</NODE>\n")
+        playlists[playlist] = track_ids
+
+    return playlists
+
+
+def _write_track(
+    _file: TextIO,
+    rng: random.Random,
+    spec: CollectionSpec,
+    track_id: int,
+    vocabularies: Dict[str, Vocabulary],
+):
+    """Writes a TRACK element of the collection.
+
+    Args:
+        _file: File to write to.
+        rng: Random number generator.
+        spec: Options of the collection.
+        track_id: ID of the track.
+        vocabularies: Vocabularies of artists, genre tags, labels, and
+            MyTags.
+    """
+    bpm = rng.uniform(70, 180)
+    comments = " / ".join(
+        _choose(rng, vocabularies["tags"], rng.randint(0, 5))
+    )
+    comments = f"/* {comments} */" if comments else ""
+    if rng.random() < 0.05:
+        comments += f" [{rng.choice(STYLES)}/{rng.choice(STYLES)}]"
+    elif rng.random() < 0.05:
+        comments += f" [{round(bpm)}/{round(bpm) + rng.randint(-10, 10)}]"
+    attributes = {
+        "TrackID": str(track_id),
+        "Name": f"Track {track_id}",
+        "Artist": _choose(rng, vocabularies["artists"], 1)[0],
+        "Composer": "",
+        "Album": "",
+        "Grouping": "",
+        "Genre": " / ".join(
+            _choose(rng, vocabularies["genres"], rng.choice((1, 1, 2, 2, 3)))
+        ),
+        "Kind": "MP3 File",
+        "Size": str(rng.randint(5_000_000, 25_000_000)),
+        "TotalTime": str(rng.randint(120, 600)),
+        "DiscNumber": "0",
+        "TrackNumber": str(rng.randint(0, 20)),
+        "Year": str(rng.randint(1990, LAST_DATE.year)),
+        "AverageBpm": f"{bpm:.2f}",
+        "DateAdded": (
+            FIRST_DATE
+            + timedelta(days=rng.randint(0, (LAST_DATE - FIRST_DATE).days))
+        ).isoformat(),
+        "BitRate": rng.choice(("256", "320")),
+        "SampleRate": "44100",
+        "Comments": comments,
+        "PlayCount": str(rng.randint(0, 50)),
+        "Rating": rng.choice(RATINGS),
+        "Location": get_location(spec.music_dir, track_id),
+        "Remixer": "",
+        "Tonality": rng.choice(KEYS),
+        "Label": _choose(rng, vocabularies["labels"], 1)[0],
+        "Mix": "",
+    }
+    beat_grid = rng.randint(0, 2 * spec.beat_grid)
+    hot_cues = rng.randint(0, 2 * spec.hot_cues)
+    _file.write(
+        "    <TRACK "
+        + " ".join(
+            f'{key}="{escape(value, ENTITIES)}"'
+            for key, value in attributes.items()
+        )
+        + (">\n" if beat_grid or hot_cues else "/>\n")
+    )
+    for beat in range(beat_grid):
+        _file.write(
+            f'      <TEMPO Inizio="{beat * 10.5:.3f}" Bpm="{bpm:.2f}" '
+            f'Metro="4/4" Battito="{beat % 4 + 1}"/>\n'
+        )
+    for cue in range(hot_cues):
+        _file.write(
+            f'      <POSITION_MARK Name="" Type="0" '
+            f'Start="{rng.uniform(0, 120):.3f}" Num="{cue}"/>\n'
+        )
+    if beat_grid or hot_cues:
+        _file.write("    </TRACK>\n")
+
+
+def add_spec_arguments(
+    parser: argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    """Adds the options of a generated collection, other than its number of
+    tracks and the directory of its files, to a parser.
+
+    Args:
+        parser: Parser of command line arguments.
+
+    Returns:
+        The parser.
+    """
+    defaults = CollectionSpec()
+    for field, help_text in (
+        ("seed", "Seed of the random number generator."),
+        ("genres", "Number of genre tags."),
+        ("tags", "Number of MyTags."),
+        ("beat_grid", "Average number of beat grid points per track."),
+        ("hot_cues", "Average number of hot cues per track."),
+        ("depth", "Number of levels of folders in the playlist tree."),
+        ("fanout", "Number of folders or playlists in each folder."),
+        ("playlist_tracks", "Average number of tracks in each playlist."),
+        ("combiner", "Number of combiner playlists in the playlist config."),
+    ):
+        parser.add_argument(
+            f"--{field.replace('_', '-')}",
+            type=int,
+            default=getattr(defaults, field),
+            help=help_text,
+        )
+
+    return parser
+
+
+def generate_collection(
+    path: Path, spec: CollectionSpec
+) -> Dict[str, List[int]]:
+    """Writes a synthetic Rekordbox XML collection.
+
+    Args:
+        path: Path to write the collection to.
+        spec: Options of the collection.
+
+    Returns:
+        Dict of the names of the playlists in the collection to the IDs of
+            their tracks.
+    """
+    rng = random.Random(spec.seed)
+    vocabularies = {
+        "artists": _get_vocabulary(
+            [f"Artist {number}" for number in range(1, spec.tracks // 10 + 2)]
+        ),
+        "genres": _get_vocabulary(get_genres(spec.genres)),
+        "labels": _get_vocabulary(
+            [f"Label {number}" for number in range(1, spec.tracks // 50 + 2)]
+        ),
+        "tags": _get_vocabulary(get_my_tags(spec.tags)),
+    }
+    with open(path, mode="w", encoding="utf-8") as _file:
+        _file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n\n'
+            '<DJ_PLAYLISTS Version="1.0.0">\n'
+            '  <PRODUCT Name="rekordbox" Version="6.7.4" '
+            'Company="AlphaTheta"/>\n'
+            f'  <COLLECTION Entries="{spec.tracks}">\n'
+        )
+        for track_id in range(1, spec.tracks + 1):
+            _write_track(_file, rng, spec, track_id, vocabularies)
+        _file.write(
+            "  </COLLECTION>\n"
+            "  <PLAYLISTS>\n"
+            f'    <NODE Type="0" Name="ROOT" Count="{spec.fanout}">\n'
+        )
+        playlists = _write_playlists(
+            _file, rng, spec, "", spec.depth, "      "
+        )
+        _file.write("    </NODE>\n  </PLAYLISTS>\n</DJ_PLAYLISTS>\n")
+
+    return playlists
+
+
+def generate_playlist_config(
+    spec: CollectionSpec, playlists: List[str]
+) -> Dict[str, Any]:
+    """Generates a playlist config for a synthetic collection.
+
+    Args:
+        spec: Options of the collection.
+        playlists: Names of the playlists in the collection.
+
+    Returns:
+        Playlist config with "tags" and "combiner" sections.
+    """
+    rng = random.Random(spec.seed)
+    genres = get_genres(spec.genres)
+    my_tags = get_my_tags(spec.tags)
+    folders: List[Any] = []
+    for style in STYLES:
+        style_genres = [genre for genre in genres if style in genre]
+        if style in ("House", "Techno") and "Minimal Deep Tech" in genres:
+            style_genres.append("Minimal Deep Tech")
+        if style_genres:
+            folders.append(
+                {
+                    "name": style,
+                    "enable_aggregation": True,
+                    "playlists": style_genres + [f"Pure {style}"],
+                }
+            )
+    folders.extend(
+        [
+            {
+                "name": "Transitions",
+                "playlists": [
+                    {"tag_content": my_tags[0], "name": "Genre Transitions"},
+                    {"tag_content": my_tags[1], "name": "Tempo Transitions"},
+                ],
+            },
+            {"name": "Complex Tracks", "playlists": list(my_tags[2:4])},
+            # The least frequent MyTag is left for the "Unused Tags"
+            # playlists.
+            {"name": "My Tags", "playlists": list(my_tags[4:-1])},
+        ]
+    )
+
+    # Tags containing "&" can't be operands of combiner expressions.
+    operands = [tag for tag in genres + my_tags if "&" not in tag]
+    expressions = [
+        lambda: f"{rng.choice(operands)} & [{rng.randint(70, 160)}-180]",
+        lambda: (
+            f"({rng.choice(operands)} | {rng.choice(operands)}) & "
+            f"{rng.choice(my_tags)}"
+        ),
+        lambda: f"*{rng.choice(STYLES[:5])} ~ {rng.choice(my_tags)}",
+        lambda: (
+            f"{rng.choice(operands)} & "
+            f"{{date:>={rng.randint(FIRST_DATE.year, LAST_DATE.year)}}}"
+        ),
+        lambda: (
+            f"{{playlist: {rng.choice(playlists)}}} | {rng.choice(operands)}"
+        ),
+        lambda: f"{rng.choice(my_tags)} & [{rng.randint(1, 5)}-5]",
+        lambda: f"{{artist:*{rng.randint(1, 9)}*}} & {rng.choice(operands)}",
+        lambda: (
+            f"{{label:Label {rng.randint(1, 10)}}} | "
+            f"{{key:{rng.choice(KEYS)}}}"
+        ),
+        lambda: f"{{comment:*{rng.choice(my_tags)}*}} & [1990-2010]",
+    ]
+
+    return {
+        "tags": {"name": "Tags", "playlists": folders},
+        "combiner": {
+            "name": "Combiner",
+            "playlists": [
+                expressions[index % len(expressions)]()
+                for index in range(spec.combiner)
+            ],
+        },
+    }
+
+
+def get_genres(count: int) -> List[str]:
+    """Gets the vocabulary of genre tags.
+
+    Args:
+        count: Number of genre tags.
+
+    Returns:
+        Genre tags in order of their frequency.
+    """
+    genres = list(STYLES) + ["Minimal Deep Tech"]
+    genres.extend(
+        f"{prefix} {style}" for prefix in PREFIXES for style in STYLES
+    )
+    genres.extend(f"Genre {number}" for number in range(len(genres), count))
+
+    return genres[:count]
+
+
+def get_location(music_dir: Path, track_id: int) -> str:
+    """Gets the value of the Location attribute of a track.
+
+    Args:
+        music_dir: Directory of the tracks' files.
+        track_id: ID of the track.
+
+    Returns:
+        The quoted path of the track prefixed with the location prefix.
+    """
+    path = get_path(music_dir, track_id).as_posix()
+
+    return f"{LOCATION_PREFIX}{quote(path, safe='/,()!+=#;$:')}"
+
+
+def get_my_tags(count: int) -> List[str]:
+    """Gets the vocabulary of MyTags.
+
+    Args:
+        count: Number of MyTags.
+
+    Returns:
+        MyTags in order of their frequency.
+    """
+    my_tags = list(MY_TAGS)
+    my_tags.extend(f"Tag {number}" for number in range(len(my_tags), count))
+
+    return my_tags[:count]
+
+
+def get_path(music_dir: Path, track_id: int) -> Path:
+    """Gets the path of a track's file.
+
+    Args:
+        music_dir: Directory of the tracks' files.
+        track_id: ID of the track.
+
+    Returns:
+        Path of the track's file.
+    """
+    return music_dir / f"Track {track_id}.mp3"
+
+
+def main():
+    "Writes a synthetic collection and, optionally, its playlist config."
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n", maxsplit=1)[0]
+    )
+    parser.add_argument("path", type=Path, help="Path to write the XML to.")
+    parser.add_argument(
+        "--tracks",
+        type=int,
+        default=CollectionSpec().tracks,
+        help="Number of tracks in the collection.",
+    )
+    parser.add_argument(
+        "--music-dir",
+        type=Path,
+        default=CollectionSpec().music_dir,
+        help="Directory of the tracks' files.",
+    )
+    parser.add_argument(
+        "--playlist-config",
+        type=Path,
+        help="Path to write the playlist config YAML to.",
+    )
+    args = add_spec_arguments(parser).parse_args()
+
+    spec = CollectionSpec(
+        **{field: getattr(args, field) for field in CollectionSpec._fields}
+    )
+    playlists = generate_collection(args.path, spec)
+    if args.playlist_config:
+        with open(args.playlist_config, mode="w", encoding="utf-8") as _file:
+            yaml.dump(
+                generate_playlist_config(spec, list(playlists)),
+                _file,
+                sort_keys=False,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""Benchmark of collection operations on synthetic Rekordbox XML collections.
+
+A collection and playlist config are generated with collection_generator for
+each number of tracks. Then each operation runs in a new process to measure
+its wall time and the peak resident set size of the process:
+
+* load: deserializing the collection
+* serialize: serializing the loaded collection, which isn't timed
+* collection_playlists: loading, building playlists, and serializing
+* copy_playlists: loading, copying the files of some of the collection's
+    playlists, and serializing
+* shuffle_playlists: loading, shuffling some of the collection's playlists,
+    and serializing
+
+Peak resident set sizes include the interpreter, the imported modules, and
+any processes the operation starts, so the peak before the operation starts,
+which also includes the collection loaded to serialize, is reported as well.
+The files that copy_playlists copies are created empty before it runs.
+
+Results are printed as a table and may be written as JSON, which includes the
+options of the run, the version of Python, and the commit of the repository,
+so that results can be tracked over time.
+
+Usage:
+    python benchmarks/collection_operations.py [--tracks N [N ...]]
+        [--operations NAME [NAME ...]] [--repeat N] [--output PATH]
+        [--collection-config JSON] [collection_generator options]
+"""
+
+import argparse
+import json
+import logging
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from statistics import median
+from typing import Any, Dict, List, Optional, Tuple
+
+from djtools.collection import (
+    RekordboxCollection,
+    collection_playlists,
+    copy_playlists,
+    shuffle_playlists,
+)
+from djtools.collection.config import (
+    CollectionConfig,
+    PlaylistConfig,
+    PlaylistFilters,
+)
+from djtools.configs.config import BaseConfig
+
+from collection_generator import (
+    CollectionSpec,
+    add_spec_arguments,
+    generate_collection,
+    generate_playlist_config,
+    get_path,
+)
+
+# Operations in the order they're run.
+OPERATIONS = (
+    "load",
+    "serialize",
+    "collection_playlists",
+    "copy_playlists",
+    "shuffle_playlists",
+)
+
+# Numbers of the collection's playlists that are copied and shuffled.
+COPY_PLAYLISTS = 2
+SHUFFLE_PLAYLISTS = 5
+
+
+def benchmark_collection(
+    spec: CollectionSpec,
+    operations: List[str],
+    repeat: int,
+    overrides: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """Measures operations on a generated collection.
+
+    Args:
+        spec: Options of the collection, other than the directory of its
+            files.
+        operations: Names of the operations to measure.
+        repeat: Number of times to measure each operation.
+        overrides: Options of the collection config.
+
+    Returns:
+        Measurements of each operation.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directory = Path(tmp_dir)
+        spec = spec._replace(music_dir=directory / "music")
+        playlist_tracks = generate_collection(
+            directory / "collection.xml", spec
+        )
+        playlists = list(playlist_tracks)
+        playlist_config = generate_playlist_config(spec, playlists)
+
+        # Files of the copied playlists must exist to be copied.
+        spec.music_dir.mkdir()
+        for playlist in playlists[:COPY_PLAYLISTS]:
+            for track_id in playlist_tracks[playlist]:
+                get_path(spec.music_dir, track_id).touch()
+
+        for operation in operations:
+            measurements = []
+            for _ in range(repeat):
+                with ProcessPoolExecutor(
+                    max_workers=1, mp_context=get_context("spawn")
+                ) as executor:
+                    measurements.append(
+                        executor.submit(
+                            run_operation,
+                            operation,
+                            directory,
+                            playlist_config,
+                            playlists,
+                            overrides,
+                        ).result()
+                    )
+                shutil.rmtree(directory / "copy", ignore_errors=True)
+            results.append(
+                {
+                    "tracks": spec.tracks,
+                    "xml_bytes": (directory / "collection.xml").stat().st_size,
+                    "operation": operation,
+                    "wall_seconds": [wall for wall, _, _ in measurements],
+                    "peak_rss_before_bytes": [
+                        rss for _, rss, _ in measurements
+                    ],
+                    "peak_rss_bytes": [rss for _, _, rss in measurements],
+                }
+            )
+            print(
+                f"{spec.tracks:>8} tracks {operation:>20}: "
+                f"{median(wall for wall, _, _ in measurements):9.3f} s "
+                f"{max(rss for _, _, rss in measurements) / 2**20:9.1f} MiB"
+            )
+
+    return results
+
+
+def get_commit() -> Optional[str]:
+    """Gets the commit of the repository the benchmark is run from.
+
+    Returns:
+        Hash of the commit or None if it isn't known.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_peak_rss() -> int:
+    """Gets the peak resident set size of this process and its children.
+
+    Returns:
+        Peak resident set size in bytes.
+    """
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+    # Linux reports kilobytes while macOS reports bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_operation(
+    operation: str,
+    directory: Path,
+    playlist_config: Dict[str, Any],
+    playlists: List[str],
+    overrides: Dict[str, Any],
+) -> Tuple[float, int, int]:
+    """Runs an operation on a generated collection.
+
+    This is run in a new process for every measurement.
+
+    Args:
+        operation: Name of the operation.
+        directory: Directory of the generated collection, to which outputs
+            are written.
+        playlist_config: Playlist config of the collection.
+        playlists: Names of the playlists in the collection.
+        overrides: Options of the collection config.
+
+    Returns:
+        Tuple of the wall time of the operation in seconds and the peak
+            resident set sizes in bytes before and after the operation.
+    """
+    logging.disable(logging.WARNING)
+    config = BaseConfig(
+        collection=CollectionConfig(
+            **{
+                "collection_path": directory / "collection.xml",
+                "collection_playlist_filters": list(PlaylistFilters),
+                "copy_playlists": playlists[:COPY_PLAYLISTS],
+                "copy_playlists_destination": directory / "copy",
+                "playlist_config": PlaylistConfig(**playlist_config),
+                "shuffle_playlists": playlists[:SHUFFLE_PLAYLISTS],
+                **overrides,
+            }
+        )
+    )
+    path = directory / f"{operation}.xml"
+    collection = None
+    if operation == "serialize":
+        collection = RekordboxCollection(
+            path=config.collection.collection_path,
+            streaming=config.collection.collection_streaming,
+            snapshot=config.collection.collection_snapshot,
+            workers=config.collection.collection_workers,
+        )
+
+    rss_before = get_peak_rss()
+    start = time.perf_counter()
+    if operation == "load":
+        collection = RekordboxCollection(
+            path=config.collection.collection_path,
+            streaming=config.collection.collection_streaming,
+            snapshot=config.collection.collection_snapshot,
+            workers=config.collection.collection_workers,
+        )
+    elif operation == "serialize":
+        collection.serialize(
+            path=path, splice=config.collection.collection_splice
+        )
+    else:
+        {
+            "collection_playlists": collection_playlists,
+            "copy_playlists": copy_playlists,
+            "shuffle_playlists": shuffle_playlists,
+        }[operation](config, path=path)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, rss_before, get_peak_rss()
+
+
+def main():
+    "Runs the benchmark."
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n", maxsplit=1)[0]
+    )
+    parser.add_argument(
+        "--tracks",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Numbers of tracks of the generated collections.",
+    )
+    parser.add_argument(
+        "--operations",
+        nargs="+",
+        choices=OPERATIONS,
+        default=list(OPERATIONS),
+        help="Operations to measure.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of times to measure each operation.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Path to write the results to as JSON.",
+    )
+    parser.add_argument(
+        "--collection-config",
+        type=json.loads,
+        default={},
+        help="Collection config options as a JSON object.",
+    )
+    args = add_spec_arguments(parser).parse_args()
+
+    options = {
+        field: getattr(args, field)
+        for field in CollectionSpec._fields
+        if field not in ("music_dir", "tracks")
+    }
+    results = []
+    for num_tracks in args.tracks:
+        results.extend(
+            benchmark_collection(
+                CollectionSpec(**options, tracks=num_tracks),
+                args.operations,
+                args.repeat,
+                args.collection_config,
+            )
+        )
+
+    if args.output:
+        with open(args.output, mode="w", encoding="utf-8") as _file:
+            json.dump(
+                {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "commit": get_commit(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "options": {
+                        **options,
+                        "collection_config": args.collection_config,
+                        "repeat": args.repeat,
+                    },
+                    "results": results,
+                },
+                _file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Benchmark of decoding and encoding RekordboxTrack attributes.
+
+RekordboxTrack decodes and encodes the values of TRACK attributes with a table
+of codecs keyed by attribute name. This benchmark compares the table against
+the chains of conditionals over the attribute name that RekordboxTrack used
+before, which are copied verbatim into a subclass so that both are called as
+methods of tracks, and compares serializing the attributes of unmodified
+tracks, whose original values are passed through, against encoding every
+decoded value again.
+
+Each operation runs once before it's timed. Then the operations are timed in
+turn with timeit, so that changes in the speed of the machine affect each of
+them alike, and the minimum time of each is reported.
+
+Usage:
+    python benchmarks/track_codec.py [--tracks N] [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, ClassVar, Dict, List, Set
+from urllib.parse import quote, unquote
+
+from djtools.collection.rekordbox_track import (
+    LOCATION_PREFIX,
+    RekordboxTrack,
+    TrackRecord,
+)
+
+
+class ConditionalTrack(RekordboxTrack):
+    "RekordboxTrack with the codecs it had before the table of codecs."
+
+    __slots__ = ()
+
+    # Attributes whose values are integers.
+    INTEGER_ATTRIBUTES: ClassVar[Set[str]] = {
+        "BitRate",
+        "DiscNumber",
+        "PlayCount",
+        "SampleRate",
+        "Size",
+        "TotalTime",
+        "TrackNumber",
+    }
+
+    # Prefix of the path to the audio file corresponding to a track.
+    LOCATION_PREFIX = (
+        "file://localhost" if os.name == "posix" else "file://localhost/"
+    )
+
+    def _decode(  # pylint: disable=too-many-return-statements
+        self, key: str, value: str
+    ) -> Any:
+        """Decodes the value of a TRACK attribute.
+
+        Args:
+            key: Name of the attribute.
+            value: Value of the attribute as a string.
+
+        Returns:
+            The decoded value of the attribute.
+        """
+        if key in self.INTEGER_ATTRIBUTES:
+            return int(value)
+        if key == "AverageBpm":
+            return float(value)
+        if key == "DateAdded":
+            return datetime.strptime(value, "%Y-%m-%d")
+        if key == "Genre":
+            return [x.strip() for x in value.split("/")]
+        if key == "Location":
+            return Path(unquote(value).split(self.LOCATION_PREFIX)[-1])
+        if key == "Rating":
+            return {
+                "0": 0,
+                "51": 1,
+                "102": 2,
+                "153": 3,
+                "204": 4,
+                "255": 5,
+            }.get(value)
+
+        return value
+
+    def _encode(self, key: str, value: Any) -> str:
+        """Encodes the value of a TRACK attribute.
+
+        Args:
+            key: Name of the attribute.
+            value: Decoded value of the attribute.
+
+        Returns:
+            The value of the attribute as a string.
+        """
+        # Increase BPM precision to make serialization symmetrical.
+        if key == "AverageBpm":
+            return f"{value:0,.2f}"
+
+        # Truncate the HH:MM:SS part of the datetime.
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d")
+
+        # Re-join genre tags with forward slashes.
+        if key == "Genre":
+            return " / ".join(value)
+
+        # Re-insert the location prefix and quote the path.
+        if key == "Location":
+            track_path = quote(value.as_posix(), safe="/,()!+=#;$:")
+            return re.sub(
+                r"%[0-9A-Z]{2}",
+                lambda x: x.group(0).lower(),
+                f"{self.LOCATION_PREFIX}{track_path}",
+            )
+
+        # Reverse the rating value to the range recognized by Rekordbox.
+        if key == "Rating":
+            return {
+                0: "0",
+                1: "51",
+                2: "102",
+                3: "153",
+                4: "204",
+                5: "255",
+            }.get(value)
+
+        return str(value)
+
+
+def build_records(num_tracks: int) -> List[TrackRecord]:
+    """Builds records of tracks with every attribute Rekordbox exports.
+
+    Args:
+        num_tracks: Number of records to build.
+
+    Returns:
+        List of track records.
+    """
+    records = []
+    for index in range(num_tracks):
+        attrs = {key: "" for key in RekordboxTrack.SCHEMA}
+        attrs.update(
+            {
+                "TrackID": str(index),
+                "Name": f"Track {index}",
+                "Artist": "Artist",
+                "Genre": "House / Techno",
+                "Size": str(10_000_000 + index),
+                "TotalTime": "300",
+                "DiscNumber": "0",
+                "TrackNumber": str(index % 20),
+                "Year": "2020",
+                "AverageBpm": f"{120 + index % 20}.00",
+                "DateAdded": f"2023-{index % 12 + 1:02d}-01",
+                "BitRate": "320",
+                "SampleRate": "44100",
+                "PlayCount": str(index % 50),
+                "Rating": ["0", "51", "102", "153", "204", "255"][index % 6],
+                "Location": (
+                    f"{LOCATION_PREFIX}/Users/me/Music/Artist%20-%20"
+                    f"Track%20{index}%20%28Remix%29.mp3"
+                ),
+            }
+        )
+        records.append((attrs, [], [], None))
+
+    return records
+
+
+def measure(
+    operations: Dict[str, Callable[[], Any]], num_tracks: int, repeat: int
+) -> Dict[str, float]:
+    """Measures the time taken by operations over every track.
+
+    Args:
+        operations: Callables which operate on every track, keyed by name.
+        num_tracks: Number of tracks operated on.
+        repeat: Number of times to time each operation.
+
+    Returns:
+        Minimum microseconds per track of each operation.
+    """
+    for operation in operations.values():
+        operation()
+
+    times: Dict[str, List[float]] = {name: [] for name in operations}
+    for _ in range(repeat):
+        for name, operation in operations.items():
+            times[name].extend(timeit.repeat(operation, number=1, repeat=1))
+
+    return {
+        name: min(seconds) / num_tracks * 1e6
+        for name, seconds in times.items()
+    }
+
+
+def main():
+    "Runs the benchmark."
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n", maxsplit=1)[0]
+    )
+    parser.add_argument(
+        "--tracks",
+        type=int,
+        default=20_000,
+        help="Number of synthetic tracks to build.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=7,
+        help="Number of times to time each operation.",
+    )
+    args = parser.parse_args()
+
+    records = build_records(args.tracks)
+    tracks = [RekordboxTrack.from_record(record) for record in records]
+
+    # The codecs don't depend on the state of the track they're called on.
+    # pylint: disable=protected-access
+    table = tracks[0]
+    conditional = ConditionalTrack.from_record(records[0])
+    decoded = [
+        {key: table._decode(key, value) for key, value in record[0].items()}
+        for record in records
+    ]
+
+    def decode_all(track: RekordboxTrack):
+        for record in records:
+            for key, value in record[0].items():
+                track._decode(key, value)
+
+    def encode_all(track: RekordboxTrack):
+        for values in decoded:
+            for key, value in values.items():
+                track._encode(key, value)
+
+    results = measure(
+        {
+            "decode (conditionals)": lambda: decode_all(conditional),
+            "decode (table)": lambda: decode_all(table),
+            "encode (conditionals)": lambda: encode_all(conditional),
+            "encode (table)": lambda: encode_all(table),
+            "serialize unmodified (passthrough)": lambda: [
+                track.get_attributes() for track in tracks
+            ],
+        },
+        args.tracks,
+        args.repeat,
+    )
+    for name, per_track in results.items():
+        print(f"{name:>34}: {per_track:8.2f} us per track")
+
+
+if __name__ == "__main__":
+    main()
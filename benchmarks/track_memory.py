@@ -0,0 +1,137 @@
+"""Benchmark of the memory used per RekordboxTrack.
+
+RekordboxTracks store the raw values of known TRACK attributes in slots. This
+benchmark compares the memory allocated for them against tracks that store the
+same attribute values in a per-instance __dict__ or in a mapping of attribute
+names to values.
+
+Usage:
+    python benchmarks/track_memory.py [--tracks N] [--xml PATH]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, Dict, List
+
+from djtools.collection.rekordbox_parser import RekordboxParser
+from djtools.collection.rekordbox_track import RekordboxTrack, TrackRecord
+
+
+class DictTrack:  # pylint: disable=too-few-public-methods
+    "Track which stores its attributes in a per-instance __dict__."
+
+    def __init__(self, record: TrackRecord):
+        """Constructor.
+
+        Args:
+            record: Attributes of a TRACK element, the attributes of its
+                TEMPO and POSITION_MARK elements, and its span.
+        """
+        attrs, beat_grid, hot_cues, _ = record
+        for key, value in attrs.items():
+            setattr(self, f"_{key}", value)
+        self._beat_grid = beat_grid
+        self._hot_cues = hot_cues
+
+
+class MappingTrack:  # pylint: disable=too-few-public-methods
+    "Track which stores its attributes in a mapping."
+
+    def __init__(self, record: TrackRecord):
+        """Constructor.
+
+        Args:
+            record: Attributes of a TRACK element, the attributes of its
+                TEMPO and POSITION_MARK elements, and its span.
+        """
+        attrs, beat_grid, hot_cues, _ = record
+        self._attributes = dict(attrs)
+        self._beat_grid = beat_grid
+        self._hot_cues = hot_cues
+
+
+def build_records(num_tracks: int) -> List[TrackRecord]:
+    """Builds records of tracks with every attribute Rekordbox exports.
+
+    Args:
+        num_tracks: Number of records to build.
+
+    Returns:
+        List of track records.
+    """
+    records = []
+    for index in range(num_tracks):
+        attrs = {key: f"{key}{index}" for key in RekordboxTrack.SCHEMA}
+        records.append((attrs, [{"Inizio": "0.025"}], [], None))
+
+    return records
+
+
+def measure(
+    build: Callable[[TrackRecord], object], records: List[TrackRecord]
+) -> float:
+    """Measures the memory allocated while building tracks from records.
+
+    The records are built before measuring so only the memory of the tracks
+    themselves is counted.
+
+    Args:
+        build: Callable that builds a track from a record.
+        records: Records of the tracks to build.
+
+    Returns:
+        Bytes allocated per track.
+    """
+    gc.collect()
+    tracemalloc.start()
+    tracks = [build(record) for record in records]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tracks
+
+    return current / len(records)
+
+
+def main():
+    "Runs the benchmark."
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n", maxsplit=1)[0]
+    )
+    parser.add_argument(
+        "--tracks",
+        type=int,
+        default=100_000,
+        help="Number of synthetic tracks to build.",
+    )
+    parser.add_argument(
+        "--xml",
+        help="Rekordbox XML to build tracks from instead of synthetic ones.",
+    )
+    args = parser.parse_args()
+
+    records = (
+        RekordboxParser().parse(args.xml).get_tracks()
+        if args.xml
+        else build_records(args.tracks)
+    )
+    results: Dict[str, float] = {
+        "__dict__": measure(DictTrack, records),
+        "mapping": measure(MappingTrack, records),
+        "__slots__": measure(RekordboxTrack.from_record, records),
+    }
+    for name, per_track in results.items():
+        savings = per_track - results["__slots__"]
+        print(
+            f"{name:>10}: {per_track:8.1f} bytes per track"
+            + (
+                f" (__slots__ saves {savings:.1f} bytes or "
+                f"{savings / per_track:.0%})"
+                if savings
+                else ""
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,23 +3,45 @@
 * `base_collection`: abstraction for Collection
 * `base_playlist`: abstraction for Playlist
 * `base_track`: abstraction for Track
+* `combiner_expression`: compiled trees of combiner playlist expressions
+    evaluated over bitsets of tracks
 * `config`: the configuration object for the `collection` package
 * `copy_playlists`: copies audio files for tracks within a set of
     playlists to a new location and writes a new collection with these
     updated paths
+* `filter_cache`: memoized decisions of playlist filters and the features of
+    tracks they use
+* `genre_index`: bitsets of the tracks having each genre tag for "Pure"
+    playlists and the lookup of tags to tracks that shares them
 * `helpers`: contains helper classes and functions for the other modules of
     this package
+* `parallel_builder`: builds the top-level folders of a playlist config in a
+    pool of processes
 * `playlist_builder`: constructs playlists using tags in a Collection and a
     defined playlist structure in
     `collection_playlists.yaml`
+* `playlist_cache`: cache of the results of combiner playlists keyed by the
+    fingerprints of their inputs
 * `playlist_filters`: abstractions and implementations for playlist filters
+* `playlist_index`: index of the playlists within a folder by name and path
 * `playlists`: abstractions and implementations for playlists
+* `range_index`: sorted indexes of the numerical and date attributes of
+    tracks
 * `rekordbox_collection`: implementation of Collection for Rekordbox
+* `rekordbox_parser`: streaming parser for the XML format that Rekordbox
+    exports
 * `rekordbox_playlist`: implementation of Playlist for Rekordbox
+* `rekordbox_snapshot`: binary snapshot of a parsed Rekordbox XML
 * `rekordbox_track`: implementation of Track for Rekordbox
+* `rekordbox_validator`: streaming comparison of a serialized Rekordbox XML
+    against the original
 * `shuffle_playlists`: writes sequential numbers to tags of shuffled tracks
     in playlists to emulate playlist shuffling
+* `track_index`: inverted indexes of the values of track attributes
+* `track_set`: bitsets of tracks over dense ordinals of a collection's tracks
 * `tracks`: abstractions and implementations for tracks
+* `wildcard_index`: index of keys answering prefix, suffix, and infix
+    wildcard patterns
 """
 
 from djtools.collection.copy_playlists import copy_playlists
@@ -6,13 +6,16 @@ collection; namely methods for (de)serialization to/from the representation
 recognized by the DJ software for which Collection is being sub-classed.
 """
 
-import re
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
 from djtools.collection.base_playlist import Playlist
 from djtools.collection.base_track import Track
+from djtools.collection.filter_cache import FilterCache
+from djtools.collection.genre_index import GenreIndex
+from djtools.collection.range_index import RangeIndex
+from djtools.collection.track_index import TrackIndex
 
 
 class Collection(ABC):
@@ -25,6 +28,11 @@ class Collection(ABC):
         Args:
             path: Path to a serialized collection.
         """
+        self._filter_cache = None
+        self._genre_index = None
+        self._modified = False
+        self._range_index = None
+        self._track_index = None
 
     def add_playlist(self, playlist: Playlist):
         """Appends a playlist to the collection.
@@ -40,20 +48,41 @@ class Collection(ABC):
         Returns:
             Dict containing all track tags keyed by "genres" and "other".
         """
-        all_tags = {
-            tag
-            for track in self.get_tracks().values()
-            for tag in track.get_tags()
-        }
-        genre_tags = {
-            tag
-            for track in self.get_tracks().values()
-            for tag in track.get_genre_tags()
-        }
-        other_tags = all_tags.difference(genre_tags)
+        track_index = self.get_track_index()
+        genre_tags = set(track_index.get_index("genre"))
+        other_tags = set(track_index.get_index("tag")).difference(genre_tags)
 
         return {"genres": sorted(genre_tags), "other": sorted(other_tags)}
 
+    def get_filter_cache(self) -> FilterCache:
+        """Returns the memoized decisions of PlaylistFilters on the
+        collection's tracks and the features of the tracks they use.
+
+        The cache is created the first time it's requested and is discarded
+        after the tracks of the collection are set.
+
+        Returns:
+            FilterCache of the collection's tracks.
+        """
+        if self._filter_cache is None:
+            self._filter_cache = FilterCache()
+
+        return self._filter_cache
+
+    def get_genre_index(self) -> GenreIndex:
+        """Returns bitsets of the collection's tracks having each genre tag.
+
+        The bitsets are built the first time they're requested and are
+        rebuilt after the tracks of the collection are set.
+
+        Returns:
+            GenreIndex of the collection's tracks.
+        """
+        if self._genre_index is None:
+            self._genre_index = GenreIndex(self.get_tracks())
+
+        return self._genre_index
+
     def get_playlists(
         self, name: Optional[str] = None, glob: Optional[bool] = False
     ) -> Union[Playlist, List[Playlist]]:
@@ -71,20 +100,40 @@ class Collection(ABC):
         if not name:
             return self._playlists  # pylint:disable=no-member
 
-        exp = re.compile(r".*".join(name.split("*")))
-        playlists = []
-        for playlist in self._playlists:  # pylint:disable=no-member
-            if (glob and re.search(exp, playlist.get_name())) or (
-                not glob and playlist.get_name() == name
-            ):
-                playlists.append(playlist)
-            if playlist.is_folder():
-                for sub_playlist in playlist:
-                    playlists.extend(
-                        sub_playlist.get_playlists(name, glob=glob)
-                    )
-
-        return [playlist for playlist in playlists if playlist is not None]
+        index = self._playlists.get_playlist_index()  # pylint:disable=no-member
+
+        return index.get_playlists(name, glob=glob)
+
+    def get_range_index(self) -> RangeIndex:
+        """Returns sorted indexes of the numerical attributes of the
+        collection's tracks.
+
+        The indexes are built the first time they're queried and are rebuilt
+        after the tracks of the collection are set.
+
+        Returns:
+            RangeIndex of the collection's tracks.
+        """
+        if self._range_index is None:
+            self._range_index = RangeIndex(self.get_tracks())
+
+        return self._range_index
+
+    def get_track_index(self) -> TrackIndex:
+        """Returns inverted indexes of the attributes of the collection's
+        tracks.
+
+        The indexes are built the first time they're requested and are
+        rebuilt after the tracks of the collection are set. Locations set
+        with set_location are kept up to date in the indexes.
+
+        Returns:
+            TrackIndex of the collection's tracks.
+        """
+        if self._track_index is None:
+            self._track_index = TrackIndex(self.get_tracks())
+
+        return self._track_index
 
     def get_tracks(self) -> Dict[str, Track]:
         """Returns the tracks in the collection.
@@ -94,6 +143,15 @@ class Collection(ABC):
         """
         return self._tracks
 
+    def is_modified(self) -> bool:
+        """Returns whether the tracks of the collection have been set since
+        deserialization.
+
+        Returns:
+            Whether or not the tracks of the collection have been set.
+        """
+        return self._modified
+
     @abstractmethod
     def serialize(self, *args, **kwargs) -> Path:
         """Serialize a collection into the native format of a DJ software.
@@ -102,6 +160,20 @@ class Collection(ABC):
             A path to a serialized collection.
         """
 
+    def set_location(self, track: Track, location: Path):
+        """Sets the location of one of the collection's tracks.
+
+        Unlike Track.set_location, this keeps the collection's location index
+        consistent.
+
+        Args:
+            track: Track in the collection.
+            location: New location of the track.
+        """
+        if self._track_index is not None:
+            self._track_index.set_location(track, location)
+        track.set_location(location)
+
     def set_tracks(self, tracks: Dict[str, Track]):
         """Sets the tracks of this collection.
 
@@ -109,3 +181,8 @@ class Collection(ABC):
             tracks: Tracks to set.
         """
         self._tracks = tracks  # pylint:disable=attribute-defined-outside-init
+        self._filter_cache = None
+        self._genre_index = None
+        self._modified = True
+        self._range_index = None
+        self._track_index = None
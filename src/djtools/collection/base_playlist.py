@@ -6,11 +6,11 @@ playlist; namely methods for (de)serialization to/from the representation
 recognized by the DJ software for which Playlist is being sub-classed.
 """
 
-import re
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 
 from djtools.collection.base_track import Track
+from djtools.collection.playlist_index import PlaylistIndex
 
 # pylint: disable=duplicate-code
 
@@ -23,6 +23,30 @@ class Playlist(ABC):
         self._aggregate = False
         if kwargs.get("enable_aggregation"):
             self._aggregate = True
+        self._index = None
+        self._modified = False
+        self._size = None
+
+    def _update_ancestors(self, playlist: "Playlist", count: int):
+        """Updates this folder and its ancestors after a playlist is added to
+        or removed from this folder.
+
+        The playlist indexes of the folders are dropped and their cached
+        numbers of playlists are updated.
+
+        Args:
+            playlist: Playlist that was added or removed.
+            count: Number of times the playlist was added, or negative the
+                number of times it was removed.
+        """
+        # pylint: disable=protected-access
+        delta = count * playlist.get_number_of_playlists()
+        folder = self
+        while folder is not None:
+            folder._index = None
+            if folder._size is not None:
+                folder._size += delta
+            folder = folder.get_parent()
 
     def __getitem__(self, index: int) -> "Playlist":
         """Gets a Playlist from this Playlist's playlists.
@@ -69,6 +93,9 @@ class Playlist(ABC):
             self._playlists.insert(index, playlist)
         else:
             self._playlists.append(playlist)
+        playlist._parent = self  # pylint: disable=protected-access
+        self._update_ancestors(playlist, 1)
+        self._modified = True
 
     def aggregate(self) -> bool:
         """whether to aggregate or not.
@@ -97,8 +124,12 @@ class Playlist(ABC):
         """
         if not self.is_folder():
             return 1
+        if self._size is None:
+            self._size = sum(
+                playlist.get_number_of_playlists() for playlist in self
+            )
 
-        return sum(playlist.get_number_of_playlists() for playlist in self)
+        return self._size
 
     def get_parent(self) -> Optional["Playlist"]:
         """Returns the folder this playlist is in.
@@ -108,6 +139,29 @@ class Playlist(ABC):
         """
         return self._parent
 
+    def get_playlist_index(self) -> PlaylistIndex:
+        """Returns an index of the playlists within this folder.
+
+        The index is built the first time it's requested and is rebuilt after
+        playlists are added to or removed from this folder or any folder
+        within it.
+
+        Raises:
+            RuntimeError: Only folder Playlists have playlists to index.
+
+        Returns:
+            PlaylistIndex of the playlists within this folder.
+        """
+        if not self.is_folder():
+            raise RuntimeError(
+                f'Playlist "{self.get_name()}" is not a folder so it has no '
+                "playlists to index."
+            )
+        if self._index is None:
+            self._index = PlaylistIndex(self)
+
+        return self._index
+
     def get_playlists(
         self, name: Optional[str] = None, glob: Optional[bool] = False
     ) -> List["Playlist"]:
@@ -128,17 +182,14 @@ class Playlist(ABC):
                 )
             return list(self)
 
-        exp = re.compile(r".*".join(name.split("*")))
-        playlists = []
-        if (glob and re.search(exp, self.get_name())) or (
-            not glob and self.get_name() == name
-        ):
-            playlists.append(self)
+        matches = PlaylistIndex.get_matcher(name, bool(glob))
+        playlists = [self] if matches(self.get_name()) else []
         if self.is_folder():
-            for playlist in self:
-                playlists.extend(playlist.get_playlists(name, glob=glob))
+            playlists.extend(
+                self.get_playlist_index().get_playlists(name, glob=glob)
+            )
 
-        return [playlist for playlist in playlists if playlist is not None]
+        return playlists
 
     def get_tracks(self) -> Dict[str, Track]:
         """Returns a dict of track IDs and tracks.
@@ -156,6 +207,16 @@ class Playlist(ABC):
             Boolean representing whether this is a folder or not.
         """
 
+    def is_modified(self) -> bool:
+        """Returns whether this playlist has been modified since
+        deserialization.
+
+        Returns:
+            Whether or not playlists or tracks have been added to or removed
+                from this playlist.
+        """
+        return self._modified
+
     @classmethod
     @abstractmethod
     def new_playlist(
@@ -197,11 +258,16 @@ class Playlist(ABC):
             raise RuntimeError(
                 "Can't remove playlist from a non-folder playlist."
             )
+        # pylint: disable=access-member-before-definition
+        playlists = self._playlists
         self._playlists = [  # pylint: disable=attribute-defined-outside-init
-            _playlist
-            for _playlist in self._playlists
-            if _playlist is not playlist
+            _playlist for _playlist in playlists if _playlist is not playlist
         ]
+        removed = len(playlists) - len(self._playlists)
+        if removed:
+            playlist._parent = None  # pylint: disable=protected-access
+            self._update_ancestors(playlist, -removed)
+        self._modified = True
 
     @abstractmethod
     def serialize(self, *args, **kwargs) -> Any:
@@ -231,3 +297,4 @@ class Playlist(ABC):
             tracks: A dict of Tracks to override for this Playlist.
         """
         self._tracks = tracks  # pylint: disable=attribute-defined-outside-init
+        self._modified = True
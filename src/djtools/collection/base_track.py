@@ -16,6 +16,8 @@ from typing import Any, List
 class Track(ABC):
     "Abstract base class for a track."
 
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self, *args, **kwargs):
         "Deserializes a track from the native format of a DJ software."
@@ -28,6 +30,14 @@ class Track(ABC):
             A string representing the track's artists.
         """
 
+    @abstractmethod
+    def get_bit_rate(self) -> int:
+        """Gets the track bit rate.
+
+        Returns:
+            An integer representing the track's bit rate.
+        """
+
     @abstractmethod
     def get_bpm(self) -> float:
         """Gets the track BPM.
@@ -92,6 +102,14 @@ class Track(ABC):
             The Path for the location of the track.
         """
 
+    @abstractmethod
+    def get_play_count(self) -> int:
+        """Gets the track play count.
+
+        Returns:
+            An integer representing the number of times the track was played.
+        """
+
     @abstractmethod
     def get_rating(self) -> int:
         """Gets the rating of the track.
@@ -108,6 +126,14 @@ class Track(ABC):
             A set of the track's tags.
         """
 
+    @abstractmethod
+    def get_total_time(self) -> int:
+        """Gets the track duration.
+
+        Returns:
+            An integer representing the track's duration in seconds.
+        """
+
     @abstractmethod
     def get_year(self) -> str:
         """Gets the year of the track.
@@ -116,6 +142,14 @@ class Track(ABC):
             The year of the track.
         """
 
+    @abstractmethod
+    def is_modified(self) -> bool:
+        """Returns whether the track has been modified since deserialization.
+
+        Returns:
+            Whether or not any of the track's attributes have been set.
+        """
+
     @abstractmethod
     def serialize(self, *args, **kwargs) -> Any:
         """Serializes a track into the native format of a DJ software.
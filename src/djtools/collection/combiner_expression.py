@@ -0,0 +1,583 @@
+"""This module contains the classes for compiled combiner expressions.
+
+Combiner playlists are named by boolean algebra expressions over tags and
+selectors, such as "(Dubstep ~ [1-3]) | (*Techno & [135-145])". Expressions
+are compiled once into a tree of ExpressionNodes and evaluated by a
+CombinerEvaluator as bitsets of track ordinals. Tracks are only looked up, in
+the order that a left-to-right evaluation of the expression over dicts of
+tracks would produce, once the expression's result is known.
+
+Operators have equal precedence and are applied from left to right, so runs of
+the same operator are flattened into a single node. Intersections resolve
+their tag operands from the smallest to the largest, and operands that can no
+longer change the result of an intersection or difference aren't resolved.
+
+A parenthesized sub-expression containing an operator which has no tracks
+makes the whole expression invalid.
+
+Every node has a canonical key in which the operands of intersections and
+unions, and the subtrahends of differences, are sorted. The results of nodes
+are memoized by their keys for the lifetime of the evaluator so that
+sub-expressions shared by the combiner playlists of a run, even when their
+operands are written in a different order, are only evaluated once. Results of
+whole expressions may also be reused from the runs before it through a
+PlaylistCache.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+from djtools.collection.base_track import Track
+from djtools.collection.playlist_cache import PlaylistCache
+from djtools.collection.track_set import TrackOrdinals
+from djtools.collection.wildcard_index import WildcardIndex
+
+NUMERICAL_SELECTOR_REGEX = re.compile(r"(?<=\[)[^\[\]]*(?=\])")
+STRING_SELECTOR_REGEX = re.compile(r"(?<={)[^{}]+:[^{}]+(?=})")
+OPERATORS = {"&", "|", "~"}
+
+
+class ExpressionNode:  # pylint: disable=too-few-public-methods
+    "Node of a compiled combiner expression."
+
+    def __init__(
+        self, key: Optional[str] = None, parenthesized: Optional[bool] = False
+    ):
+        """Constructor.
+
+        Args:
+            key: Canonical key of the node.
+            parenthesized: Whether the node is a parenthesized sub-expression
+                containing an operator.
+        """
+        self.key = key
+        self.parenthesized = parenthesized
+
+
+class TagNode(ExpressionNode):  # pylint: disable=too-few-public-methods
+    "Tag, selector, or wildcard tag operand of a combiner expression."
+
+    def __init__(self, tag: str):
+        """Constructor.
+
+        Args:
+            tag: Tag or selector. Tags containing "*" that aren't selectors
+                match every tag that they match in full.
+        """
+        super().__init__(tag)
+        self.tag = tag
+        self.wildcard = "*" in tag and not (
+            re.search(NUMERICAL_SELECTOR_REGEX, tag)
+            or re.search(STRING_SELECTOR_REGEX, tag)
+        )
+
+    def __repr__(self) -> str:
+        """Produces a string representation of this node.
+
+        Returns:
+            The tag.
+        """
+        return self.tag
+
+
+class OperationNode(ExpressionNode):  # pylint: disable=too-few-public-methods
+    "Set operation over the operands of a combiner expression."
+
+    def __init__(
+        self,
+        operator: str,
+        operands: List[ExpressionNode],
+        parenthesized: Optional[bool] = False,
+    ):
+        """Constructor.
+
+        Args:
+            operator: "&" for intersection, "|" for union, or "~" for the
+                difference between the first operand and the rest.
+            operands: Operands in the order they appear in the expression.
+            parenthesized: Whether the node is a parenthesized sub-expression.
+        """
+        super().__init__(parenthesized=parenthesized)
+        self.operator = operator
+        self.operands = operands
+
+    def __repr__(self) -> str:
+        """Produces a string representation of this node.
+
+        Returns:
+            The operation with its operands.
+        """
+        return f"({f' {self.operator} '.join(map(repr, self.operands))})"
+
+
+class CombinerEvaluator:  # pylint: disable=too-many-instance-attributes
+    "Evaluator of combiner expressions over a lookup of tags to tracks."
+
+    def __init__(
+        self,
+        tags_tracks: Dict[str, Dict[str, Track]],
+        ordinals: Optional[TrackOrdinals] = None,
+        cache: Optional[PlaylistCache] = None,
+        fingerprints: Optional[Dict[str, str]] = None,
+    ):
+        """Constructor.
+
+        Args:
+            tags_tracks: Dict of tags and selectors to tracks.
+            ordinals: Ordinals of the tracks in the lookup. If not provided,
+                the tracks in the lookup are numbered.
+            cache: PlaylistCache of the results of expressions from previous
+                runs.
+            fingerprints: Dict of tags and selectors to the fingerprints of
+                their tracks. Fingerprints that aren't provided are computed
+                from the lookup.
+        """
+        self._tags_tracks = tags_tracks
+        self._ordinals = ordinals
+        self._cache = cache
+        self._bits: Dict[str, int] = {}
+        self._expressions: Dict[str, ExpressionNode] = {}
+        self._fingerprints = fingerprints or {}
+        self._hits = 0
+        self._misses = 0
+        self._ordered: Dict[str, bool] = {}
+        self._results: Dict[str, int] = {}
+        self._wildcard_index: Optional[WildcardIndex] = None
+
+    @staticmethod
+    def _build_node(
+        operands: List[ExpressionNode],
+        operators: List[str],
+        parenthesized: bool,
+    ) -> ExpressionNode:
+        """Builds the node of a sequence of operands and operators.
+
+        Args:
+            operands: Operands of the sequence.
+            operators: Operators between the operands.
+            parenthesized: Whether the sequence is in parentheses.
+
+        Raises:
+            RuntimeError: There must be one less operator than operands.
+
+        Returns:
+            Node of the sequence.
+        """
+        if len(operators) + 1 != len(operands):
+            raise RuntimeError(
+                "Invalid boolean expression:\n"
+                f"\toperands: {list(map(repr, operands))}\n"
+                f"\toperators: {operators}"
+            )
+
+        # A single operand, even in parentheses, is the operand itself.
+        node = operands[0]
+        for operator, operand in zip(operators, operands[1:]):
+            if (
+                isinstance(node, OperationNode)
+                and not node.parenthesized
+                and node.operator == operator
+            ):
+                node.operands.append(operand)
+            else:
+                node = OperationNode(operator, [node, operand])
+        if operators:
+            node.parenthesized = parenthesized
+
+        return node
+
+    @classmethod
+    def _canonicalize(cls, node: ExpressionNode) -> str:
+        """Sets the canonical keys of a node and its operands.
+
+        Operands of intersections and unions, and the subtrahends of
+        differences, are sorted by their keys. Parenthesized sub-expressions
+        are distinguished from unparenthesized ones with the same operands
+        because only the former invalidate an expression when they're empty.
+
+        Args:
+            node: Node of an expression.
+
+        Returns:
+            Canonical key of the node.
+        """
+        if isinstance(node, OperationNode):
+            keys = [cls._canonicalize(operand) for operand in node.operands]
+            if node.operator == "~":
+                keys[1:] = sorted(keys[1:])
+            else:
+                keys.sort()
+            node.key = f"({f' {node.operator} '.join(keys)})"
+            if node.parenthesized:
+                node.key = f"({node.key})"
+
+        return node.key
+
+    def _emit(
+        self,
+        node: ExpressionNode,
+        mask: int,
+        tracks: Dict[str, Track],
+        emitted: int = 0,
+    ) -> int:
+        """Adds the tracks of a node's result to the tracks of an expression.
+
+        Tracks are added in the order that evaluating the node from left to
+        right over dicts of tracks would produce: the order of the first
+        operand for intersections and differences, and the order in which
+        tracks first appear in the operands for unions.
+
+        Args:
+            node: Node of the expression.
+            mask: Bitset of the expression's result within the node's result.
+            tracks: Tracks added so far.
+            emitted: Bitset of the tracks added so far.
+
+        Returns:
+            Bitset of the tracks added, including those added by this node.
+        """
+        if isinstance(node, OperationNode):
+            if node.operator != "|":
+                return self._emit(node.operands[0], mask, tracks, emitted)
+            for operand in node.operands:
+                operand_mask = mask & self._results[operand.key] & ~emitted
+                if operand_mask:
+                    emitted = self._emit(
+                        operand, operand_mask, tracks, emitted
+                    )
+            return emitted
+
+        for tag in self._get_tags(node):
+            candidates = mask & self._get_bits(tag) & ~emitted
+            if not candidates:
+                continue
+            emitted |= candidates
+
+            # Tracks of tags in the order of the collection are added in the
+            # order of their ordinals without iterating the tag's tracks.
+            if self._is_ordered(tag):
+                for ordinal in self._ordinals.iter_ordinals(candidates):
+                    track_id, track = self._ordinals.get_track(ordinal)
+                    tracks[track_id] = track
+                continue
+
+            wanted = set(self._ordinals.iter_ordinals(candidates))
+            for track_id, track in self._tags_tracks[tag].items():
+                if self._ordinals.get_ordinal(track_id) in wanted:
+                    tracks[track_id] = track
+                    wanted.remove(self._ordinals.get_ordinal(track_id))
+                    if not wanted:
+                        break
+
+        return emitted
+
+    def _evaluate(  # pylint: disable=too-many-branches
+        self, node: ExpressionNode
+    ) -> int:
+        """Evaluates a node as a bitset of track ordinals.
+
+        Results are memoized by the canonical keys of the nodes.
+
+        Args:
+            node: Node of an expression.
+
+        Raises:
+            RuntimeError: Parenthesized sub-expressions with operators must
+                have tracks.
+
+        Returns:
+            Bitset of the node's result.
+        """
+        result = self._results.get(node.key)
+        if result is not None:
+            if isinstance(node, OperationNode):
+                self._hits += 1
+            if node.parenthesized and not result:
+                raise RuntimeError(
+                    f"Invalid boolean expression: {node!r} has no tracks"
+                )
+            return result
+
+        if isinstance(node, TagNode):
+            result = 0
+            for tag in self._get_tags(node):
+                result |= self._get_bits(tag)
+            self._results[node.key] = result
+            return result
+
+        self._misses += 1
+
+        # Operations are always evaluated, even when they can't change the
+        # result, so that empty parenthesized sub-expressions are detected.
+        operations = [
+            operand
+            for operand in node.operands
+            if isinstance(operand, OperationNode)
+        ]
+        for operation in operations:
+            self._evaluate(operation)
+
+        if node.operator == "|":
+            result = 0
+            for operand in node.operands:
+                result |= (
+                    self._results[operand.key]
+                    if isinstance(operand, OperationNode)
+                    else self._evaluate(operand)
+                )
+        elif node.operator == "&":
+            result = None
+            for operation in operations:
+                result = (
+                    self._results[operation.key]
+                    if result is None
+                    else result & self._results[operation.key]
+                )
+            for operand in sorted(
+                (
+                    operand
+                    for operand in node.operands
+                    if isinstance(operand, TagNode)
+                ),
+                key=self._get_size,
+            ):
+                if result == 0:
+                    break
+                bits = self._evaluate(operand)
+                result = bits if result is None else result & bits
+        else:
+            first, *rest = node.operands
+            result = (
+                self._results[first.key]
+                if isinstance(first, OperationNode)
+                else self._evaluate(first)
+            )
+            for operand in rest:
+                if result == 0:
+                    break
+                result &= ~(
+                    self._results[operand.key]
+                    if isinstance(operand, OperationNode)
+                    else self._evaluate(operand)
+                )
+
+        self._results[node.key] = result
+        if node.parenthesized and not result:
+            raise RuntimeError(
+                f"Invalid boolean expression: {node!r} has no tracks"
+            )
+
+        return result
+
+    def _get_bits(self, tag: str) -> int:
+        """Gets the bitset of the tracks with a tag.
+
+        Args:
+            tag: Tag or selector in the lookup.
+
+        Returns:
+            Bitset of track ordinals.
+        """
+        bits = self._bits.get(tag)
+        if bits is None:
+            bits = self._bits[tag] = self._ordinals.get_bits(
+                self._tags_tracks.get(tag, {})
+            )
+
+        return bits
+
+    def _get_dependencies(self, node: ExpressionNode) -> Dict[str, str]:
+        """Gets the fingerprints of the tracks of the tags an expression
+        depends on.
+
+        Args:
+            node: Node of an expression.
+
+        Returns:
+            Dict of the tags and selectors in the lookup that the expression's
+                operands refer to and the fingerprints of their tracks.
+        """
+        if isinstance(node, OperationNode):
+            dependencies = {}
+            for operand in node.operands:
+                dependencies.update(self._get_dependencies(operand))
+            return dependencies
+
+        dependencies = {}
+        for tag in self._get_tags(node):
+            fingerprint = self._fingerprints.get(tag)
+            if fingerprint is None:
+                fingerprint = self._fingerprints[tag] = (
+                    PlaylistCache.get_fingerprint(
+                        self._tags_tracks.get(tag, {})
+                    )
+                )
+            dependencies[tag] = fingerprint
+
+        return dependencies
+
+    def _get_size(self, node: TagNode) -> int:
+        """Gets the number of tracks of a tag operand without resolving it.
+
+        Args:
+            node: Tag operand.
+
+        Returns:
+            Number of tracks with the tag or, for wildcards, the sum of the
+                numbers of tracks with each matching tag.
+        """
+        return sum(
+            len(self._tags_tracks.get(tag, {})) for tag in self._get_tags(node)
+        )
+
+    def _get_tags(self, node: TagNode) -> List[str]:
+        """Gets the tags in the lookup that a tag operand refers to.
+
+        Args:
+            node: Tag operand.
+
+        Returns:
+            The tag itself or, for wildcards, the matching tags in the order
+                of the lookup.
+        """
+        if not node.wildcard:
+            return [node.tag]
+        if self._wildcard_index is None:
+            self._wildcard_index = WildcardIndex(self._tags_tracks)
+
+        return self._wildcard_index.match(node.tag)
+
+    def _is_ordered(self, tag: str) -> bool:
+        """Returns whether the tracks of a tag are in the order of the
+        collection.
+
+        Args:
+            tag: Tag or selector in the lookup.
+
+        Returns:
+            Whether or not the tracks' ordinals are ascending.
+        """
+        ordered = self._ordered.get(tag)
+        if ordered is None:
+            ordinals = [
+                self._ordinals.get_ordinal(track_id)
+                for track_id in self._tags_tracks.get(tag, {})
+            ]
+            ordered = self._ordered[tag] = all(
+                previous < ordinal
+                for previous, ordinal in zip(ordinals, ordinals[1:])
+            )
+
+        return ordered
+
+    def compile(self, expression: str) -> ExpressionNode:
+        """Compiles an expression into a tree of nodes.
+
+        Expressions are compiled once and reused when they're evaluated again.
+
+        Args:
+            expression: String representing a boolean algebra expression.
+
+        Raises:
+            RuntimeError: The expression is malformed.
+
+        Returns:
+            Root node of the expression.
+        """
+        node = self._expressions.get(expression)
+        if node is not None:
+            return node
+
+        # Stack of the operands and operators of the open sub-expressions.
+        stack: List[Tuple[List[ExpressionNode], List[str]]] = [([], [])]
+        tag = ""
+        for char in expression:
+            if char == "(":
+                stack.append(([], []))
+            elif char in OPERATORS:
+                if tag.strip():
+                    stack[-1][0].append(TagNode(tag.strip()))
+                tag = ""
+                stack[-1][1].append(char)
+            elif char == ")":
+                if tag.strip():
+                    stack[-1][0].append(TagNode(tag.strip()))
+                tag = ""
+                if len(stack) == 1:
+                    raise RuntimeError(
+                        f"Invalid boolean expression: unmatched ')' in "
+                        f"{expression}"
+                    )
+                stack[-2][0].append(self._build_node(*stack.pop(), True))
+            else:
+                tag += char
+        if tag.strip():
+            stack[-1][0].append(TagNode(tag.strip()))
+
+        # Sub-expressions left open are ignored in favor of the innermost,
+        # which is evaluated as though it were the whole expression.
+        node = self._build_node(*stack[-1], False)
+        self._canonicalize(node)
+        self._expressions[expression] = node
+
+        return node
+
+    def evaluate(
+        self, expression: Union[str, ExpressionNode]
+    ) -> Dict[str, Track]:
+        """Evaluates an expression.
+
+        Args:
+            expression: Expression or the root node of a compiled expression.
+                Only the results of expressions are cached.
+
+        Raises:
+            RuntimeError: The expression is malformed.
+
+        Returns:
+            Dict of track IDs and tracks.
+        """
+        # Results are cached by the expressions as written, rather than by
+        # their canonical keys, because the order of the operands determines
+        # the order of the tracks.
+        key = expression if isinstance(expression, str) else None
+        if isinstance(expression, str):
+            expression = self.compile(expression)
+        if self._ordinals is None:
+            self._ordinals = TrackOrdinals(
+                {
+                    track_id: track
+                    for tracks in self._tags_tracks.values()
+                    for track_id, track in tracks.items()
+                }
+            )
+
+        cached = self._cache is not None and key is not None
+        if cached:
+            dependencies = self._get_dependencies(expression)
+            track_ids = self._cache.get(key, dependencies)
+            if track_ids is not None:
+                return {
+                    track_id: self._ordinals.get_track(
+                        self._ordinals.get_ordinal(track_id)
+                    )[1]
+                    for track_id in track_ids
+                }
+
+        result = self._evaluate(expression)
+        tracks: Dict[str, Track] = {}
+        if result:
+            self._emit(expression, result, tracks)
+        if cached:
+            self._cache.set(key, dependencies, list(tracks))
+
+        return tracks
+
+    def get_cache_statistics(self) -> Tuple[int, int]:
+        """Gets the number of sub-expression results reused and evaluated.
+
+        Returns:
+            Tuple of the numbers of operations whose memoized results were
+                reused and of operations which were evaluated.
+        """
+        return self._hits, self._misses
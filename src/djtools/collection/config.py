@@ -91,9 +91,15 @@ class CollectionConfig(BaseConfigFormatter):
         default_factory=list
     )
     collection_playlists: bool = False
+    collection_playlists_cache: bool = False
     collection_playlists_remainder: PlaylistRemainder = (
         PlaylistRemainder.FOLDER
     )
+    collection_playlists_workers: Optional[PositiveInt] = None
+    collection_snapshot: bool = False
+    collection_splice: bool = False
+    collection_streaming: bool = False
+    collection_workers: Optional[PositiveInt] = None
     copy_playlists: List[str] = Field(default_factory=list)
     copy_playlists_destination: Optional[Path] = None
     minimum_combiner_playlist_tracks: Optional[PositiveInt] = None
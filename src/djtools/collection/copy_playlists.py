@@ -40,7 +40,10 @@ def copy_playlists(config: BaseConfig, path: Optional[Path] = None):
     """
     # Load collection.
     collection = PLATFORM_REGISTRY[config.collection.platform]["collection"](
-        path=config.collection.collection_path
+        path=config.collection.collection_path,
+        streaming=config.collection.collection_streaming,
+        snapshot=config.collection.collection_snapshot,
+        workers=config.collection.collection_workers,
     )
 
     # Create destination directory.
@@ -67,13 +70,14 @@ def copy_playlists(config: BaseConfig, path: Optional[Path] = None):
 
     # Traverse the playlist to get tracks for the desired playlists and mark
     # the rest for removal.
+    selected = set(playlists)
     for playlist in playlists:
         playlist_tracks.update(playlist.get_tracks())
         parent = playlist.get_parent()
         while parent:
             lineage[parent] = set()
             for child in list(parent):
-                if child not in playlists and child not in lineage:
+                if child not in selected and child not in lineage:
                     lineage[parent].add(child)
                     continue
             parent = parent.get_parent()
@@ -88,6 +92,7 @@ def copy_playlists(config: BaseConfig, path: Optional[Path] = None):
     payload = zip(
         playlist_tracks.values(),
         [config.collection.copy_playlists_destination] * len(playlist_tracks),
+        [collection] * len(playlist_tracks),
         strict=True,
     )
 
@@ -110,4 +115,6 @@ def copy_playlists(config: BaseConfig, path: Optional[Path] = None):
         )
 
     # Serialize the new collection.
-    _ = collection.serialize(path=path)
+    _ = collection.serialize(
+        path=path, splice=config.collection.collection_splice
+    )
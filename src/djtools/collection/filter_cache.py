@@ -0,0 +1,137 @@
+"""This module contains the class for the FilterCache.
+
+The same track often appears in many of the playlists that are filtered, such
+as the tag playlists and the combiner playlists built from the same tags.
+FilterCache memoizes the decisions of PlaylistFilters keyed by the filter, the
+context the filter prepared for a playlist, and the track's ID so that a
+filter decides on a track once for every distinct context rather than once for
+every playlist the track is in.
+
+The features of tracks that filters derive from their attributes, such as
+their genre tags in lower case, the tags that aren't genre tags, and the
+transition annotations in their comments, are likewise computed once for each
+track and shared by every filter.
+"""
+
+import re
+from typing import TYPE_CHECKING, Dict, FrozenSet, Hashable, Tuple
+
+from djtools.collection.base_track import Track
+
+if TYPE_CHECKING:  # pragma: no cover
+    from djtools.collection.playlist_filters import PlaylistFilter
+
+# Square bracket enclosed transition annotations in the comments of tracks.
+TRANSITION_REGEX = re.compile(r"\[([^]]+)\]")
+
+
+class FilterCache:
+    "Memoized decisions of PlaylistFilters and features of tracks."
+
+    def __init__(self):
+        "Constructor."
+        self._decisions: Dict[Tuple[Hashable, Hashable, str], bool] = {}
+        self._genre_tags: Dict[str, Tuple[str, ...]] = {}
+        self._other_tags: Dict[str, FrozenSet[str]] = {}
+        self._transitions: Dict[str, Tuple[str, ...]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def filter_tracks(
+        self,
+        playlist_filter: "PlaylistFilter",
+        context: Hashable,
+        tracks: Dict[str, Track],
+    ) -> Dict[str, Track]:
+        """Applies a PlaylistFilter to tracks.
+
+        The tracks that haven't been decided on with the same filter and
+        context are passed to the filter as a single batch.
+
+        Args:
+            playlist_filter: PlaylistFilter implementation.
+            context: Context returned by the filter's prepare method.
+            tracks: Dict of track IDs to the tracks of a playlist.
+
+        Returns:
+            Dict of the tracks that remain in the playlist in order.
+        """
+        undecided = {
+            track_id: track
+            for track_id, track in tracks.items()
+            if (playlist_filter, context, track_id) not in self._decisions
+        }
+        self._hits += len(tracks) - len(undecided)
+        self._misses += len(undecided)
+        if undecided:
+            mask = playlist_filter.filter_tracks(
+                context, list(undecided.values()), self
+            )
+            for track_id, keep in zip(undecided, mask):
+                self._decisions[(playlist_filter, context, track_id)] = keep
+
+        return {
+            track_id: track
+            for track_id, track in tracks.items()
+            if self._decisions[(playlist_filter, context, track_id)]
+        }
+
+    def get_cache_statistics(self) -> Tuple[int, int]:
+        """Gets the number of filter decisions reused and made.
+
+        Returns:
+            Tuple of the numbers of decisions on tracks which were reused and
+                which were made by filters.
+        """
+        return self._hits, self._misses
+
+    def get_genre_tags(self, track: Track) -> Tuple[str, ...]:
+        """Gets the genre tags of a track in lower case.
+
+        Args:
+            track: Track object.
+
+        Returns:
+            Lower case genre tags.
+        """
+        genre_tags = self._genre_tags.get(track.get_id())
+        if genre_tags is None:
+            genre_tags = self._genre_tags[track.get_id()] = tuple(
+                tag.lower() for tag in track.get_genre_tags()
+            )
+
+        return genre_tags
+
+    def get_other_tags(self, track: Track) -> FrozenSet[str]:
+        """Gets the tags of a track which aren't genre tags.
+
+        Args:
+            track: Track object.
+
+        Returns:
+            Set of non-genre tags.
+        """
+        other_tags = self._other_tags.get(track.get_id())
+        if other_tags is None:
+            other_tags = self._other_tags[track.get_id()] = frozenset(
+                track.get_tags()
+            ).difference(track.get_genre_tags())
+
+        return other_tags
+
+    def get_transitions(self, track: Track) -> Tuple[str, ...]:
+        """Gets the square bracket enclosed transition annotations of a track.
+
+        Args:
+            track: Track object.
+
+        Returns:
+            Contents of the annotations in the track's comments.
+        """
+        transitions = self._transitions.get(track.get_id())
+        if transitions is None:
+            transitions = self._transitions[track.get_id()] = tuple(
+                TRANSITION_REGEX.findall(track.get_comments())
+            )
+
+        return transitions
@@ -0,0 +1,116 @@
+"""This module contains the classes for the GenreIndex and TagLookup.
+
+"Pure" playlists contain the tracks with a tag whose genre tags all contain
+the sub-string indicated by the playlist's name. GenreIndex keeps the bitset
+of the tracks having each distinct genre tag so that, rather than testing
+every genre tag of every track with the tag, the tracks whose genre tags all
+contain a sub-string are found by testing each distinct genre tag once.
+
+The genre tags that don't contain a sub-string are those of the tracks which
+aren't pure, so the bitset of the pure tracks is the complement of the union
+of the bitsets of those genre tags. It's computed the first time a
+sub-string is queried, after which a "Pure" playlist is a single intersection
+of that bitset with the tracks having the tag.
+
+TagLookup is the lookup of tags and selectors to tracks that playlists are
+built from, which carries the GenreIndex of the collection's tracks so that
+every "Pure" playlist built from it shares one index.
+"""
+
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Optional
+
+from djtools.collection.base_track import Track
+from djtools.collection.track_set import TrackOrdinals, TrackSet
+
+
+class GenreIndex:  # pylint: disable=too-few-public-methods
+    "Bitsets of the tracks having each genre tag."
+
+    def __init__(self, tracks: Dict[str, Track]):
+        """Builds the bitsets from tracks.
+
+        Args:
+            tracks: Tracks keyed by their IDs.
+        """
+        self._ordinals = TrackOrdinals(tracks)
+        genres: Dict[str, List[str]] = defaultdict(list)
+        for track_id, track in tracks.items():
+            for genre in track.get_genre_tags():
+                genres[genre.lower()].append(track_id)
+        self._genres = {
+            genre: self._ordinals.get_bits(track_ids)
+            for genre, track_ids in genres.items()
+        }
+        self._pure: Dict[str, int] = {}
+
+    def _get_pure_bits(self, tag: str) -> int:
+        """Gets the bitset of the tracks whose genre tags all contain a tag.
+
+        Args:
+            tag: Sub-string of genre tags in lower case.
+
+        Returns:
+            Bitset of the pure tracks, which includes the tracks without
+                genre tags.
+        """
+        bits = self._pure.get(tag)
+        if bits is None:
+            impure = 0
+            for genre, genre_bits in self._genres.items():
+                if tag not in genre:
+                    impure |= genre_bits
+            bits = self._pure[tag] = ((1 << len(self._ordinals)) - 1) & ~impure
+
+        return bits
+
+    def get_tracks(self, tag: str, tracks: Mapping) -> TrackSet:
+        """Gets the tracks whose genre tags all contain a tag.
+
+        Args:
+            tag: Sub-string of genre tags, which is matched regardless of
+                case.
+            tracks: Mapping of the IDs of indexed tracks to tracks to select
+                the pure tracks from.
+
+        Returns:
+            TrackSet of the pure tracks in the order of the indexed tracks.
+        """
+        pure_tracks = TrackSet(
+            self._ordinals, self._get_pure_bits(tag.lower())
+        )
+
+        return pure_tracks & tracks
+
+
+class TagLookup(defaultdict):
+    "Lookup of tags and selectors to tracks with the GenreIndex of its tracks."
+
+    def __init__(
+        self,
+        tags_tracks: Dict[str, Dict[str, Track]],
+        index_genres: Callable[[], GenreIndex],
+    ):
+        """Constructor.
+
+        Args:
+            tags_tracks: Dict of tags to tracks whose dicts of tracks are
+                shared rather than copied.
+            index_genres: Function that gets the GenreIndex of the tracks,
+                which is called the first time the index is needed.
+        """
+        super().__init__(dict, tags_tracks)
+        self._index_genres = index_genres
+        self._genre_index: Optional[GenreIndex] = None
+
+    def get_genre_index(self) -> GenreIndex:
+        """Gets the GenreIndex of the tracks in the lookup.
+
+        Returns:
+            GenreIndex of the tracks.
+        """
+        if self._genre_index is None:
+            self._genre_index = self._index_genres()
+
+        return self._genre_index
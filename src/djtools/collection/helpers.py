@@ -14,14 +14,25 @@ from dateutil.relativedelta import relativedelta
 from djtools.collection.base_collection import Collection
 from djtools.collection.base_playlist import Playlist
 from djtools.collection.base_track import Track
+from djtools.collection.combiner_expression import (
+    NUMERICAL_SELECTOR_REGEX,
+    STRING_SELECTOR_REGEX,
+    CombinerEvaluator,
+)
 from djtools.collection.config import (
     PlaylistConfig,
     PlaylistConfigContent,
     PlaylistName,
 )
+from djtools.collection.filter_cache import FilterCache
+from djtools.collection.genre_index import GenreIndex, TagLookup
 from djtools.collection.playlist_filters import PlaylistFilter
+from djtools.collection.range_index import RangeIndex
+from djtools.collection.track_set import TrackOrdinals, TrackSet
 from djtools.utils.helpers import make_path
 
+# pylint: disable=too-many-lines
+
 logger = logging.getLogger(__name__)
 
 # Constants for numerical selector validation
@@ -31,8 +42,14 @@ MAX_RATING = 5
 MIN_BPM = 6
 MAX_BPM = 999
 MIN_YEAR = 1000  # Years are 4 digits (1000+)
-NUMERICAL_SELECTOR_REGEX = re.compile(r"(?<=\[)[^\[\]]*(?=\])")
-STRING_SELECTOR_REGEX = re.compile(r"(?<={)[^{}]+:[^{}]+(?=})")
+# Fields that numerical selectors without a field select tracks by.
+UNTYPED_SELECTOR_FIELDS = ("bpm", "rating", "year")
+TYPED_NUMERICAL_SELECTOR_REGEX = re.compile(
+    r"^(?P<field>\w+)\s*:\s*(?:"
+    r"(?P<inequality>>=|>|<=|<)\s*(?P<bound>\d+)"
+    r"|(?P<low>\d+)(?:\s*-\s*(?P<high>\d+))?"
+    r")$"
+)
 DATE_SELECTOR_REGEX = re.compile(r"(>=|>|<=|<)")
 TIMEDELTA_REGEX = re.compile(
     r"^("
@@ -41,12 +58,7 @@ TIMEDELTA_REGEX = re.compile(
     r"((?P<weeks>[\.\d]+?)w)?"
     r"((?P<days>[\.\d]+?)d)?$"
 )
-INEQUALITY_MAP = {
-    ">": lambda x, y: x > y,
-    "<": lambda x, y: x < y,
-    ">=": lambda x, y: x >= y,
-    "<=": lambda x, y: x <= y,
-}
+DATE_FORMAT_UNITS = {"%Y-%m-%d": "D", "%Y-%m": "M", "%Y": "Y"}
 
 
 # #############################################################################
@@ -56,18 +68,26 @@ INEQUALITY_MAP = {
 
 
 @make_path
-def copy_file(track: Track, destination: Path):
+def copy_file(
+    track: Track,
+    destination: Path,
+    collection: Optional[Collection] = None,
+):
     """Copies a track to a destination and updates its location.
 
     Args:
         track: Track object.
         destination: Directory to copy tracks to.
+        collection: Collection of the track whose location index is updated.
     """
     loc = track.get_location()
     dest = destination / loc.name
     if not dest.exists():
         shutil.copyfile(loc.as_posix(), dest)
-    track.set_location(dest)
+    if collection is None:
+        track.set_location(dest)
+    else:
+        collection.set_location(track, dest)
 
 
 # #############################################################################
@@ -81,12 +101,11 @@ def copy_file(track: Track, destination: Path):
 #   - add_selectors_to_tags: parses combiner playlist names and finds numerical
 #       and string selectors to update the tag -> track lookup
 #   - parse_numerical_selectors: used to parse numerical selectors like
-#       ratings, BPMs, and years
+#       ratings, BPMs, and years, optionally typed with the field they select
 #   - build_combiner_playlists: builds collection playlists using "combiner"
 #       component of the PlaylistConfig
 #   - parse_expression: evaluates the boolean algebra logic in combiner
 #       playlists names to populate them with the appropriate tracks
-#   - BooleanNode: used to build and evaluate the boolean algebra parse tree
 #   - print_playlists_tag_statistics: prints ASCII histograms showing tag
 #       frequencies in combiner playlists split by genre and other tag types
 #   - scale_data: scales tag frequencies to normalize histogram height
@@ -113,7 +132,8 @@ def _build_pure_tag_playlist(
     Args:
         tag: The tag to create a pure playlist for (e.g., "Techno").
         name: The name to give the playlist.
-        tags_tracks: Dict of tags to tracks.
+        tags_tracks: Dict of tags to tracks. If it's a TagLookup, its
+            GenreIndex is used rather than indexing the tracks with the tag.
         playlist_class: Playlist implementation class.
         minimum_tracks: Required number of tracks to make a playlist.
         enable_aggregation: Whether to enable aggregation for this playlist.
@@ -130,11 +150,12 @@ def _build_pure_tag_playlist(
         return None
 
     # Filter out tracks that aren't pure.
-    pure_tag_tracks = {
-        track_id: track
-        for track_id, track in tracks_with_tag.items()
-        if all(tag.lower() in _.lower() for _ in track.get_genre_tags())
-    }
+    genre_index = (
+        tags_tracks.get_genre_index()
+        if isinstance(tags_tracks, TagLookup)
+        else GenreIndex(tracks_with_tag)
+    )
+    pure_tag_tracks = genre_index.get_tracks(tag, tracks_with_tag)
     if not pure_tag_tracks:
         logger.warning(
             f'Can\'t make a "Pure {tag}" playlist because there are no '
@@ -163,7 +184,8 @@ def build_tag_playlists(
 
     Args:
         content: A component of a playlist config to create a playlist for.
-        tags_tracks: Dict of tags to tracks.
+        tags_tracks: Dict of tags to tracks. If it's a TagLookup, every
+            "Pure" playlist in the config shares its GenreIndex.
         playlist_class: Playlist implementation class.
         tag_set: A set of tags seen while creating playlists. This is used to
             indicate which tags should be ignored when creating the
@@ -267,6 +289,7 @@ def build_combiner_playlists(
     tags_tracks: Dict[str, Dict[str, Track]],
     playlist_class: Playlist,
     minimum_tracks: Optional[int] = None,
+    evaluator: Optional[CombinerEvaluator] = None,
 ) -> Optional[Playlist]:
     """Recursively traverses a playlist config to generate playlists from tags.
 
@@ -275,6 +298,8 @@ def build_combiner_playlists(
         tags_tracks: Dict of tags to tracks.
         playlist_class: Playlist implementation class.
         minimum_tracks: Required number of tracks to make a playlist.
+        evaluator: CombinerEvaluator over tags_tracks shared by every
+            playlist in the config.
 
     Raises:
         ValueError: The user's playlist config must not be malformed.
@@ -295,11 +320,12 @@ def build_combiner_playlists(
         tag_content = name = content
     if isinstance(content, PlaylistConfigContent):
         enable_aggregation = content.enable_aggregation
+    evaluator = evaluator or CombinerEvaluator(tags_tracks)
 
     # This is not a folder so a playlist with tracks must be created.
     if isinstance(content, (PlaylistName, str)):
         try:
-            tracks = parse_expression(tag_content, tags_tracks)
+            tracks = parse_expression(tag_content, tags_tracks, evaluator)
         except Exception as exc:
             logger.warning(f"Error parsing expression: {tag_content}\n{exc}")
             return None
@@ -319,6 +345,7 @@ def build_combiner_playlists(
             tags_tracks,
             playlist_class,
             minimum_tracks=minimum_tracks,
+            evaluator=evaluator,
         )
         if playlist:
             playlists.append(playlist)
@@ -338,44 +365,75 @@ def build_combiner_playlists(
     )
 
 
-def filter_tag_playlists(
-    playlist: Playlist, playlist_filters: List[PlaylistFilter]
+def _filter_playlists(
+    playlist: Playlist,
+    playlist_filters: List[PlaylistFilter],
+    filter_cache: FilterCache,
 ) -> None:
-    """Applies a list of PlaylistFilter implementations to the playlist.
-
-    If the PlaylistFilter implementations' is_filter_playlist method evaluates
-    to True, then the filter_track method is applied to each track in the
-    playlist. The playlist's tracks are set to remove the tracks that have been
-    filtered out.
+    """Recursively applies a list of PlaylistFilter implementations.
 
     Args:
         playlist: Playlist to potentially have its tracks filtered.
         playlist_filters: A list of PlaylistFilter implementations used to
             filter playlist tracks.
+        filter_cache: FilterCache of the decisions of the filters.
     """
     # This is a folder so filter its playlists.
     if playlist.is_folder():
         for _playlist in playlist:
-            filter_tag_playlists(_playlist, playlist_filters)
+            _filter_playlists(_playlist, playlist_filters, filter_cache)
         return
 
     # Apply each PlaylistFilter to this playlist.
     for playlist_filter in playlist_filters:
-        if not playlist_filter.is_filter_playlist(playlist):
+        context = playlist_filter.prepare(playlist)
+        if context is None:
             continue
         playlist.set_tracks(
-            tracks={
-                track_id: track
-                for track_id, track in playlist.get_tracks().items()
-                if playlist_filter.filter_track(track)
-            },
+            tracks=filter_cache.filter_tracks(
+                playlist_filter, context, playlist.get_tracks()
+            ),
         )
 
 
+def filter_tag_playlists(
+    playlist: Playlist,
+    playlist_filters: List[PlaylistFilter],
+    collection: Optional[Collection] = None,
+) -> None:
+    """Applies a list of PlaylistFilter implementations to the playlist.
+
+    Each PlaylistFilter implementation prepares a context for the playlist
+    and, if the playlist is to be filtered, its filter_tracks method is applied
+    to the playlist's tracks as a single batch. The playlist's tracks are set
+    to remove the tracks that have been filtered out.
+
+    Decisions of filters on tracks are memoized by the filter, its context,
+    and the track so that tracks shared by playlists with the same context
+    are only decided on once.
+
+    Args:
+        playlist: Playlist to potentially have its tracks filtered.
+        playlist_filters: A list of PlaylistFilter implementations used to
+            filter playlist tracks.
+        collection: Collection whose FilterCache is used to memoize
+            decisions.
+    """
+    filter_cache = (
+        collection.get_filter_cache()
+        if collection is not None
+        else FilterCache()
+    )
+    _filter_playlists(playlist, playlist_filters, filter_cache)
+    hits, misses = filter_cache.get_cache_statistics()
+    logger.debug(f"Reused {hits} of {hits + misses} playlist filter decisions")
+
+
 def aggregate_playlists(
     playlist: Playlist,
     playlist_class: Playlist,
     minimum_tracks: Optional[int] = None,
+    ordinals: Optional[TrackOrdinals] = None,
 ) -> Dict[str, Track]:
     """Recursively aggregate tracks from folders into "All" playlists.
 
@@ -383,6 +441,9 @@ def aggregate_playlists(
         playlist: Playlist which may be a folder or not.
         playlist_class: Playlist implementation class.
         minimum_tracks: Required number of tracks to make a playlist.
+        ordinals: Ordinals of the collection's tracks. If provided, the tracks
+            already aggregated are tracked as a bitset so that each playlist
+            only adds the tracks that aren't in it.
 
     Returns:
         Dict of tracks.
@@ -392,13 +453,44 @@ def aggregate_playlists(
         return playlist.get_tracks() if playlist.aggregate() else {}
 
     # Recursively get tracks from each playlist within this folder.
-    aggregate_tracks = {
-        track_id: track
-        for p in playlist
-        for track_id, track in aggregate_playlists(
-            p, playlist_class, minimum_tracks
-        ).items()
-    }
+    if ordinals is not None:
+        aggregate_tracks = {}
+        aggregate_bits = 0
+        for p in playlist:
+            tracks = aggregate_playlists(
+                p, playlist_class, minimum_tracks, ordinals
+            )
+            if not tracks:
+                continue
+            bits = (
+                tracks.get_bits()
+                if isinstance(tracks, TrackSet)
+                else ordinals.get_bits(tracks)
+            )
+            new_bits = bits & ~aggregate_bits
+            if not new_bits:
+                continue
+            aggregate_bits |= new_bits
+
+            # Tracks are added in the order they first appear in the
+            # playlists, skipping those already added.
+            if new_bits == bits:
+                aggregate_tracks.update(tracks.items())
+                continue
+            wanted = set(ordinals.iter_ordinals(new_bits))
+            aggregate_tracks.update(
+                (track_id, track)
+                for track_id, track in tracks.items()
+                if ordinals.get_ordinal(track_id) in wanted
+            )
+    else:
+        aggregate_tracks = {
+            track_id: track
+            for p in playlist
+            for track_id, track in aggregate_playlists(
+                p, playlist_class, minimum_tracks
+            ).items()
+        }
 
     playlist_too_small = (
         minimum_tracks and len(aggregate_tracks) < minimum_tracks
@@ -417,11 +509,44 @@ def aggregate_playlists(
     return aggregate_tracks
 
 
+def _get_string_selector_tracks(
+    selector: Tuple[str, Union[str, Tuple]], collection: Collection
+) -> Dict[str, Track]:
+    """Gets the tracks matching a string selector.
+
+    Date selectors are evaluated by bisecting the collection's sorted index
+    of the dates that tracks were added. Artist, comment, key, and label
+    selectors are looked up in the collection's inverted indexes of those
+    attributes, with wildcards resolved against the distinct values in the
+    index rather than against every track.
+
+    Args:
+        selector: Tuple of the selector's type and value.
+        collection: Collection object.
+
+    Returns:
+        Dict of track IDs to tracks matching the selector.
+    """
+    selector_type, selector_value = selector
+    if selector_type == "date":
+        inequality, date, date_format = selector_value
+        return collection.get_range_index().get_date_tracks(
+            date, DATE_FORMAT_UNITS[date_format], inequality
+        )
+
+    track_index = collection.get_track_index()
+    if "*" in selector_value:
+        return track_index.match(selector_type, selector_value)
+
+    return track_index.get_tracks(selector_type, selector_value)
+
+
 def add_selectors_to_tags(
     content: Union[PlaylistConfigContent, PlaylistName, str],
     tags_tracks: Dict[str, Dict[str, Track]],
     collection: Collection,
     auto_playlists: List[Playlist],
+    timedeltas: Optional[Dict[str, Optional[datetime]]] = None,
 ):
     """Recursively update the track lookup with selectors.
 
@@ -430,12 +555,16 @@ def add_selectors_to_tags(
         tags_tracks: Dict of tags to tracks.
         collection: Collection object.
         auto_playlists: Tag playlists built in this same run.
+        timedeltas: Dict of the timedelta strings of date selectors to the
+            dates they're relative to, shared by every playlist in the run.
     """
+    timedeltas = {} if timedeltas is None else timedeltas
+
     # This is a folder so parse selectors from playlists within it.
     if isinstance(content, PlaylistConfigContent):
         for playlist in content.playlists:
             add_selectors_to_tags(
-                playlist, tags_tracks, collection, auto_playlists
+                playlist, tags_tracks, collection, auto_playlists, timedeltas
             )
         return
 
@@ -466,60 +595,27 @@ def add_selectors_to_tags(
         string_value_lookup,
         string_selector_type_map,
         playlists,
+        timedeltas,
     )
 
-    # Add keys for numerical selectors for tracks having those values.
-    for value, tag in numerical_value_lookup.items():
+    # Add keys for numerical selectors for tracks having those values, which
+    # are found by bisecting the sorted indexes of the selected fields.
+    for tag, (fields, low, high) in numerical_value_lookup.items():
         if tag in tags_tracks:
             continue
 
-        for track_id, track in collection.get_tracks().items():
-            values = map(
-                str,
-                [round(track.get_bpm()), track.get_rating(), track.get_year()],
-            )
-            for val in values:
-                if (isinstance(value, str) and value == val) or (
-                    isinstance(value, tuple) and val in value
-                ):
-                    tags_tracks[tag][track_id] = track
+        tracks = collection.get_range_index().get_tracks(fields, low, high)
+        if tracks:
+            tags_tracks[tag].update(tracks)
 
     # Add keys for string selectors for tracks having those values.
     for selector, tag in string_value_lookup.items():
         if tag in tags_tracks:
             continue
 
-        selector_type, selector_value = selector
-        for track_id, track in collection.get_tracks().items():
-            value = getattr(track, string_selector_type_map[selector_type])()
-            if not value:
-                continue
-            if selector_type == "date":
-                inequality, date, date_format = selector_value
-                if not inequality:
-                    if value.strftime(date_format) == date.strftime(
-                        date_format
-                    ):
-                        tags_tracks[tag][track_id] = track
-                    continue
-                # In order for inequalities with lower precision levels than
-                # YYYY-MM-DD to work properly, the date added value for the
-                # track must be converted to the lower precision string and
-                # back into a datetime object.
-                value = datetime.strptime(
-                    value.strftime(date_format), date_format
-                )
-                if not inequality(value, date):
-                    continue
-                tags_tracks[tag][track_id] = track
-                continue
-            if "*" in selector_value:
-                exp = re.compile(r".*".join(selector_value.lower().split("*")))
-                if re.search(exp, value.lower()):
-                    tags_tracks[tag][track_id] = track
-                    continue
-            if value.lower() == selector_value.lower():
-                tags_tracks[tag][track_id] = track
+        tracks = _get_string_selector_tracks(selector, collection)
+        if tracks:
+            tags_tracks[tag].update(tracks)
 
     # Get playlists for the identified playlist selectors. Not only must we get
     # playlists from the collection, but we must also get playlists from the
@@ -538,56 +634,146 @@ def add_selectors_to_tags(
                 tags_tracks[playlist_key].update(playlist.get_tracks())
 
 
+def _parse_typed_numerical_selector(
+    match: str,
+) -> Optional[Tuple[Tuple[str, ...], Optional[int], Optional[int]]]:
+    """Parses a numerical selector typed with the field that it selects.
+
+    Args:
+        match: Numerical string such as "bpm:120-130" or "playcount:>10".
+
+    Returns:
+        Tuple of the selected field and the inclusive bounds of the values
+            selected, which are None if the range is unbounded, or None if the
+            selector is invalid.
+    """
+    parts = re.match(TYPED_NUMERICAL_SELECTOR_REGEX, match.strip())
+    if not parts:
+        logger.error(f"Malformed numerical selector: {match}")
+        return None
+
+    field = parts["field"].lower()
+    if field not in RangeIndex.FIELDS:
+        logger.warning(f"{field} is not a supported selector!")
+        return None
+
+    # Values of every indexed field are integers so strict inequalities are
+    # the inclusive bounds one past their value.
+    if parts["inequality"]:
+        bound = int(parts["bound"])
+        return {
+            ">": ((field,), bound + 1, None),
+            ">=": ((field,), bound, None),
+            "<": ((field,), None, bound - 1),
+            "<=": ((field,), None, bound),
+        }[parts["inequality"]]
+
+    low = int(parts["low"])
+    high = int(parts["high"] or low)
+
+    return (field,), min(low, high), max(low, high)
+
+
 def parse_numerical_selectors(
     numerical_matches: List[str],
-    numerical_value_lookup: Dict[Union[str, Tuple], str],
+    numerical_value_lookup: Dict[
+        str, Tuple[Tuple[str, ...], Optional[int], Optional[int]]
+    ],
 ) -> Set[str]:
     """Parses a string match of one or more numerical selectors.
 
+    Numerical selectors without a field, such as "[130-150]", select tracks
+    whose rounded BPM, rating, or year is within the range. Typed numerical
+    selectors, such as "[bpm:120-130]" or "[playcount:>10]", select tracks by
+    the value of the field of the RangeIndex that they name.
+
     Args:
         numerical_matches: List of numerical strings.
-        numerical_value_lookup: Empty dict to populate with tuples or strings
-            mapping numerical ranges or values to their "tag" representation.
+        numerical_value_lookup: Empty dict to populate with the "tag"
+            representation of selectors mapping to tuples of the fields they
+            select tracks by and the inclusive bounds of the values selected.
 
     Returns:
-        Set of numerical selector values.
+        Set of the values of numerical selectors without a field.
     """
     numerical_values = set()
     for match in numerical_matches:
-        _range = None
+        if ":" in match:
+            selector = _parse_typed_numerical_selector(match)
+            if selector:
+                numerical_value_lookup[f"[{match}]"] = selector
+            continue
+
         # If "match" is a digit, then it's an explicit numerical value.
         if match.isdigit():
             numerical_values.add(match)
+            # Only values in canonical form can match the string
+            # representation of a track's values.
+            if str(int(match)) != match:
+                continue
+            low = high = int(match)
         # If "match" is two digits separated by a "-", then it's a range.
         elif len(match.split("-")) == RANGE_SPLIT_PARTS and all(
             x.isdigit() for x in match.split("-")
         ):
-            _range = list(map(int, match.split("-")))
-            _range = range(min(_range), max(_range) + 1)
+            low, high = sorted(map(int, match.split("-")))
             if not (
-                all(MIN_RATING <= x <= MAX_RATING for x in _range)
-                or all(MIN_BPM <= x <= MAX_BPM for x in _range)
-                or all(x >= MIN_YEAR for x in _range)
+                MIN_RATING <= low <= high <= MAX_RATING
+                or MIN_BPM <= low <= high <= MAX_BPM
+                or low >= MIN_YEAR
             ):
                 logger.error(f"Bad numerical range selector: {match}")
                 continue
-            numerical_values.update(map(str, _range))
+            numerical_values.update(map(str, range(low, high + 1)))
         else:
             logger.error(f"Malformed numerical selector: {match}")
             continue
 
-        numerical_value_lookup[tuple(map(str, _range or [])) or match] = (
-            f"[{match}]"
+        numerical_value_lookup[f"[{match}]"] = (
+            UNTYPED_SELECTOR_FIELDS,
+            low,
+            high,
         )
 
     return numerical_values
 
 
+def _parse_date(
+    part: str, timedeltas: Dict[str, Optional[datetime]]
+) -> Tuple[Optional[datetime], str]:
+    """Parses the date of a date selector.
+
+    Args:
+        part: Timedelta string or ISO format date string.
+        timedeltas: Dict of timedelta strings to the dates they're relative
+            to, which is updated with the part if it's a timedelta string.
+
+    Returns:
+        Tuple of the date, or None if the part isn't a date, and the format
+            whose precision the date has.
+    """
+    # The part may be a timedelta string...
+    if part not in timedeltas:
+        timedeltas[part] = parse_timedelta(part)
+    if timedeltas[part]:
+        return timedeltas[part], "%Y-%m-%d"
+
+    # ...but if it wasn't, it's probably an ISO format date string.
+    for date_format in ["%Y-%m-%d", "%Y-%m", "%Y"]:
+        try:
+            return datetime.strptime(part, date_format), date_format
+        except ValueError:
+            continue
+
+    return None, "%Y-%m-%d"
+
+
 def parse_string_selectors(
     string_matches: List[str],
     string_value_lookup: Dict[Union[str, Tuple], str],
     string_selector_type_map: Dict[str, str],
     playlists: Set[str],
+    timedeltas: Optional[Dict[str, Optional[datetime]]] = None,
 ):
     """Parses a string match of one or more string selectors.
 
@@ -597,8 +783,11 @@ def parse_string_selectors(
             selectors to their "tag" representation.
         string_selector_type_map: Maps a selector type to a Track method name.
         playlists: Set for storing playlist names.
+        timedeltas: Dict of timedelta strings to the dates they're relative
+            to, which are parsed once so that date selectors are relative to
+            the same moment.
     """
-    date_formats = ["%Y-%m-%d", "%Y-%m", "%Y"]
+    timedeltas = {} if timedeltas is None else timedeltas
 
     for match in string_matches:
         selector_type, selector_value = map(str.strip, match.split(":"))
@@ -619,25 +808,12 @@ def parse_string_selectors(
         for part in filter(
             None, re.split(DATE_SELECTOR_REGEX, selector_value)
         ):
-            date = None
-            date_format = "%Y-%m-%d"
-
             # Note if the part is an inequality and move onto the next part.
             if re.search(DATE_SELECTOR_REGEX, part):
-                inequalities.append(INEQUALITY_MAP[part])
+                inequalities.append(part)
                 continue
 
-            # The following part may be a timedelta string...
-            date = parse_timedelta(part)
-
-            # ...but if it wasn't, it's probably an ISO format date string.
-            if not date:
-                for date_format in date_formats:
-                    try:
-                        date = datetime.strptime(part, date_format)
-                    except ValueError:
-                        continue
-                    break
+            date, date_format = _parse_date(part, timedeltas)
 
             # If there's no date, then the selector wasn't formatted correctly.
             if not date:
@@ -708,173 +884,24 @@ def parse_timedelta(time_str) -> Optional[datetime]:
 
 
 def parse_expression(
-    expression: str, tags_tracks: Dict[str, Dict[str, Track]]
+    expression: str,
+    tags_tracks: Dict[str, Dict[str, Track]],
+    evaluator: Optional[CombinerEvaluator] = None,
 ) -> Dict[str, Track]:
-    """Parses a boolean algebra expression by constructing a tree.
+    """Parses a boolean algebra expression by compiling it into a tree.
 
     Args:
         expression: String representing boolean algebra expression.
         tags_tracks: Dict of tags to tracks.
+        evaluator: CombinerEvaluator over the same dict of tags to tracks
+            which is reused to evaluate many expressions.
 
     Returns:
         Dict of track IDs and tracks.
     """
-    node = BooleanNode(tags_tracks)
-    tag = ""
-    for char in expression:
-        if char == "(":
-            node = BooleanNode(tags_tracks, parent=node)
-        elif node.is_operator(char):
-            tag = node.add_operand(tag)
-            node.add_operator(char)
-        elif char == ")":
-            tag = node.add_operand(tag)
-            tracks = node.evaluate()
-            node = node.get_parent()
-            if tracks:
-                node.add_operand(tracks)
-        else:
-            tag += char
-    tag = node.add_operand(tag)
-
-    return node.evaluate()
-
-
-class BooleanNode:
-    """Node that contains boolean logic for a sub-expression."""
-
-    def __init__(
-        self,
-        tags_tracks: Dict[str, Dict[str, Track]],
-        parent: Optional["BooleanNode"] = None,
-    ):
-        """Constructor.
-
-        Args:
-            tags_tracks: Dict of tags to tracks.
-            parent: BooleanNode of which this node is a sub-expression.
-        """
-        self._ops = {
-            "&": set.intersection,
-            "|": set.union,
-            "~": set.difference,
-        }
-        self._parent = parent
-        self._operators = []
-        self._operands = []
-        self._tags_tracks = tags_tracks
-
-    def _get_tracks(self, tag: str) -> Set[str]:
-        """Gets set of track IDs for the provided tag.
-
-        If the tag contains a wildcard, denoted with "*", then the union of
-        track IDs with a tag containing the provided tag as a sub-string is
-        returned.
-
-        Args:
-            tag: Tag for indexing tracks.
-
-        Returns:
-            Set of track IDs for the provided tag.
-        """
-        if "*" in tag and not (
-            re.search(NUMERICAL_SELECTOR_REGEX, tag)
-            or re.search(STRING_SELECTOR_REGEX, tag)
-        ):
-            exp = re.compile(r".*".join(tag.split("*")) + "$")
-            tracks = {}
-            for key in self._tags_tracks:
-                if re.match(exp, key):
-                    tracks.update(self._tags_tracks[key])
-            return tracks
-
-        return self._tags_tracks.get(tag, {})
-
-    def add_operand(self, operand: str) -> str:
-        """Add operand to BooleanNode.
-
-        Args:
-            operand: Tag or track set to be evaluated.
-
-        Returns:
-            Empty string to reset tag in the parse_expression function.
-        """
-        if isinstance(operand, str):
-            operand = operand.strip()
-            if not operand:
-                return ""
-        self._operands.append(operand)
-
-        return ""
-
-    def add_operator(self, operator: str):
-        """Adds a set operation to the BooleanNode.
-
-        Args:
-            operator: Character representing a set operation.
-        """
-        self._operators.append(self._ops[operator])
-
-    def evaluate(self) -> Dict[str, Track]:
-        """Applies operators to the operands to produce a dict of tracks.
-
-        Raises:
-            RuntimeError: The boolean expression is malformed. It must contain
-                one less operator than there are operands.
-
-        Returns:
-            A dict of tracks reduced from the boolean expression.
-        """
-        if len(self._operators) + 1 != len(self._operands):
-            operands = [
-                x if isinstance(x, str) else str(len(x)) + " tracks"
-                for x in self._operands
-            ]
-            raise RuntimeError(
-                "Invalid boolean expression:\n"
-                f"\toperands: {operands}\n"
-                f"\toperators: {[x.__name__ for x in self._operators]}"
-            )
-        while self._operators:
-            tracks_a = (
-                self._operands.pop(0)
-                if not isinstance(self._operands[0], str)
-                else self._get_tracks(tag=self._operands.pop(0))
-            )
-            tracks_b = (
-                self._operands.pop(0)
-                if not isinstance(self._operands[0], str)
-                else self._get_tracks(tag=self._operands.pop(0))
-            )
-            operator = self._operators.pop(0)
-            track_ids = operator(set(tracks_a), set(tracks_b))
-            tracks = {
-                track_id: track
-                for track_id, track in {**tracks_a, **tracks_b}.items()
-                if track_id in track_ids
-            }
-            self._operands.insert(0, tracks)
-
-        return next(iter(self._operands), set())
-
-    def get_parent(self) -> "BooleanNode":
-        """Gets the parent of the BooleanNode.
-
-        Returns:
-            Parent BooleanNode.
-        """
-        return self._parent
-
-    def is_operator(self, char: str) -> bool:
-        """Checks if a character is one that represents a set operation.
-
-        Args:
-            char: Character that may represent a set operation.
-
-        Returns:
-            Whether or not the character is an operator.
-        """
-        return char in self._ops
+    evaluator = evaluator or CombinerEvaluator(tags_tracks)
+
+    return evaluator.evaluate(expression)
 
 
 def print_playlists_tag_statistics(combiner_playlists: Playlist) -> None:
@@ -0,0 +1,464 @@
+"""This module contains the class for the ParallelPlaylistBuilder.
+
+Given the lookup of tags and selectors to tracks, each top-level folder of
+the "tags" and "combiner" sections of a playlist config is built
+independently of the others. ParallelPlaylistBuilder partitions those folders
+across a pool of processes which each hold a read-only copy of the lookup.
+
+Tracks never cross process boundaries: the lookup is sent to each process
+once, as lists of the ordinals of the tracks in the collection, and processes
+return the playlists they build as PlaylistTrees of ordinals. The trees are
+stitched together in the order of the config into the same playlists that
+building the config in a single process produces.
+
+When combiner playlists are cached, the cached results are sent to each
+process in terms of ordinals, along with the fingerprints of the tags'
+tracks, and processes return the results that each folder used so that they
+are saved with the cache.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+from djtools.collection.base_playlist import Playlist
+from djtools.collection.base_track import Track
+from djtools.collection.combiner_expression import CombinerEvaluator
+from djtools.collection.config import PlaylistConfigContent, PlaylistName
+from djtools.collection.genre_index import GenreIndex, TagLookup
+from djtools.collection.helpers import (
+    build_combiner_playlists,
+    build_tag_playlists,
+)
+from djtools.collection.playlist_cache import PlaylistCache
+from djtools.collection.track_index import TrackIndex
+from djtools.collection.track_set import TrackOrdinals
+
+logger = logging.getLogger(__name__)
+
+# Lookup of tags to tracks held by each worker process.
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+class PlaylistTree(NamedTuple):
+    "Playlist whose tracks are the ordinals of tracks in the collection."
+
+    name: str
+    enable_aggregation: bool
+    playlists: Optional[List["PlaylistTree"]] = None
+    tracks: Optional[List[int]] = None
+
+
+class _TrackStub:  # pylint: disable=too-few-public-methods
+    "Stand-in for a track holding the genre tags that Pure playlists need."
+
+    __slots__ = ("_genres",)
+
+    def __init__(self):
+        "Constructor."
+        self._genres: List[str] = []
+
+    def get_genre_tags(self) -> List[str]:
+        """Gets the genre tags of the track.
+
+        Returns:
+            List of genre tags.
+        """
+        return self._genres
+
+
+def _build_folder(
+    content: Union[PlaylistConfigContent, PlaylistName, str],
+    combiner: bool,
+    minimum_tracks: Optional[int],
+) -> Tuple[
+    Optional[PlaylistTree],
+    Set[str],
+    Tuple[int, int],
+    Optional[Tuple[Dict[str, Tuple[Dict[str, str], List[int]]], int, int]],
+]:
+    """Builds the playlists of a top-level folder in a worker process.
+
+    Args:
+        content: Component of the playlist config to build.
+        combiner: Whether the content is in the "combiner" section of the
+            playlist config rather than the "tags" section.
+        minimum_tracks: Required number of tracks to make a playlist.
+
+    Returns:
+        Tuple of the PlaylistTree or None, the tags seen, the number of
+            combiner sub-expression results that were reused and evaluated,
+            and the cached results of combiner playlists used, if they're
+            cached, from PlaylistCache.pop_used.
+    """
+    tag_set = set()
+    statistics = (0, 0)
+    used = None
+    if combiner:
+        evaluator = _WORKER_STATE["evaluator"]
+        hits, misses = evaluator.get_cache_statistics()
+        playlist = build_combiner_playlists(
+            content,
+            _WORKER_STATE["tags_tracks"],
+            _WORKER_STATE["playlist_class"],
+            minimum_tracks=minimum_tracks,
+            evaluator=evaluator,
+        )
+        # The evaluator is shared by the folders built in this process.
+        statistics = tuple(
+            after - before
+            for after, before in zip(
+                evaluator.get_cache_statistics(), (hits, misses)
+            )
+        )
+        if _WORKER_STATE["cache"] is not None:
+            used = _WORKER_STATE["cache"].pop_used()
+    else:
+        playlist = build_tag_playlists(
+            content,
+            _WORKER_STATE["tags_tracks"],
+            _WORKER_STATE["playlist_class"],
+            tag_set,
+            minimum_tracks=minimum_tracks,
+        )
+
+    return _to_tree(playlist), tag_set, statistics, used
+
+
+def _initialize(
+    lookup: Dict[str, List[int]],
+    genres: Dict[str, List[int]],
+    size: int,
+    playlist_class: Playlist,
+    cache: Optional[Tuple[PlaylistCache, Dict[str, str]]],
+):
+    """Initializes the lookup of tags to tracks of a worker process.
+
+    Args:
+        lookup: Dict of tags and selectors to the ordinals of their tracks.
+        genres: Dict of genre tags to the ordinals of their tracks.
+        size: Number of tracks in the collection.
+        playlist_class: Playlist implementation class.
+        cache: Tuple of the PlaylistCache of combiner playlists, whose tracks
+            are ordinals, and the fingerprints of the tracks of the tags and
+            selectors in the lookup, or None.
+    """
+    tracks = [_TrackStub() for _ in range(size)]
+    for genre, ordinals in genres.items():
+        for ordinal in ordinals:
+            tracks[ordinal].get_genre_tags().append(genre)
+    tags_tracks = TagLookup({}, partial(GenreIndex, dict(enumerate(tracks))))
+    for tag, ordinals in lookup.items():
+        tags_tracks[tag] = {ordinal: tracks[ordinal] for ordinal in ordinals}
+    # Fingerprints are of the IDs of the collection's tracks, which workers
+    # don't have, so that they match those of the cached results.
+    playlist_cache, fingerprints = cache or (None, None)
+    _WORKER_STATE.update(
+        cache=playlist_cache,
+        evaluator=CombinerEvaluator(
+            tags_tracks,
+            TrackOrdinals(dict(enumerate(tracks))),
+            playlist_cache,
+            fingerprints,
+        ),
+        playlist_class=playlist_class,
+        tags_tracks=tags_tracks,
+    )
+
+
+def _to_tree(playlist: Optional[Playlist]) -> Optional[PlaylistTree]:
+    """Converts a playlist built by a worker process into a PlaylistTree.
+
+    Args:
+        playlist: Playlist whose tracks are keyed by their ordinals or None.
+
+    Returns:
+        PlaylistTree or None.
+    """
+    if playlist is None:
+        return None
+
+    # pylint: disable=protected-access
+    if playlist.is_folder():
+        return PlaylistTree(
+            name=playlist.get_name(),
+            enable_aggregation=playlist._aggregate,
+            playlists=[_to_tree(child) for child in playlist],
+        )
+
+    return PlaylistTree(
+        name=playlist.get_name(),
+        enable_aggregation=playlist._aggregate,
+        tracks=list(playlist.get_tracks()),
+    )
+
+
+class ParallelPlaylistBuilder:
+    "Builder of the top-level folders of a playlist config in processes."
+
+    def __init__(
+        self,
+        tags_tracks: Dict[str, Dict[str, Track]],
+        track_index: TrackIndex,
+        playlist_class: Playlist,
+        workers: int,
+    ):
+        """Constructor.
+
+        Args:
+            tags_tracks: Dict of tags and selectors to tracks. Selectors added
+                to it after construction are sent to the processes which
+                build the "combiner" section of the playlist config.
+            track_index: TrackIndex of the collection's tracks.
+            playlist_class: Playlist implementation class.
+            workers: Number of processes to build playlists in.
+        """
+        self._tags_tracks = tags_tracks
+        self._track_index = track_index
+        self._ordinals = track_index.get_ordinals()
+        self._playlist_class = playlist_class
+        self._workers = workers
+        self._hits = 0
+        self._misses = 0
+
+    def _build(
+        self,
+        content: PlaylistConfigContent,
+        combiner: bool,
+        minimum_tracks: Optional[int],
+        cache: Optional[PlaylistCache] = None,
+    ) -> Tuple[List[Optional[Playlist]], Set[str]]:
+        """Builds the top-level folders of a section of a playlist config.
+
+        Args:
+            content: Root of a section of the playlist config.
+            combiner: Whether the section is the "combiner" section.
+            minimum_tracks: Required number of tracks to make a playlist.
+            cache: PlaylistCache of the results of combiner playlists from
+                previous runs, which is updated with the results used.
+
+        Returns:
+            Tuple of the playlists, or None, built from each item of the root
+                in order and the tags seen.
+        """
+        lookup = {
+            tag: [self._ordinals.get_ordinal(track_id) for track_id in tracks]
+            for tag, tracks in self._tags_tracks.items()
+        }
+        genres = {}
+        if not combiner:
+            genres = {
+                genre: [
+                    self._ordinals.get_ordinal(track_id) for track_id in tracks
+                ]
+                for genre, tracks in self._track_index.get_index(
+                    "genre"
+                ).items()
+            }
+        with ProcessPoolExecutor(
+            max_workers=min(self._workers, len(content.playlists) or 1),
+            initializer=_initialize,
+            initargs=(
+                lookup,
+                genres,
+                len(self._ordinals),
+                self._playlist_class,
+                self._get_worker_cache(cache) if cache is not None else None,
+            ),
+        ) as executor:
+            results = list(
+                executor.map(
+                    _build_folder,
+                    content.playlists,
+                    [combiner] * len(content.playlists),
+                    [minimum_tracks] * len(content.playlists),
+                )
+            )
+
+        playlists = []
+        tag_set = set()
+        for tree, tags, statistics, used in results:
+            playlists.append(self._from_tree(tree))
+            tag_set.update(tags)
+            self._hits += statistics[0]
+            self._misses += statistics[1]
+            if used is not None:
+                self._update_cache(cache, *used)
+
+        return playlists, tag_set
+
+    def _from_tree(self, tree: Optional[PlaylistTree]) -> Optional[Playlist]:
+        """Converts a PlaylistTree into a playlist of the collection's tracks.
+
+        Args:
+            tree: PlaylistTree or None.
+
+        Returns:
+            Playlist or None.
+        """
+        if tree is None:
+            return None
+
+        if tree.playlists is not None:
+            return self._playlist_class.new_playlist(
+                name=tree.name,
+                playlists=[self._from_tree(child) for child in tree.playlists],
+                enable_aggregation=tree.enable_aggregation,
+            )
+
+        return self._playlist_class.new_playlist(
+            name=tree.name,
+            tracks=dict(map(self._ordinals.get_track, tree.tracks)),
+            enable_aggregation=tree.enable_aggregation,
+        )
+
+    def _get_worker_cache(
+        self, cache: PlaylistCache
+    ) -> Tuple[PlaylistCache, Dict[str, str]]:
+        """Translates cached results into the ordinals of the tracks.
+
+        Args:
+            cache: PlaylistCache of the results of combiner playlists.
+
+        Returns:
+            Tuple of a PlaylistCache of the results whose tracks are ordinals
+                and the fingerprints of the tracks of the tags and selectors.
+        """
+        entries = {}
+        for expression, (
+            dependencies,
+            track_ids,
+        ) in cache.get_entries().items():
+            # Results with tracks that are no longer in the collection can't
+            # be reused because the fingerprints of their tags have changed.
+            try:
+                entries[expression] = (
+                    dependencies,
+                    [
+                        self._ordinals.get_ordinal(track_id)
+                        for track_id in track_ids
+                    ],
+                )
+            except KeyError:
+                continue
+
+        return PlaylistCache(entries), {
+            tag: PlaylistCache.get_fingerprint(tracks)
+            for tag, tracks in self._tags_tracks.items()
+        }
+
+    def _update_cache(
+        self,
+        cache: PlaylistCache,
+        used: Dict[str, Tuple[Dict[str, str], List[int]]],
+        hits: int,
+        misses: int,
+    ):
+        """Adds the cached results used by a worker process to a cache.
+
+        Args:
+            cache: PlaylistCache of the results of combiner playlists.
+            used: Dict of expressions to the fingerprints of their
+                dependencies and the ordinals of their tracks.
+            hits: Number of results the worker process reused.
+            misses: Number of results the worker process didn't reuse.
+        """
+        cache.update(
+            {
+                expression: (
+                    dependencies,
+                    [
+                        self._ordinals.get_track(ordinal)[0]
+                        for ordinal in ordinals
+                    ],
+                )
+                for expression, (dependencies, ordinals) in used.items()
+            },
+            hits,
+            misses,
+        )
+
+    def build_combiner_playlists(
+        self,
+        content: PlaylistConfigContent,
+        minimum_tracks: Optional[int] = None,
+        cache: Optional[PlaylistCache] = None,
+    ) -> Playlist:
+        """Builds the "combiner" section of a playlist config.
+
+        Each worker process memoizes the results of combiner sub-expressions
+        for the top-level folders it builds.
+
+        Args:
+            content: Root of the "combiner" section of the playlist config.
+            minimum_tracks: Required number of tracks to make a playlist.
+            cache: PlaylistCache of the results of combiner playlists from
+                previous runs, which is updated with the results used.
+
+        Returns:
+            A Playlist.
+        """
+        built, _ = self._build(content, True, minimum_tracks, cache)
+        for item, playlist in zip(content.playlists, built):
+            if not playlist:
+                logger.warning(
+                    f"There are no tracks for the Combiner playlist: {item}"
+                )
+        playlists = [playlist for playlist in built if playlist]
+        if not playlists:
+            logger.warning(
+                f'There were no playlists created from "{content.playlists}"'
+            )
+
+        return self._playlist_class.new_playlist(
+            name=content.name,
+            playlists=playlists,
+            enable_aggregation=content.enable_aggregation,
+        )
+
+    def build_tag_playlists(
+        self,
+        content: PlaylistConfigContent,
+        tag_set: Set[str],
+        minimum_tracks: Optional[int] = None,
+    ) -> Optional[Playlist]:
+        """Builds the "tags" section of a playlist config.
+
+        Args:
+            content: Root of the "tags" section of the playlist config.
+            tag_set: A set of tags seen while creating playlists. This is used
+                to indicate which tags should be ignored when creating the
+                "Unused Tags" playlists.
+            minimum_tracks: Required number of tracks to make a playlist.
+
+        Returns:
+            A Playlist or None.
+        """
+        if content.name == "_ignore":
+            tag_set.update(content.playlists)
+            return None
+
+        built, tags = self._build(content, False, minimum_tracks)
+        tag_set.update(tags)
+        playlists = [playlist for playlist in built if playlist]
+        if not playlists:
+            logger.warning(
+                f'There were no playlists created from "{content.playlists}"'
+            )
+            return None
+
+        return self._playlist_class.new_playlist(
+            name=content.name,
+            playlists=playlists,
+            enable_aggregation=content.enable_aggregation,
+        )
+
+    def get_cache_statistics(self) -> Tuple[int, int]:
+        """Gets the numbers of combiner sub-expression results reused and
+        evaluated by the worker processes.
+
+        Returns:
+            Tuple of the number of results reused and evaluated.
+        """
+        return self._hits, self._misses
@@ -1,15 +1,17 @@
 "This module is used to automatically generate a playlist structure."
 
 import logging
-from collections import defaultdict
 from pathlib import Path
 from typing import Optional, Type
 
 from djtools.collection import playlist_filters
+from djtools.collection.base_playlist import Playlist
+from djtools.collection.combiner_expression import CombinerEvaluator
 from djtools.collection.config import (
     PlaylistConfigContent,
     PlaylistRemainder,
 )
+from djtools.collection.genre_index import TagLookup
 from djtools.collection.helpers import (
     add_selectors_to_tags,
     aggregate_playlists,
@@ -18,7 +20,10 @@ from djtools.collection.helpers import (
     filter_tag_playlists,
     print_playlists_tag_statistics,
 )
+from djtools.collection.parallel_builder import ParallelPlaylistBuilder
 from djtools.collection.platform_registry import PLATFORM_REGISTRY
+from djtools.collection.playlist_cache import PlaylistCache
+from djtools.collection.track_set import TrackOrdinals
 from djtools.utils.helpers import make_path
 
 logger = logging.getLogger(__name__)
@@ -26,6 +31,65 @@ PLAYLIST_NAME = "PLAYLIST_BUILDER"
 BaseConfig = Type["BaseConfig"]
 
 
+def _build_combiner_playlists(
+    config: BaseConfig,
+    tags_tracks: TagLookup,
+    playlist_class: Playlist,
+    ordinals: TrackOrdinals,
+    parallel_builder: Optional[ParallelPlaylistBuilder],
+) -> Playlist:
+    """Builds the "combiner" section of the playlist config.
+
+    Results of combiner playlists whose inputs haven't changed since the last
+    run are optionally reused from a cache, which is saved after the
+    playlists are built.
+
+    Args:
+        config: Configuration object.
+        tags_tracks: Lookup of tags and selectors to tracks.
+        playlist_class: Playlist implementation class.
+        ordinals: Ordinals of the collection's tracks.
+        parallel_builder: ParallelPlaylistBuilder to build the top-level
+            folders in a pool of processes or None to build them in this
+            process.
+
+    Returns:
+        A Playlist.
+    """
+    cache = (
+        PlaylistCache.load(config.collection.collection_path)
+        if config.collection.collection_playlists_cache
+        else None
+    )
+
+    # Results of sub-expressions are shared by every combiner playlist built
+    # in the same process.
+    evaluator = CombinerEvaluator(tags_tracks, ordinals, cache)
+    combiner_playlists = (
+        parallel_builder.build_combiner_playlists(
+            config.collection.playlist_config.combiner,
+            minimum_tracks=config.collection.minimum_combiner_playlist_tracks,
+            cache=cache,
+        )
+        if parallel_builder is not None
+        else build_combiner_playlists(
+            config.collection.playlist_config.combiner,
+            tags_tracks,
+            playlist_class,
+            minimum_tracks=config.collection.minimum_combiner_playlist_tracks,
+            evaluator=evaluator,
+        )
+    )
+    hits, misses = (parallel_builder or evaluator).get_cache_statistics()
+    logger.debug(
+        f"Reused {hits} of {hits + misses} combiner sub-expression results"
+    )
+    if cache is not None:
+        cache.save(config.collection.collection_path)
+
+    return combiner_playlists
+
+
 @make_path
 def collection_playlists(config: BaseConfig, path: Optional[Path] = None):
     """Builds playlists automatically.
@@ -91,7 +155,10 @@ def collection_playlists(config: BaseConfig, path: Optional[Path] = None):
 
     # Load the collection.
     collection = PLATFORM_REGISTRY[config.collection.platform]["collection"](
-        path=config.collection.collection_path
+        path=config.collection.collection_path,
+        streaming=config.collection.collection_streaming,
+        snapshot=config.collection.collection_snapshot,
+        workers=config.collection.collection_workers,
     )
 
     # Get the Playlist implementation to use for this collection.
@@ -103,11 +170,31 @@ def collection_playlists(config: BaseConfig, path: Optional[Path] = None):
         config.collection.minimum_combiner_playlist_tracks
     )
 
-    # Create a dict of tracks keyed by their individual tags.
-    tags_tracks = defaultdict(dict)
-    for track_id, track in collection.get_tracks().items():
-        for tag in track.get_tags():
-            tags_tracks[tag][track_id] = track
+    # Create a dict of tracks keyed by their individual tags. The collection's
+    # tag index is shared rather than copied; only keys for selectors, which
+    # aren't tags, are added to this dict. "Pure" playlists share the
+    # collection's index of genre tags, which is built when it's first needed.
+    tags_tracks = TagLookup(
+        collection.get_track_index().get_index("tag"),
+        collection.get_genre_index,
+    )
+
+    # "All" playlists aggregate tracks as bitsets over the ordinals of the
+    # collection's tracks.
+    ordinals = collection.get_track_index().get_ordinals()
+
+    # The top-level folders of the playlist config are optionally built in a
+    # pool of processes.
+    parallel_builder = (
+        ParallelPlaylistBuilder(
+            tags_tracks,
+            collection.get_track_index(),
+            playlist_class,
+            config.collection.collection_playlists_workers,
+        )
+        if config.collection.collection_playlists_workers
+        else None
+    )
 
     # This will hold the playlists being built.
     auto_playlists = []
@@ -123,12 +210,20 @@ def collection_playlists(config: BaseConfig, path: Optional[Path] = None):
         # A set of tags seen is maintained while creating the tags playlists so
         # that they are ignored when creating the "Other" playlists.
         seen_tags = set()
-        tag_playlists = build_tag_playlists(
-            config.collection.playlist_config.tags,
-            tags_tracks,
-            playlist_class,
-            seen_tags,
-            minimum_tracks=minimum_tag_tracks,
+        tag_playlists = (
+            parallel_builder.build_tag_playlists(
+                config.collection.playlist_config.tags,
+                seen_tags,
+                minimum_tracks=minimum_tag_tracks,
+            )
+            if parallel_builder is not None
+            else build_tag_playlists(
+                config.collection.playlist_config.tags,
+                tags_tracks,
+                playlist_class,
+                seen_tags,
+                minimum_tracks=minimum_tag_tracks,
+            )
         )
 
         # The tag playlists must have their "parent" attribute set so that
@@ -137,14 +232,14 @@ def collection_playlists(config: BaseConfig, path: Optional[Path] = None):
         tag_playlists.set_parent()
 
         # Apply the filtering logic of the configured PlaylistFilter implementations.
-        filter_tag_playlists(tag_playlists, filters)
+        filter_tag_playlists(tag_playlists, filters, collection)
 
         # Recursively traverse the playlist tree and create "all" playlists
         # within each folder containing more than one playlist. These "all"
         # playlists aggregate the set of tracks contained within all the other
         # playlists within the same folder.
         _ = aggregate_playlists(
-            tag_playlists, playlist_class, minimum_tag_tracks
+            tag_playlists, playlist_class, minimum_tag_tracks, ordinals
         )
 
         auto_playlists.extend(tag_playlists)
@@ -196,11 +291,8 @@ def collection_playlists(config: BaseConfig, path: Optional[Path] = None):
         )
 
         # Evaluate the boolean logic of the combiner playlists.
-        combiner_playlists = build_combiner_playlists(
-            config.collection.playlist_config.combiner,
-            tags_tracks,
-            playlist_class,
-            minimum_tracks=minimum_combiner_tracks,
+        combiner_playlists = _build_combiner_playlists(
+            config, tags_tracks, playlist_class, ordinals, parallel_builder
         )
 
         # The tag playlists must have their "parent" attribute set so that
@@ -209,14 +301,17 @@ def collection_playlists(config: BaseConfig, path: Optional[Path] = None):
         combiner_playlists.set_parent()
 
         # Apply the filtering logic of the configured PlaylistFilter implementations.
-        filter_tag_playlists(combiner_playlists, filters)
+        filter_tag_playlists(combiner_playlists, filters, collection)
 
         # Recursively traverse the playlist tree and create "all" playlists
         # within each folder containing more than one playlist. These "all"
         # playlists aggregate the set of tracks contained within all the other
         # playlists within the same folder.
         _ = aggregate_playlists(
-            combiner_playlists, playlist_class, minimum_combiner_tracks
+            combiner_playlists,
+            playlist_class,
+            minimum_combiner_tracks,
+            ordinals,
         )
 
         auto_playlists.extend(combiner_playlists)
@@ -237,7 +332,7 @@ def collection_playlists(config: BaseConfig, path: Optional[Path] = None):
     )
     auto_playlist.set_parent(collection.get_playlists())
     collection.add_playlist(auto_playlist)
-    collection.serialize(path=path)
+    collection.serialize(path=path, splice=config.collection.collection_splice)
 
     num_playlists = collection.get_playlists().get_number_of_playlists()
     logger.info(f"{PLAYLIST_NAME} generated with {num_playlists} playlists")
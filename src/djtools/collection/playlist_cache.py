@@ -0,0 +1,281 @@
+"""This module contains the class for the PlaylistCache.
+
+PlaylistCache is a binary sidecar file holding the results of the combiner
+playlists built from a collection so that later runs only evaluate the
+playlists whose inputs changed. The result of each combiner expression is
+stored alongside its dependencies: the tags, selectors, and referenced
+playlists that are its operands, with wildcards expanded to the tags they
+match, each with a fingerprint of the IDs of its tracks in order.
+
+A result is reused when its expression depends on the same operands and the
+fingerprints of their tracks are unchanged, which is the case for every
+playlist that doesn't depend on a tag of a retagged track or on a selector
+whose tracks changed. Only the results used by a run are saved.
+
+Caches start with a fixed-size header of plain bytes holding the version and
+a digest of the pickled entries, so a cache of another version or a foreign
+file is rejected without unpickling anything. The digest is checked before
+the entries are unpickled, and each entry is validated after, so a corrupted
+cache is ignored rather than reused.
+
+Caches are trusted local data. The digest isn't keyed, so it detects
+corruption but not tampering, and unpickling a cache written by someone else
+can run arbitrary code. Caches must not be shared or loaded from untrusted
+locations.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from djtools.utils.helpers import make_path
+
+logger = logging.getLogger(__name__)
+
+
+class PlaylistCache:
+    "Results of combiner playlists keyed by the fingerprints of their inputs."
+
+    # Header of a cache: the magic bytes, the cache version, and the SHA-256
+    # digest of the pickled entries.
+    HEADER = struct.Struct("<4sI32s")
+
+    # Magic bytes which start every cache.
+    MAGIC = b"DJPC"
+
+    # Suffix appended to the name of a collection to get the name of its
+    # cache.
+    SUFFIX = ".playlist_cache"
+
+    # Version of the cache format. This must be incremented whenever the
+    # structure of the entries or fingerprints changes so that stale caches
+    # are ignored.
+    VERSION = 3
+
+    def __init__(
+        self,
+        entries: Optional[Dict[str, Tuple[Dict[str, str], List[str]]]] = None,
+    ):
+        """Constructor.
+
+        Args:
+            entries: Dict of expressions to the fingerprints of their
+                dependencies and the IDs of their tracks.
+        """
+        self._entries = entries or {}
+        self._used: Dict[str, Tuple[Dict[str, str], List[str]]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _is_entry(expression: Any, entry: Any) -> bool:
+        """Checks that an entry has the structure of a result.
+
+        Args:
+            expression: Key of the entry.
+            entry: Value of the entry.
+
+        Returns:
+            Whether the entry is a combiner expression mapped to a dict of
+                fingerprints and a list of track IDs.
+        """
+        return (
+            isinstance(expression, str)
+            and isinstance(entry, tuple)
+            and len(entry) == 2
+            and isinstance(entry[0], dict)
+            and all(
+                isinstance(operand, str) and isinstance(fingerprint, str)
+                for operand, fingerprint in entry[0].items()
+            )
+            and isinstance(entry[1], list)
+            and all(isinstance(track_id, str) for track_id in entry[1])
+        )
+
+    def get(
+        self, expression: str, dependencies: Dict[str, str]
+    ) -> Optional[List[str]]:
+        """Gets the result of an expression if its inputs are unchanged.
+
+        Args:
+            expression: Combiner expression as written.
+            dependencies: Dict of the expression's operands to the
+                fingerprints of their tracks.
+
+        Returns:
+            IDs of the expression's tracks in order or None.
+        """
+        entry = self._entries.get(expression)
+        if entry is None or entry[0] != dependencies:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._used[expression] = entry
+
+        return entry[1]
+
+    def get_entries(self) -> Dict[str, Tuple[Dict[str, str], List[str]]]:
+        """Gets the results loaded from the cache.
+
+        Returns:
+            Dict of expressions to the fingerprints of their dependencies and
+                the IDs of their tracks.
+        """
+        return self._entries
+
+    @staticmethod
+    def get_fingerprint(track_ids: Iterable[str]) -> str:
+        """Gets the fingerprint of tracks.
+
+        Args:
+            track_ids: IDs of tracks in order.
+
+        Returns:
+            Digest of the track IDs.
+        """
+        return hashlib.blake2b(
+            "\n".join(track_ids).encode(), digest_size=16
+        ).hexdigest()
+
+    @staticmethod
+    @make_path
+    def get_path(path: Path) -> Path:
+        """Gets the path of the cache for a collection.
+
+        Args:
+            path: Path to a collection.
+
+        Returns:
+            Path to the cache of the collection.
+        """
+        return path.with_name(f"{path.name}{PlaylistCache.SUFFIX}")
+
+    @classmethod
+    @make_path
+    def load(cls, path: Path) -> "PlaylistCache":
+        """Loads the cache of a collection.
+
+        Args:
+            path: Path to a collection.
+
+        Returns:
+            The PlaylistCache of the collection, which is empty if there
+                isn't a cache, it's from another version, or it's corrupted.
+        """
+        cache_path = cls.get_path(path)
+        if not cache_path.exists():
+            return cls()
+
+        try:
+            with open(cache_path, mode="rb") as _file:
+                # Caches of other versions are ignored rather than migrated.
+                header = _file.read(cls.HEADER.size)
+                if len(header) != cls.HEADER.size:
+                    return cls()
+
+                magic, version, digest = cls.HEADER.unpack(header)
+                if magic != cls.MAGIC or version != cls.VERSION:
+                    return cls()
+
+                payload = _file.read()
+            if hashlib.sha256(payload).digest() != digest:
+                raise ValueError("the digest of the entries doesn't match")
+
+            entries = pickle.loads(payload)
+            if not isinstance(entries, dict) or not all(
+                cls._is_entry(expression, entry)
+                for expression, entry in entries.items()
+            ):
+                raise ValueError("the entries are malformed")
+        # A corrupted cache may raise any exception when it's unpickled.
+        except Exception as exc:
+            logger.warning(
+                f"Failed to load playlist cache {cache_path}: {exc}"
+            )
+            return cls()
+
+        return cls(entries)
+
+    def pop_used(
+        self,
+    ) -> Tuple[Dict[str, Tuple[Dict[str, str], List[Any]]], int, int]:
+        """Removes the results used since the last call.
+
+        This lets a process that builds some of the combiner playlists report
+        the results it used to the cache that's saved.
+
+        Returns:
+            Tuple of the results used, the number of results reused, and the
+                number of results that weren't.
+        """
+        used, hits, misses = self._used, self._hits, self._misses
+        self._used = {}
+        self._hits = 0
+        self._misses = 0
+
+        return used, hits, misses
+
+    @make_path
+    def save(self, path: Path):
+        """Saves the results used by this run for a collection.
+
+        Args:
+            path: Path to the collection this cache was loaded for.
+        """
+        logger.debug(
+            f"Reused {self._hits} of {self._hits + self._misses} cached "
+            "combiner playlists"
+        )
+        cache_path = self.get_path(path)
+        partial_path = cache_path.with_name(f"{cache_path.name}.part")
+        payload = pickle.dumps(self._used, protocol=pickle.HIGHEST_PROTOCOL)
+        header = self.HEADER.pack(
+            self.MAGIC, self.VERSION, hashlib.sha256(payload).digest()
+        )
+        try:
+            with open(partial_path, mode="wb") as _file:
+                _file.write(header + payload)
+            os.replace(partial_path, cache_path)
+        except OSError as exc:
+            logger.warning(
+                f"Failed to save playlist cache {cache_path}: {exc}"
+            )
+
+    def set(
+        self,
+        expression: str,
+        dependencies: Dict[str, str],
+        track_ids: List[str],
+    ):
+        """Sets the result of an expression.
+
+        Args:
+            expression: Combiner expression as written.
+            dependencies: Dict of the expression's operands to the
+                fingerprints of their tracks.
+            track_ids: IDs of the expression's tracks in order.
+        """
+        self._used[expression] = (dependencies, track_ids)
+
+    def update(
+        self,
+        used: Dict[str, Tuple[Dict[str, str], List[str]]],
+        hits: int,
+        misses: int,
+    ):
+        """Adds the results used by another process.
+
+        Args:
+            used: Dict of expressions to the fingerprints of their
+                dependencies and the IDs of their tracks.
+            hits: Number of results the other process reused.
+            misses: Number of results the other process didn't reuse.
+        """
+        self._used.update(used)
+        self._hits += hits
+        self._misses += misses
@@ -1,170 +1,222 @@
 """This module contains the PlaylistFilter abstract base class and its
 implementations.
 
-PlaylistFilter subclasses implement an 'is_filter_playlist' method and a
-'filter_track' method.
+PlaylistFilter subclasses implement a 'prepare' method and a 'filter_tracks'
+method.
 
-The 'is_filter_playlist' method, when given a 'Playlist', returns true if that
-'Playlist' should have its tracks filtered.
+The 'prepare' method, when given a 'Playlist', returns None if that 'Playlist'
+shouldn't have its tracks filtered or else an immutable context holding
+everything about the 'Playlist', such as the names of its parents, that the
+filter depends on.
 
-The 'filter_track' method, when given a 'Track', returns true if that 'Track'
-should remain in the playlist.
+The 'filter_tracks' method, when given a context and a batch of 'Tracks',
+returns a mask which is true for the 'Tracks' that should remain in the
+playlist. Features of 'Tracks' that filters derive from their attributes are
+shared through a 'FilterCache'.
+
+Filters hold no state about the playlists they're filtering, so a filter may
+be applied to many playlists, and to many batches of tracks, at once.
 """
 
 import re
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import ClassVar, Dict, Hashable, List, NamedTuple, Optional
 
 from djtools.collection.base_playlist import Playlist
 from djtools.collection.base_track import Track
+from djtools.collection.filter_cache import FilterCache
 
 
 class PlaylistFilter(ABC):
     "This class defines an interface for filtering tracks from playlists."
 
+    @staticmethod
+    def _get_names(playlist: Playlist) -> List[str]:
+        """Gets the names of a playlist and its parents.
+
+        Args:
+            playlist: Playlist object.
+
+        Returns:
+            Names of the playlist and its parents from the playlist up.
+        """
+        names = []
+        while playlist:
+            names.append(playlist.get_name())
+            playlist = playlist.get_parent()
+
+        return names
+
     @abstractmethod
-    def filter_track(self, track: Track) -> bool:
-        """Returns True if this track should remain in the playlist.
+    def filter_tracks(
+        self,
+        context: Hashable,
+        tracks: List[Track],
+        features: Optional[FilterCache] = None,
+    ) -> List[bool]:
+        """Returns a mask of the tracks that should remain in the playlist.
 
         Args:
-            track: Track object to apply filter to.
+            context: Context returned by prepare for the playlist.
+            tracks: Batch of the playlist's tracks.
+            features: FilterCache of the features of tracks.
 
         Returns:
-            Whether or not this track should be included in the playlist.
+            Whether or not each track should be included in the playlist.
         """
 
     @abstractmethod
-    def is_filter_playlist(self, playlist: Playlist) -> bool:
-        """Returns True if this playlist should be filtered.
+    def prepare(self, playlist: Playlist) -> Optional[Hashable]:
+        """Prepares to filter a playlist.
 
         Args:
             playlist: Playlist object to potentially filter.
 
         Returns:
-            Whether or not to filter this playlist.
+            None if the playlist shouldn't be filtered or else an immutable
+                context for filtering its tracks.
         """
 
 
+class HipHopContext(NamedTuple):
+    'Context of a "Hip Hop" playlist.'
+
+    # Whether the playlist is underneath a folder called "Bass".
+    bass: bool
+
+
 class HipHopFilter(PlaylistFilter):
     'This class filters playlists called "Hip Hop".'
 
-    def filter_track(self, track: Track) -> bool:
-        """Returns True if this track should remain in the playlist.
+    def filter_tracks(
+        self,
+        context: HipHopContext,
+        tracks: List[Track],
+        features: Optional[FilterCache] = None,
+    ) -> List[bool]:
+        """Returns a mask of the tracks that should remain in the playlist.
 
-        If the playlist is not underneath a folder called "Bass", then this
+        If the playlist is not underneath a folder called "Bass", then a
         track is filtered out unless it has exclusively "Hip Hop" and "R&B"
         genre tags. If the playlist is underneath a folder called "Bass", then
-        this track is filtered out if it does have exclusively "Hip Hop" and
+        a track is filtered out if it does have exclusively "Hip Hop" and
         "R&B" genre tags.
 
         Args:
-            track: Track object to apply filter to.
+            context: Context returned by prepare for the playlist.
+            tracks: Batch of the playlist's tracks.
+            features: FilterCache of the features of tracks.
 
         Returns:
-            Whether or not this track should be included in the playlist.
+            Whether or not each track should be included in the playlist.
         """
-        pure_hip_hop_with_other_tags = not self._bass_hip_hop and any(
-            "r&b" not in x.lower() and "hip hop" not in x.lower()
-            for x in track.get_genre_tags()
-        )
-        bass_hip_hop_without_other_tags = self._bass_hip_hop and all(
-            "r&b" in x.lower() or "hip hop" in x.lower()
-            for x in track.get_genre_tags()
-        )
-        if pure_hip_hop_with_other_tags or bass_hip_hop_without_other_tags:
-            return False
+        features = features or FilterCache()
 
-        return True
+        return [
+            all(
+                "r&b" in x or "hip hop" in x
+                for x in features.get_genre_tags(track)
+            )
+            != context.bass
+            for track in tracks
+        ]
 
-    def is_filter_playlist(self, playlist: Playlist) -> bool:
-        """Returns True if this playlist's name is "Hip Hop".
+    def prepare(self, playlist: Playlist) -> Optional[HipHopContext]:
+        """Prepares to filter a playlist if its name is "Hip Hop".
 
         Args:
             playlist: Playlist object to potentially filter.
 
         Returns:
-            Whether or not to filter this playlist.
+            None if the playlist shouldn't be filtered or else its context.
         """
-        self._bass_hip_hop = (  # pylint: disable=attribute-defined-outside-init
-            False
-        )
-
         if not playlist.get_name() == "Hip Hop":
-            return False
+            return None
 
-        parent = playlist.get_parent()
-        while parent:
-            if parent.get_name() == "Bass":
-                self._bass_hip_hop = (  # pylint: disable=attribute-defined-outside-init
-                    True
-                )
-                break
-            parent = parent.get_parent()
+        return HipHopContext(bass="Bass" in self._get_names(playlist)[1:])
+
+
+class MinimalDeepTechContext(NamedTuple):
+    'Context of a "Minimal Deep Tech" playlist.'
+
+    # Whether the playlist is underneath a folder called "House".
+    house: bool
 
-        return True
+    # Whether the playlist is underneath a folder called "Techno".
+    techno: bool
 
 
 class MinimalDeepTechFilter(PlaylistFilter):
     'This class filters playlists called "Minimal Deep Tech".'
 
-    def filter_track(self, track: Track) -> bool:
-        """Returns True if this track should remain in the playlist.
+    HOUSE_REGEX = re.compile(r".*house.*")
+    TECHNO_REGEX = re.compile(r".*techno.*")
 
-        If the playlist is not underneath a folder called "Techno", then this
-        track is filtered out if there's another genre tag containing "Techno".
-        If the playlist is underneath a folder called "Techno", then
-        this track is filtered out if there's no other genre tag containing
-        "Techno".
+    def filter_tracks(
+        self,
+        context: MinimalDeepTechContext,
+        tracks: List[Track],
+        features: Optional[FilterCache] = None,
+    ) -> List[bool]:
+        """Returns a mask of the tracks that should remain in the playlist.
+
+        If the playlist is underneath a folder called "Techno", then a track is
+        filtered out if there's no genre tag containing "Techno". If the
+        playlist is underneath a folder called "House", then a track is
+        filtered out if there's no genre tag containing "House".
 
         Args:
-            track: Track object to apply filter to.
+            context: Context returned by prepare for the playlist.
+            tracks: Batch of the playlist's tracks.
+            features: FilterCache of the features of tracks.
 
         Returns:
-            Whether or not this track should be included in the playlist.
+            Whether or not each track should be included in the playlist.
         """
-        house_exp = re.compile(r".*house.*")
-        techno_exp = re.compile(r".*techno.*")
-        house_tag = techno_tag = False
-        for tag in track.get_genre_tags():
-            if re.search(house_exp, tag.lower()):
-                house_tag = True
-            if re.search(techno_exp, tag.lower()):
-                techno_tag = True
-        if (self._techno and not techno_tag) or (
-            self._house and not house_tag
-        ):
-            return False
+        features = features or FilterCache()
+        mask = []
+        for track in tracks:
+            genres = features.get_genre_tags(track)
+            house_tag = any(map(self.HOUSE_REGEX.search, genres))
+            techno_tag = any(map(self.TECHNO_REGEX.search, genres))
+            mask.append(
+                not (
+                    (context.techno and not techno_tag)
+                    or (context.house and not house_tag)
+                )
+            )
 
-        return True
+        return mask
 
-    def is_filter_playlist(self, playlist: Playlist) -> bool:
-        """Returns True if this playlist's name is "Minimal Deep Tech".
+    def prepare(self, playlist: Playlist) -> Optional[MinimalDeepTechContext]:
+        """Prepares to filter a playlist if its name is "Minimal Deep Tech"
+        and it's underneath a folder called "Techno" or "House".
 
         Args:
             playlist: Playlist object to potentially filter.
 
         Returns:
-            Whether or not to filter this playlist.
+            None if the playlist shouldn't be filtered or else its context.
         """
-        self._techno = False  # pylint: disable=attribute-defined-outside-init
-        self._house = False  # pylint: disable=attribute-defined-outside-init
-
         if not playlist.get_name() == "Minimal Deep Tech":
-            return False
+            return None
+
+        parents = set(self._get_names(playlist)[1:])
+        context = MinimalDeepTechContext(
+            house="House" in parents, techno="Techno" in parents
+        )
+
+        return context if context.house or context.techno else None
 
-        parent = playlist.get_parent()
-        while parent:
-            if parent.get_name() == "Techno":
-                self._techno = (  # pylint: disable=attribute-defined-outside-init
-                    True
-                )
-            if parent.get_name() == "House":
-                self._house = (  # pylint: disable=attribute-defined-outside-init
-                    True
-                )
-            parent = parent.get_parent()
 
-        return self._techno or self._house
+class ComplexTrackContext(NamedTuple):
+    'Context of a "complex" playlist.'
+
+    # Tags that don't count towards the number of non-genre tags.
+    exclude_tags: frozenset
+
+    # Required number of non-genre tags.
+    min_tags_for_complex_track: int
 
 
 class ComplexTrackFilter(PlaylistFilter):
@@ -176,6 +228,8 @@ class ComplexTrackFilter(PlaylistFilter):
     the playlist.
     """
 
+    PLAYLIST_REGEX = re.compile(r".*complex.*")
+
     def __init__(
         self,
         min_tags_for_complex_track: Optional[int] = 3,
@@ -190,7 +244,6 @@ class ComplexTrackFilter(PlaylistFilter):
                 non-genre tags.
         """
         super().__init__()
-        self._min_tags_for_complex_track = min_tags_for_complex_track
         if exclude_tags is None:
             exclude_tags = [
                 "DELETE",
@@ -202,47 +255,64 @@ class ComplexTrackFilter(PlaylistFilter):
                 "Strings",
                 "Vocal",
             ]
-        self._exclude_tags = set(exclude_tags)
+        self._context = ComplexTrackContext(
+            exclude_tags=frozenset(exclude_tags),
+            min_tags_for_complex_track=min_tags_for_complex_track,
+        )
 
-    def filter_track(self, track: Track) -> bool:
-        """Returns True if this track should remain in the playlist.
+    def filter_tracks(
+        self,
+        context: ComplexTrackContext,
+        tracks: List[Track],
+        features: Optional[FilterCache] = None,
+    ) -> List[bool]:
+        """Returns a mask of the tracks that should remain in the playlist.
 
         Args:
-            track: Track object to apply filter to.
+            context: Context returned by prepare for the playlist.
+            tracks: Batch of the playlist's tracks.
+            features: FilterCache of the features of tracks.
 
         Returns:
-            Whether or not this track should be included in the playlist.
+            Whether or not each track should be included in the playlist.
         """
-        other_tags = (
-            set(track.get_tags())
-            .difference(set(track.get_genre_tags()))
-            .difference(self._exclude_tags)
-        )
-
-        return (
-            other_tags and len(other_tags) >= self._min_tags_for_complex_track
-        )
-
-    def is_filter_playlist(self, playlist: Playlist) -> bool:
-        """Returns True if this playlist should be filtered.
+        features = features or FilterCache()
+        mask = []
+        for track in tracks:
+            other_tags = features.get_other_tags(track).difference(
+                context.exclude_tags
+            )
+            mask.append(
+                bool(other_tags)
+                and len(other_tags) >= context.min_tags_for_complex_track
+            )
+
+        return mask
+
+    def prepare(self, playlist: Playlist) -> Optional[ComplexTrackContext]:
+        """Prepares to filter a playlist if it, or a parent, has "complex" in
+        its name.
 
         Args:
             playlist: Playlist object to potentially filter.
 
         Returns:
-            Whether or not to filter this playlist.
+            None if the playlist shouldn't be filtered or else its context.
         """
-        playlist_exp = re.compile(r".*complex.*")
-        if re.search(playlist_exp, playlist.get_name().lower()):
-            return True
+        if any(
+            self.PLAYLIST_REGEX.search(name.lower())
+            for name in self._get_names(playlist)
+        ):
+            return self._context
+
+        return None
 
-        parent = playlist.get_parent()
-        while parent:
-            if re.search(playlist_exp, parent.get_name().lower()):
-                return True
-            parent = parent.get_parent()
 
-        return False
+class TransitionTrackContext(NamedTuple):
+    'Context of a "transition" playlist.'
+
+    # Either "genre" or "tempo".
+    playlist_type: str
 
 
 class TransitionTrackFilter(PlaylistFilter):
@@ -254,6 +324,12 @@ class TransitionTrackFilter(PlaylistFilter):
     delimited list of floats, for BPMs, or otherwise, for genres).
     """
 
+    PLAYLIST_REGEX = re.compile(r".*transition.*")
+    PLAYLIST_TYPE_REGEXES: ClassVar[Dict[str, re.Pattern]] = {
+        "genre": re.compile(r".*genre.*"),
+        "tempo": re.compile(r".*tempo.*"),
+    }
+
     def __init__(self, separator: Optional[str] = "/"):
         """Constructor.
 
@@ -262,39 +338,48 @@ class TransitionTrackFilter(PlaylistFilter):
         """
         super().__init__()
         self._separator = separator
-        self._playlist_type = None
 
-    def filter_track(self, track: Track) -> bool:
-        """Returns True if this track should remain in the playlist.
+    def filter_tracks(
+        self,
+        context: TransitionTrackContext,
+        tracks: List[Track],
+        features: Optional[FilterCache] = None,
+    ) -> List[bool]:
+        """Returns a mask of the tracks that should remain in the playlist.
 
-        Matches square bracket enclosed tokens representing transitions for
-        supported playlist types.
+        Matches square bracket enclosed tokens representing transitions of the
+        playlist's type.
 
         Args:
-            track: Track object to apply filter to.
+            context: Context returned by prepare for the playlist.
+            tracks: Batch of the playlist's tracks.
+            features: FilterCache of the features of tracks.
 
         Returns:
-            Whether or not this track should be included in the playlist.
+            Whether or not each track should be included in the playlist.
         """
-        comments = track.get_comments()
-        transition_exp = re.compile(r"\[([^]]+)\]")
-        transition_tokens_match_playlist_type = False
-        for match in re.findall(transition_exp, comments):
-            try:
-                _ = [
-                    float(token.strip())
-                    for token in match.split(self._separator)
-                ]
-                if self._playlist_type == "tempo":
-                    transition_tokens_match_playlist_type = True
-            except ValueError:
-                if self._playlist_type == "genre":
+        features = features or FilterCache()
+        mask = []
+        for track in tracks:
+            transition_tokens_match_playlist_type = False
+            for match in features.get_transitions(track):
+                try:
+                    _ = [
+                        float(token.strip())
+                        for token in match.split(self._separator)
+                    ]
+                    playlist_type = "tempo"
+                except ValueError:
+                    playlist_type = "genre"
+                if playlist_type == context.playlist_type:
                     transition_tokens_match_playlist_type = True
+                    break
+            mask.append(transition_tokens_match_playlist_type)
 
-        return transition_tokens_match_playlist_type
+        return mask
 
-    def is_filter_playlist(self, playlist: Playlist) -> bool:
-        """Returns True if this playlist should be filtered.
+    def prepare(self, playlist: Playlist) -> Optional[TransitionTrackContext]:
+        """Prepares to filter a playlist.
 
         Identifies playlists with a supported transition playlist type in its
         name while also having a parent playlist with "transition" in its name.
@@ -302,41 +387,35 @@ class TransitionTrackFilter(PlaylistFilter):
         Args:
             playlist: Playlist object to potentially filter.
 
+        Raises:
+            ValueError: The playlist's name must not match multiple playlist
+                types.
+
         Returns:
-            Whether or not to filter this playlist.
+            None if the playlist shouldn't be filtered or else its context.
         """
-        is_transition_playlist = False
-
-        # Check if the given playlist has a substring of "transition".
-        playlist_exp = re.compile(r".*transition.*")
-        if re.search(playlist_exp, playlist.get_name().lower()):
-            is_transition_playlist = True
-
-        # Search parents' names for "transition" substring.
-        parent = playlist.get_parent()
-        while not is_transition_playlist and parent:
-            if re.search(playlist_exp, parent.get_name().lower()):
-                is_transition_playlist = True
-            parent = parent.get_parent()
-
-        if not is_transition_playlist:
-            return False
+        # Check if the given playlist, or a parent, has a substring of
+        # "transition".
+        if not any(
+            self.PLAYLIST_REGEX.search(name.lower())
+            for name in self._get_names(playlist)
+        ):
+            return None
 
         # Check if the given playlist contains one, and only one, of the
         # supported transition playlist types.
-        self._playlist_type = None
-        playlist_type_exprs = {
-            "genre": re.compile(r".*genre.*"),
-            "tempo": re.compile(r".*tempo.*"),
-        }
-        for playlist_type, exp in playlist_type_exprs.items():
-            if not re.search(exp, playlist.get_name().lower()):
-                continue
-            if self._playlist_type:
-                raise ValueError(
-                    f'"{playlist.get_name()}" matches multiple playlist types:'
-                    f" {self._playlist_type}, {playlist_type}"
-                )
-            self._playlist_type = playlist_type
-
-        return bool(self._playlist_type)
+        name = playlist.get_name().lower()
+        playlist_types = [
+            playlist_type
+            for playlist_type, exp in self.PLAYLIST_TYPE_REGEXES.items()
+            if exp.search(name)
+        ]
+        if len(playlist_types) > 1:
+            raise ValueError(
+                f'"{playlist.get_name()}" matches multiple playlist types:'
+                f" {', '.join(playlist_types)}"
+            )
+        if not playlist_types:
+            return None
+
+        return TransitionTrackContext(playlist_type=playlist_types[0])
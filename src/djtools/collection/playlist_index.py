@@ -0,0 +1,105 @@
+"""This module contains the class for the PlaylistIndex.
+
+PlaylistIndex maps the names and paths of the playlists within a folder to
+those playlists so that finding playlists by name is a dict access rather than
+a traversal of the playlist tree. Playlists are kept in the order of a
+pre-order traversal of the tree so that they're returned in the same order as
+a traversal would find them.
+
+Glob queries are evaluated against the distinct names in the tree with a
+WildcardIndex of those names.
+"""
+
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from djtools.collection.wildcard_index import WildcardIndex
+
+if TYPE_CHECKING:  # pragma: no cover
+    from djtools.collection.base_playlist import Playlist
+
+
+class PlaylistIndex:
+    "Index of the playlists within a folder by name and path."
+
+    def __init__(self, folder: "Playlist"):
+        """Builds the index from a pre-order traversal of a folder.
+
+        Args:
+            folder: Folder whose playlists, excluding itself, are indexed.
+        """
+        self._names: Dict[str, List["Playlist"]] = {}
+        self._ordinals: Dict["Playlist", int] = {}
+        self._paths: Dict[Tuple[str, ...], "Playlist"] = {}
+        stack = [
+            (playlist, (playlist.get_name(),))
+            for playlist in reversed(list(folder))
+        ]
+        while stack:
+            playlist, path = stack.pop()
+            self._ordinals[playlist] = len(self._ordinals)
+            self._names.setdefault(path[-1], []).append(playlist)
+            self._paths.setdefault(path, playlist)
+            if playlist.is_folder():
+                stack.extend(
+                    (child, (*path, child.get_name()))
+                    for child in reversed(list(playlist))
+                )
+        self._wildcards: Optional[WildcardIndex] = None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_matcher(name: str, glob: bool) -> Callable[[str], Any]:
+        """Gets a function which matches playlist names against a name.
+
+        Args:
+            name: Name of the playlists to match.
+            glob: Glob on playlist name containing "*".
+
+        Returns:
+            Function returning whether a playlist name matches.
+        """
+        if not glob:
+            return name.__eq__
+
+        return re.compile(r".*".join(name.split("*"))).search
+
+    def get_playlist(self, path: Tuple[str, ...]) -> Optional["Playlist"]:
+        """Gets a playlist by its path.
+
+        Args:
+            path: Names of the folders leading to a playlist, starting below
+                the indexed folder, followed by the name of the playlist. If
+                siblings share a name, the first of them is on the path.
+
+        Returns:
+            The playlist at the path or None if there isn't one.
+        """
+        return self._paths.get(tuple(path))
+
+    def get_playlists(
+        self, name: str, glob: Optional[bool] = False
+    ) -> List["Playlist"]:
+        """Gets the playlists with a matching name.
+
+        Args:
+            name: Name of the playlists to return.
+            glob: Glob on playlist name containing "*".
+
+        Returns:
+            The playlists with a matching name in pre-order.
+        """
+        if not glob:
+            return list(self._names.get(name, []))
+
+        if self._wildcards is None:
+            self._wildcards = WildcardIndex(self._names)
+        names = self._wildcards.search(name)
+        if len(names) == 1:
+            return list(self._names[names[0]])
+
+        return sorted(
+            (playlist for _name in names for playlist in self._names[_name]),
+            key=self._ordinals.__getitem__,
+        )
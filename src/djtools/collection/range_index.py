@@ -0,0 +1,229 @@
+"""This module contains the class for the RangeIndex.
+
+RangeIndex keeps the values of the numerical attributes of tracks, such as
+BPM, rating, and year, sorted alongside the positions of the tracks having
+them, so that the tracks whose values are within a range are found by
+bisection rather than by testing the value of every track.
+
+Values are indexed as integers: BPMs are rounded, values which may be
+strings, such as years, are only indexed when they're in canonical form so
+that comparing the integers is the same as comparing the original strings,
+and the dates that tracks were added are indexed as day ordinals. Each
+attribute is indexed the first time it's queried.
+
+Dates are selected by the day, month, or year. Months and years are buckets
+of consecutive day ordinals, so a track's date truncated to the precision of a
+selector is compared to the selector's date by bisecting the index at the
+boundaries of the bucket containing that date.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import ClassVar, Dict, Iterable, List, Optional, Tuple
+
+from djtools.collection.base_track import Track
+
+
+class RangeIndex:
+    "Sorted indexes of the numerical and date attributes of tracks."
+
+    # Track getters for the indexed attributes, keyed by selector field name.
+    FIELDS: ClassVar[Dict[str, str]] = {
+        "bitrate": "get_bit_rate",
+        "bpm": "get_bpm",
+        "playcount": "get_play_count",
+        "rating": "get_rating",
+        "totaltime": "get_total_time",
+        "year": "get_year",
+    }
+
+    # Track getter for the dates that tracks were added.
+    DATE_ADDED = "get_date_added"
+
+    def __init__(self, tracks: Dict[str, Track]):
+        """Constructor.
+
+        Args:
+            tracks: Tracks keyed by their IDs.
+        """
+        self._ids = list(tracks)
+        self._tracks = list(tracks.values())
+        self._indexes: Dict[str, Tuple[List[int], List[int]]] = {}
+
+    @staticmethod
+    def _get_bucket(day: datetime, unit: str) -> Tuple[int, int]:
+        """Gets the boundaries of the day, month, or year containing a date.
+
+        Args:
+            day: Date in the bucket.
+            unit: "D" for days, "M" for months, or "Y" for years.
+
+        Returns:
+            Tuple of the ordinals of the first day of the bucket and of the
+                first day after it.
+        """
+        if unit == "D":
+            start = day.toordinal()
+            return start, start + 1
+
+        if unit == "M":
+            first = date(day.year, day.month, 1)
+            year, month = divmod(day.month, 12)
+            after = (day.year + year, month + 1)
+        else:
+            first = date(day.year, 1, 1)
+            after = (day.year + 1, 1)
+        try:
+            end = date(*after, 1).toordinal()
+        except ValueError:
+            end = date.max.toordinal() + 1
+
+        return first.toordinal(), end
+
+    def _get_index(
+        self, field: str, getter: str
+    ) -> Tuple[List[int], List[int]]:
+        """Gets the sorted index of a field.
+
+        Args:
+            field: Name of an indexed field, such as "bpm" or "year".
+            getter: Name of the Track method that returns the field's values.
+
+        Returns:
+            Tuple of the sorted values of the field and the positions of the
+                tracks having them.
+        """
+        index = self._indexes.get(field)
+        if index is None:
+            values = [self._get_value(getter, track) for track in self._tracks]
+            pairs = sorted(
+                (value, row)
+                for row, value in enumerate(values)
+                if value is not None
+            )
+            index = self._indexes[field] = (
+                [value for value, _ in pairs],
+                [row for _, row in pairs],
+            )
+
+        return index
+
+    def _get_rows(
+        self,
+        field: str,
+        getter: str,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+    ) -> List[int]:
+        """Gets the positions of the tracks with a value within a range.
+
+        Args:
+            field: Name of an indexed field.
+            getter: Name of the Track method that returns the field's values.
+            low: Inclusive lower bound of the range or None.
+            high: Inclusive upper bound of the range or None.
+
+        Returns:
+            Positions of the tracks in the order of their values.
+        """
+        values, positions = self._get_index(field, getter)
+        start = 0 if low is None else bisect_left(values, low)
+        end = len(values) if high is None else bisect_right(values, high)
+
+        return positions[start:end]
+
+    @staticmethod
+    def _get_value(getter: str, track: Track) -> Optional[int]:
+        """Gets the indexed value of a track's field.
+
+        Args:
+            getter: Name of the Track method that returns the field's values.
+            track: Track to get the value of.
+
+        Returns:
+            Value of the field as an integer or None if it isn't indexed.
+        """
+        try:
+            value = getattr(track, getter)()
+        except (AttributeError, TypeError, ValueError):
+            return None
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.toordinal()
+        if isinstance(value, str):
+            if not (value.isdigit() and str(int(value)) == value):
+                return None
+            return int(value)
+
+        return round(value)
+
+    def _get_tracks(self, rows: Iterable[int]) -> Dict[str, Track]:
+        """Gets the tracks at positions.
+
+        Args:
+            rows: Positions of tracks.
+
+        Returns:
+            Dict of track IDs to tracks in the order of the collection.
+        """
+        return {self._ids[row]: self._tracks[row] for row in sorted(rows)}
+
+    def get_date_tracks(
+        self, day: datetime, unit: str, inequality: Optional[str] = None
+    ) -> Dict[str, Track]:
+        """Gets the tracks added on, before, or after a date.
+
+        The dates that tracks were added are truncated to the precision of
+        the unit before being compared to the date.
+
+        Args:
+            day: Date to compare the dates that tracks were added to.
+            unit: "D" for days, "M" for months, or "Y" for years.
+            inequality: One of ">", ">=", "<", or "<=" comparing the dates
+                that tracks were added to the date. If not provided, tracks
+                added within the same unit of time as the date are selected.
+
+        Returns:
+            Dict of track IDs to tracks in the order of the collection.
+        """
+        start, end = self._get_bucket(day, unit)
+
+        # Truncated dates are the first instant of their bucket, so they're
+        # only equal to the date if it's the first instant of its bucket.
+        at_start = day == datetime.fromordinal(start)
+        low, high = {
+            None: (start, end - 1),
+            ">": (end, None),
+            ">=": (start if at_start else end, None),
+            "<": (None, start - 1 if at_start else end - 1),
+            "<=": (None, end - 1),
+        }[inequality]
+
+        return self._get_tracks(
+            self._get_rows("date", self.DATE_ADDED, low, high)
+        )
+
+    def get_tracks(
+        self,
+        fields: Iterable[str],
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+    ) -> Dict[str, Track]:
+        """Gets the tracks with a value of any of the fields within a range.
+
+        Args:
+            fields: Names of the fields to search.
+            low: Inclusive lower bound of the range. If not provided, the
+                range has no lower bound.
+            high: Inclusive upper bound of the range. If not provided, the
+                range has no upper bound.
+
+        Returns:
+            Dict of track IDs to tracks in the order of the collection.
+        """
+        rows = set()
+        for field in fields:
+            rows.update(self._get_rows(field, self.FIELDS[field], low, high))
+
+        return self._get_tracks(rows)
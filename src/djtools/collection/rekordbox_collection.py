@@ -1,14 +1,17 @@
 """This module contains the class for the RekordboxCollection.
 
 RekordboxCollection is an implementation of Collection which operates on the
-XML format that Rekordbox exports. The CustomSubstitution and
-UnsortedAttributes classes are helpers for serializing a RekordboxCollection.
+XML format that Rekordbox exports. The CustomSubstitution, RekordboxSplicer,
+RekordboxWriter, and UnsortedAttributes classes are helpers for serializing a
+RekordboxCollection.
 """
 
+import logging
+import mmap
+import os
 import re
-from copy import copy
 from pathlib import Path
-from typing import Iterator, Optional, Tuple
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple, Union
 
 import bs4
 from bs4 import BeautifulSoup
@@ -16,41 +19,175 @@ from bs4.dammit import EntitySubstitution
 from bs4.formatter import XMLFormatter
 
 from djtools.collection.base_collection import Collection
+from djtools.collection.rekordbox_parser import RekordboxParser
 from djtools.collection.rekordbox_playlist import RekordboxPlaylist
-from djtools.collection.rekordbox_track import RekordboxTrack
+from djtools.collection.rekordbox_snapshot import RekordboxSnapshot
+from djtools.collection.rekordbox_track import RekordboxTrack, Span
+from djtools.collection.rekordbox_validator import RekordboxValidator
 from djtools.utils.helpers import make_path
 
+logger = logging.getLogger(__name__)
+
 
 class RekordboxCollection(Collection):
     "Collection implementation for usage with Rekordbox."
 
     @make_path
-    def __init__(self, path: Path):
+    def __init__(
+        self,
+        path: Path,
+        streaming: Optional[bool] = False,
+        snapshot: Optional[bool] = False,
+        workers: Optional[int] = None,
+    ):
         """Deserializes a Collection from an XML file.
 
         Args:
             path: Path to a serialized collection.
+            streaming: Stream the XML through an incremental parser rather
+                than building a BeautifulSoup document from it.
+            snapshot: Load the XML from a snapshot of a previous parse if it
+                hasn't changed since, otherwise stream it through an
+                incremental parser and save a snapshot of it.
+            workers: Number of processes to parse TRACK elements in when
+                streaming the XML through an incremental parser. This implies
+                streaming.
         """
         super().__init__(path=path)
         self._path = path
 
+        # The span of the COLLECTION element and the size and modification
+        # time of the XML are only known when records are parsed from it.
+        self.__collection_span = None
+        self.__source = None
+
+        if snapshot:
+            self.__deserialize_records(
+                RekordboxSnapshot.from_xml(self._path, workers=workers)
+            )
+            return
+
+        if streaming or workers:
+            self.__deserialize_records(
+                RekordboxParser().parse(self._path, workers=workers)
+            )
+            return
+
         # Parse the XML as a BeautifulSoup document.
         with open(self._path, mode="r", encoding="utf-8") as _file:
-            self._collection = BeautifulSoup(_file.read(), "xml")
+            collection = BeautifulSoup(_file.read(), "xml")
+
+        # Only the header data is needed to serialize this Collection so the
+        # document isn't kept around once the tracks and playlists are built.
+        self.__header = {
+            tag: collection.find(tag).attrs
+            for tag in RekordboxParser.HEADER_TAGS
+        }
 
         # Create a dict of tracks.
         self._tracks = {
             track["TrackID"]: RekordboxTrack(track)
-            for track in self._collection.find_all("TRACK")
+            for track in collection.find_all("TRACK")
             if track.get("Location")
         }
 
         # Instantiate the Playlist(s) in this collection.
         self._playlists = RekordboxPlaylist(
-            self._collection.find("NODE", {"Name": "ROOT", "Type": "0"}),
+            collection.find("NODE", {"Name": "ROOT", "Type": "0"}),
             tracks=self._tracks,
         )
 
+    def __deserialize_records(
+        self, records: Union[RekordboxParser, RekordboxSnapshot]
+    ):
+        """Deserializes this Collection from TRACK and NODE element records.
+
+        Tracks and playlists are built directly from the records so that no
+        document tree is ever held in memory.
+
+        Args:
+            records: RekordboxParser or RekordboxSnapshot holding the records
+                of a Rekordbox XML.
+        """
+        stat = self._path.stat()
+        self.__collection_span = records.get_collection_span()
+        self.__header = records.get_header()
+        self.__source = (stat.st_size, stat.st_mtime_ns)
+        self._tracks = {
+            record[0]["TrackID"]: RekordboxTrack.from_record(record)
+            for record in records.get_tracks()
+        }
+        self._playlists = RekordboxPlaylist.from_record(
+            records.get_playlists(), tracks=self._tracks
+        )
+
+    def __splice(self, path: Path) -> Path:
+        """Serializes this Collection by splicing its changes into a copy of
+        the XML it was deserialized from.
+
+        Args:
+            path: Path to output serialized collection to.
+
+        Raises:
+            ValueError: The XML must have been parsed into records and must not
+                have changed since.
+
+        Returns:
+            Path to the serialized collection XML file.
+        """
+        if (
+            self.__collection_span is None
+            or self._playlists.get_span() is None
+        ):
+            raise ValueError(f"{self._path} wasn't parsed into records")
+        stat = self._path.stat()
+        if (stat.st_size, stat.st_mtime_ns) != self.__source:
+            raise ValueError(f"{self._path} has changed since it was loaded")
+
+        # The splice is written to a partial file, which replaces the output
+        # once it's complete, since the output may be the original XML.
+        partial_path = path.with_name(f"{path.name}.part")
+        try:
+            with (
+                open(self._path, mode="rb") as source,
+                mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data,
+                open(
+                    partial_path,
+                    mode="w",
+                    encoding="utf-8",
+                    newline="",
+                    buffering=RekordboxWriter.BUFFER_SIZE,
+                ) as _file,
+            ):
+                splicer = RekordboxSplicer(_file, data)
+
+                # If the tracks were set, the COLLECTION element is rewritten
+                # although unmodified tracks are still copied verbatim.
+                if self.is_modified():
+                    splicer.replace(self.__collection_span)
+                    splicer.start_element(
+                        "COLLECTION",
+                        {"Entries": str(len(self._tracks))},
+                        depth=1,
+                    )
+                    for track in self._tracks.values():
+                        splicer.write_track(track, depth=2)
+                    splicer.end_element("COLLECTION", depth=1)
+                else:
+                    for track in self._tracks.values():
+                        if track.is_modified():
+                            splicer.replace(track.get_span())
+                            splicer.write_track(track, depth=2)
+
+                splicer.splice_playlist(self._playlists, depth=2)
+                splicer.finish()
+            os.replace(partial_path, path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        return path
+
     def __repr__(self) -> str:
         """Produce a string representation of this Collection.
 
@@ -70,7 +207,6 @@ class RekordboxCollection(Collection):
             if not (
                 key.startswith(f"_{type(self).__name__}")
                 or not key.startswith("_")
-                or key == "_collection"
             )
         }
 
@@ -78,7 +214,15 @@ class RekordboxCollection(Collection):
         for key, value in repr_attrs.items():
             # Skip representing this collection's playlists and tracks.
             # Defer representation of the playlists attribute until the end.
-            if key in ["playlists", "tracks"]:
+            if key in [
+                "filter_cache",
+                "genre_index",
+                "modified",
+                "playlists",
+                "range_index",
+                "track_index",
+                "tracks",
+            ]:
                 continue
 
             # Represent string values with surrounding double quotes.
@@ -93,140 +237,109 @@ class RekordboxCollection(Collection):
         body += f"\n{' ' * 4}tracks={len(repr_attrs['tracks'])},"
 
         # Represent the playlists attribute as the total number of playlists.
-        stack = list(repr_attrs["playlists"])
-        playlist_count = 0
-        while stack:
-            playlist = stack.pop()
-            try:
-                stack.extend(playlist.get_playlists())
-            except RuntimeError:
-                playlist_count += 1
+        playlist_count = repr_attrs["playlists"].get_number_of_playlists()
         body += f"\n{' ' * 4}playlists={playlist_count},"
 
         return string.format(type(self).__name__, body)
 
     @make_path
-    def serialize(self, *args, path: Optional[Path] = None, **kwargs) -> Path:
+    def serialize(
+        self,
+        *args,
+        path: Optional[Path] = None,
+        splice: Optional[bool] = False,
+        **kwargs,
+    ) -> Path:
         """Serializes this Collection as an XML file.
 
         Args:
             path: Path to output serialized collection to.
+            splice: Splice only the elements that have been modified into a
+                copy of the original XML rather than serializing every
+                element. This requires the collection to have been loaded by
+                streaming or from a snapshot and the original XML to be
+                unchanged since.
 
         Returns:
             Path to the serialized collection XML file.
         """
-        # BeautifulSoup document.
-        doc = BeautifulSoup("", features="xml")
-
-        # Tag that contains all the playlist data.
-        root_tag_name = "DJ_PLAYLISTS"
-
-        # Retrieve this root tag from the existing document, rather than
-        # building it from scratch, in case the attributes ever change.
-        root_tag = bs4.Tag(
-            name=root_tag_name,
-            attrs=self._collection.find(root_tag_name).attrs,
-        )
-
-        # Similarly, we want to reference the existing attribute data on the
-        # product Tag.
-        root_tag.extend(
-            [bs4.NavigableString("\n"), copy(self._collection.find("PRODUCT"))]
-        )
-
-        # Build the collection Tag and serialize each track into it before
-        # adding the collection Tag to the root.
-        collection_tag = bs4.Tag(
-            name="COLLECTION", attrs={"Entries": str(len(self._tracks))}
-        )
-        for track in self._tracks.values():
-            collection_tag.extend(
-                [bs4.NavigableString("\n"), track.serialize()]
-            )
-        collection_tag.append(bs4.NavigableString("\n"))
-        root_tag.extend([bs4.NavigableString("\n"), collection_tag])
-
-        # Build the playlists Tag and serialize each Playlist into it before
-        # adding the playlist Tag to the root.
-        playlists_tag = bs4.Tag(name="PLAYLISTS")
-        playlists_root_tag = bs4.Tag(
-            name="NODE",
-            attrs={"Type": "0", "Name": "ROOT", "Count": len(self._playlists)},
-        )
-        for playlist in self._playlists:
-            playlists_root_tag.extend(
-                [bs4.NavigableString("\n"), playlist.serialize()]
-            )
-        playlists_root_tag.append(bs4.NavigableString("\n"))
-        playlists_tag.extend(
-            [
-                bs4.NavigableString("\n"),
-                playlists_root_tag,
-                bs4.NavigableString("\n"),
-            ]
-        )
-        root_tag.extend(
-            [
-                bs4.NavigableString("\n"),
-                playlists_tag,
-                bs4.NavigableString("\n"),
-            ]
-        )
-        doc.append(root_tag)
-
         # If no new path is provided, use the original.
         if not path:
             path = self._path
 
-        # Write the serialized Collection to a new file.
-        with open(path, mode="w", encoding="utf-8") as _file:
-            _file.write(
-                doc.prettify(
-                    # UnsortedAttributes formatter ensures attributes are
-                    # serialized in the same order as the original XML file.
-                    formatter=UnsortedAttributes(
-                        indent=2,
-                        # CustomSubstitution is used to substitute an expanded
-                        # character set in the serialized XML file.
-                        entity_substitution=CustomSubstitution.substitute_xml,
-                    )
+        if splice:
+            try:
+                return self.__splice(path)
+            except ValueError as exc:
+                logger.warning(
+                    f"Failed to splice changes into {self._path}, serializing "
+                    f"it in full instead: {exc}"
                 )
+
+        # Stream the serialized Collection to a new file.
+        with open(
+            path,
+            mode="w",
+            encoding="utf-8",
+            buffering=RekordboxWriter.BUFFER_SIZE,
+        ) as _file:
+            writer = RekordboxWriter(_file)
+            writer.write_declaration()
+
+            # Tag that contains all the playlist data. This root tag is built
+            # from the attributes of the original document, rather than from
+            # scratch, in case the attributes ever change. Similarly, we want
+            # to reference the existing attribute data on the product Tag.
+            writer.start_element("DJ_PLAYLISTS", self.__header["DJ_PLAYLISTS"])
+            writer.empty_element("PRODUCT", self.__header["PRODUCT"], depth=1)
+
+            # Serialize each track into the collection Tag.
+            writer.start_element(
+                "COLLECTION", {"Entries": str(len(self._tracks))}, depth=1
+            )
+            for track in self._tracks.values():
+                writer.write_track(track, depth=2)
+            writer.end_element("COLLECTION", depth=1)
+
+            # Serialize each Playlist into the playlists Tag.
+            writer.start_element("PLAYLISTS", depth=1)
+            writer.start_element(
+                "NODE",
+                {"Type": "0", "Name": "ROOT", "Count": len(self._playlists)},
+                depth=2,
             )
+            for playlist in self._playlists:
+                writer.write_playlist(playlist, depth=3)
+            writer.end_element("NODE", depth=2)
+            writer.end_element("PLAYLISTS", depth=1)
+            writer.end_element("DJ_PLAYLISTS")
 
         return path
 
     @classmethod
-    def validate(cls, input_xml: Path, output_xml: Path):
+    def validate(
+        cls,
+        input_xml: Path,
+        output_xml: Path,
+        hashes: Optional[bool] = False,
+    ):
         """Validate the serialized Collection matches the original.
 
+        Both XML files are streamed with their XML declarations skipped, since
+        Rekordbox capitalizes "UTF-8" while the serializer does not, and with
+        runs of whitespace normalized to a single space.
+
         Args:
             input_xml: Path to an XML containing the original collection.
             output_xml: Path to an XML containing the serialized collection.
+            hashes: Compare content hashes of the NODE and TRACK elements
+                rather than the bytes of the XML files.
 
         Raises:
             AssertionError: A serialized Collection must exactly match the
                 original XML used to deserialize from.
         """
-        # Read the original and serialized collection XML files as
-        # strings.
-        with open(input_xml, mode="r", encoding="utf-8") as _file:
-            input_xml_string = _file.read()
-        with open(output_xml, mode="r", encoding="utf-8") as _file:
-            output_xml_string = _file.read()
-
-        # Rekordbox capitalizes "UTF-8" in the file declaration while
-        # BeautifulSoup does not.
-        xml_declaration = input_xml_string[:38]
-        output_xml_string = xml_declaration + output_xml_string[38:]
-
-        # Replace multiple occurrences of whitespace with a single whitespace.
-        whitespace = re.compile(r"/\s{2,}/g")
-        input_xml_string = re.sub(whitespace, input_xml_string, " ")
-        output_xml_string = re.sub(whitespace, output_xml_string, " ")
-
-        assert input_xml_string == output_xml_string, (
-            "Failed RekordboxCollection validation!"
-        )
+        RekordboxValidator(input_xml, output_xml).validate(hashes=hashes)
 
 
 class CustomSubstitution(EntitySubstitution):
@@ -259,6 +372,289 @@ class CustomSubstitution(EntitySubstitution):
         return value
 
 
+class RekordboxWriter:
+    """Helper class to stream a RekordboxCollection into an XML file.
+
+    Elements are written to the file as they're visited rather than being
+    collected into a document first. The output is formatted identically to
+    prettifying a BeautifulSoup document with the UnsortedAttributes formatter
+    and CustomSubstitution entity substitution.
+    """
+
+    # Size, in bytes, of the buffer for the file being written.
+    BUFFER_SIZE = 1 << 20
+
+    # Number of spaces to indent each level of nested elements.
+    INDENT = 2
+
+    def __init__(self, _file: TextIO):
+        """Constructor.
+
+        Args:
+            _file: File handle to write the XML to.
+        """
+        self._write = _file.write
+
+    def _format_attributes(self, attrs: Optional[Dict[str, Any]]) -> str:
+        """Formats the attributes of an element in their original order.
+
+        Args:
+            attrs: Attributes of an element.
+
+        Returns:
+            Attributes formatted as a string.
+        """
+        if not attrs:
+            return ""
+
+        # Attributes without a value are omitted.
+        return "".join(
+            f' {key}="{CustomSubstitution.substitute_xml(str(value))}"'
+            for key, value in attrs.items()
+            if value is not None
+        )
+
+    def empty_element(
+        self, name: str, attrs: Optional[Dict[str, Any]] = None, depth: int = 0
+    ):
+        """Writes an element which has no children.
+
+        Args:
+            name: Name of the element.
+            attrs: Attributes of the element.
+            depth: Nesting level of the element.
+        """
+        self._write(
+            f"{' ' * (depth * self.INDENT)}<{name}"
+            f"{self._format_attributes(attrs)}/>\n"
+        )
+
+    def end_element(self, name: str, depth: int = 0):
+        """Writes the closing tag of an element.
+
+        Args:
+            name: Name of the element.
+            depth: Nesting level of the element.
+        """
+        self._write(f"{' ' * (depth * self.INDENT)}</{name}>\n")
+
+    def start_element(
+        self, name: str, attrs: Optional[Dict[str, Any]] = None, depth: int = 0
+    ):
+        """Writes the opening tag of an element.
+
+        Args:
+            name: Name of the element.
+            attrs: Attributes of the element.
+            depth: Nesting level of the element.
+        """
+        self._write(
+            f"{' ' * (depth * self.INDENT)}<{name}"
+            f"{self._format_attributes(attrs)}>\n"
+        )
+
+    def write_declaration(self):
+        "Writes the XML declaration."
+        self._write('<?xml version="1.0" encoding="utf-8"?>\n')
+
+    def write_playlist(self, playlist: RekordboxPlaylist, depth: int = 0):
+        """Writes a playlist as a NODE element.
+
+        Args:
+            playlist: Playlist to write along with its nested playlists.
+            depth: Nesting level of the element.
+        """
+        attrs = playlist.get_attributes()
+        if playlist.is_folder():
+            children = playlist.get_playlists()
+            if not children:
+                self.empty_element("NODE", attrs, depth)
+                return
+            self.start_element("NODE", attrs, depth)
+            for child in children:
+                self.write_playlist(child, depth + 1)
+            self.end_element("NODE", depth)
+            return
+
+        tracks = playlist.get_tracks()
+        if not tracks:
+            self.empty_element("NODE", attrs, depth)
+            return
+        self.start_element("NODE", attrs, depth)
+        indent = " " * ((depth + 1) * self.INDENT)
+        for track_id in tracks:
+            self._write(
+                f'{indent}<TRACK Key="'
+                f'{CustomSubstitution.substitute_xml(str(track_id))}"/>\n'
+            )
+        self.end_element("NODE", depth)
+
+    def write_track(self, track: RekordboxTrack, depth: int = 0):
+        """Writes a track as a TRACK element.
+
+        Args:
+            track: Track to write along with its beat grid and hot cues.
+            depth: Nesting level of the element.
+        """
+        attrs = track.get_attributes()
+        beat_grid = track.get_beat_grid()
+        hot_cues = track.get_hot_cues()
+        if not (beat_grid or hot_cues):
+            self.empty_element("TRACK", attrs, depth)
+            return
+        self.start_element("TRACK", attrs, depth)
+        for attrs in beat_grid:
+            self.empty_element("TEMPO", attrs, depth + 1)
+        for attrs in hot_cues:
+            self.empty_element("POSITION_MARK", attrs, depth + 1)
+        self.end_element("TRACK", depth)
+
+
+class RekordboxSplicer(RekordboxWriter):
+    """Helper class to splice the changes to a RekordboxCollection into a copy
+    of the XML it was deserialized from.
+
+    The original XML is copied up to the lines of each modified element which
+    are replaced by the element being written. TRACK and NODE elements that
+    are written but haven't been modified, including those nested in modified
+    NODE elements, are copied verbatim from the original XML.
+    """
+
+    def __init__(self, _file: TextIO, source: mmap.mmap):
+        """Constructor.
+
+        Args:
+            _file: File handle to write the XML to.
+            source: Memory map of the original XML.
+        """
+        super().__init__(_file)
+        self._position = 0
+        self._source = source
+
+    def _copy(self, start: int, end: int):
+        """Copies a range of bytes of the original XML.
+
+        Args:
+            start: Offset of the first byte to copy.
+            end: Offset after the last byte to copy.
+        """
+        if start < end:
+            self._write(self._source[start:end].decode("utf-8"))
+
+    def _get_lines(self, span: Optional[Span]) -> Tuple[int, int]:
+        """Gets the lines an element occupies in the original XML.
+
+        Args:
+            span: Span of the element.
+
+        Raises:
+            ValueError: The element must have been parsed from the original
+                XML and must occupy whole lines.
+
+        Returns:
+            Offsets of the start of the element's first line and the end of
+                its last line.
+        """
+        if span is None:
+            raise ValueError("an element wasn't parsed from the XML")
+
+        start, end, has_children = span
+        source = self._source
+
+        # Unless the element is an empty-element tag, its end is the end of
+        # the end tag that follows the offset.
+        if has_children or source[end - 2 : end] != b"/>":
+            end = source.find(b">", end) + 1
+        line_start = source.rfind(b"\n", 0, start) + 1
+        line_end = end + (2 if source[end : end + 2] == b"\r\n" else 1)
+        if (
+            not end
+            or source[line_start:start].strip()
+            or source[end:line_end].strip()
+        ):
+            raise ValueError(
+                f"the element at byte {start} doesn't occupy whole lines"
+            )
+
+        return line_start, line_end
+
+    def _is_unmodified(self, playlist: RekordboxPlaylist) -> bool:
+        """Checks if a playlist and its nested playlists can be copied.
+
+        Args:
+            playlist: Playlist to check.
+
+        Returns:
+            Whether or not the playlist and its nested playlists are
+                unmodified and were parsed from the original XML.
+        """
+        if playlist.is_modified() or playlist.get_span() is None:
+            return False
+        if not playlist.is_folder():
+            return True
+
+        return all(self._is_unmodified(child) for child in playlist)
+
+    def finish(self):
+        "Copies the rest of the original XML."
+        self._copy(self._position, len(self._source))
+        self._position = len(self._source)
+
+    def replace(self, span: Optional[Span]):
+        """Copies the original XML up to an element which is then skipped.
+
+        The lines of the element are replaced by whatever is written next.
+
+        Args:
+            span: Span of the element to replace.
+        """
+        line_start, line_end = self._get_lines(span)
+        self._copy(self._position, line_start)
+        self._position = line_end
+
+    def splice_playlist(self, playlist: RekordboxPlaylist, depth: int = 0):
+        """Replaces a playlist, or the nested playlists, that were modified.
+
+        Args:
+            playlist: Playlist to splice along with its nested playlists.
+            depth: Nesting level of the element.
+        """
+        if playlist.is_modified() or playlist.get_span() is None:
+            self.replace(playlist.get_span())
+            self.write_playlist(playlist, depth)
+            return
+
+        if playlist.is_folder():
+            for child in playlist:
+                self.splice_playlist(child, depth + 1)
+
+    def write_playlist(self, playlist: RekordboxPlaylist, depth: int = 0):
+        """Writes a playlist as a NODE element.
+
+        Args:
+            playlist: Playlist to write along with its nested playlists.
+            depth: Nesting level of the element.
+        """
+        if self._is_unmodified(playlist):
+            self._copy(*self._get_lines(playlist.get_span()))
+            return
+
+        super().write_playlist(playlist, depth)
+
+    def write_track(self, track: RekordboxTrack, depth: int = 0):
+        """Writes a track as a TRACK element.
+
+        Args:
+            track: Track to write along with its beat grid and hot cues.
+            depth: Nesting level of the element.
+        """
+        if not track.is_modified() and track.get_span() is not None:
+            self._copy(*self._get_lines(track.get_span()))
+            return
+
+        super().write_track(track, depth)
+
+
 class UnsortedAttributes(XMLFormatter):
     "Helper class to serialize Tag attributes in their original order."
 
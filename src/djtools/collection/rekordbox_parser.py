@@ -0,0 +1,324 @@
+"""This module contains the class for the RekordboxParser.
+
+RekordboxParser streams the XML format that Rekordbox exports through an
+incremental parser. Rather than building a document tree, each TRACK and NODE
+element is reduced to a record of its attributes as soon as it's closed so that
+RekordboxTracks and RekordboxPlaylists can be built from them directly.
+
+Records also hold the span of bytes their element occupies in the XML so that
+unchanged elements can be copied verbatim when a collection is serialized.
+
+The TRACK elements of large collections may be split into chunks, at the start
+of TRACK elements, which are parsed in a pool of processes.
+"""
+
+import mmap
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from xml.parsers import expat
+
+from djtools.collection.rekordbox_playlist import PlaylistRecord
+from djtools.collection.rekordbox_track import Span, TrackRecord
+from djtools.utils.helpers import make_path
+
+
+class RekordboxParser:  # pylint: disable=too-many-instance-attributes
+    "Streaming parser for the XML format that Rekordbox exports."
+
+    # Number of chunks of TRACK elements per worker process. Using more chunks
+    # than processes balances the work when chunks take longer than others.
+    CHUNKS_PER_WORKER = 4
+
+    # Start tag of the COLLECTION element. Attribute values may contain ">" so
+    # the end of the tag is found by skipping quoted values.
+    COLLECTION_START = re.compile(
+        rb"<COLLECTION(?:\s+[^\s=/>]+\s*=\s*(?:\"[^\"]*\"|'[^']*'))*\s*(/?)>"
+    )
+
+    # Elements whose attributes are needed to serialize a collection.
+    HEADER_TAGS = ("DJ_PLAYLISTS", "PRODUCT")
+
+    def __init__(self):
+        "Constructor."
+        self._collection = None
+        self._elements = 0
+        self._header = {}
+        self._nodes = []
+        self._offset = 0
+        self._parser = None
+        self._playlists = None
+        self._track = None
+        self._tracks = []
+
+    def _create_parser(self, offset: int = 0) -> "expat.XMLParserType":
+        """Creates an incremental parser which calls this parser's handlers.
+
+        Args:
+            offset: Byte offset in the XML of the first byte to be parsed.
+
+        Returns:
+            Expat parser.
+        """
+        self._offset = offset
+        self._parser = expat.ParserCreate()
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+
+        return self._parser
+
+    def _end_element(self, name: str):
+        """Handles the end of an element.
+
+        Args:
+            name: Name of the element.
+        """
+        if name == "TRACK" and self._track is not None:
+            # Only tracks with a location are part of the collection.
+            attrs, beat_grid, hot_cues, start = self._track
+            if attrs.get("Location"):
+                self._tracks.append(
+                    (attrs, beat_grid, hot_cues, self._get_span(start))
+                )
+            self._track = None
+        elif name == "NODE":
+            attrs, children, start = self._nodes.pop()
+            node = (attrs, children, self._get_span(start))
+            if self._nodes:
+                self._nodes[-1][1].append(node)
+            else:
+                self._playlists = node
+        elif name == "COLLECTION":
+            self._collection = self._get_span(self._collection)
+
+    def _find_tracks(self, data: mmap.mmap) -> Optional[Tuple[int, int]]:
+        """Finds the bytes between the start and end tags of the COLLECTION.
+
+        Args:
+            data: Memory map of a Rekordbox XML file.
+
+        Returns:
+            Byte offsets of the end of the COLLECTION element's start tag and
+                the start of its end tag or None if it has no TRACK elements.
+        """
+        start_tag = self.COLLECTION_START.search(data)
+        if not start_tag or start_tag.group(1):
+            return None
+        end = data.find(b"</COLLECTION", start_tag.end())
+        if end < 0:
+            return None
+
+        return start_tag.end(), end
+
+    def _get_span(self, start: Tuple[int, int]) -> Span:
+        """Gets the span of the element that's ending.
+
+        Args:
+            start: Byte offset of the element's start tag and the number of
+                elements started before its children.
+
+        Returns:
+            Span of the element.
+        """
+        offset, elements = start
+
+        return (
+            offset,
+            self._parser.CurrentByteIndex + self._offset,
+            self._elements > elements,
+        )
+
+    def _get_start(self) -> Tuple[int, int]:
+        """Gets the start of the element that's starting.
+
+        Returns:
+            Byte offset of the element's start tag and the number of elements
+                started so far.
+        """
+        return (self._parser.CurrentByteIndex + self._offset, self._elements)
+
+    def _parse_rest(self, path: Path, start: int, end: int):
+        """Parses an XML except for the bytes between two offsets.
+
+        Args:
+            path: Path to a Rekordbox XML file.
+            start: Offset of the first byte to skip.
+            end: Offset after the last byte to skip.
+        """
+        parser = self._create_parser()
+        with open(path, mode="rb") as _file:
+            parser.Parse(_file.read(start))
+
+            # The skipped TRACK elements are children of the COLLECTION
+            # element and offsets after them are shifted by their length.
+            self._elements += 1
+            self._offset = end - start
+            _file.seek(end)
+            parser.ParseFile(_file)
+        self._parser = None
+
+    def _parse_tracks(
+        self, path: Path, start: int, end: int
+    ) -> List[TrackRecord]:
+        """Parses the TRACK elements between two offsets of an XML.
+
+        Args:
+            path: Path to a Rekordbox XML file.
+            start: Offset of the start of the first TRACK element.
+            end: Offset after the last TRACK element.
+
+        Returns:
+            List of TRACK element records in document order.
+        """
+        with open(path, mode="rb") as _file:
+            _file.seek(start)
+            chunk = _file.read(end - start)
+
+        # The TRACK elements are wrapped in a COLLECTION element so that they
+        # form a document.
+        root = b"<COLLECTION>"
+        parser = self._create_parser(offset=start - len(root))
+        parser.Parse(root)
+        parser.Parse(chunk)
+        parser.Parse(b"</COLLECTION>", True)
+        self._parser = None
+
+        return self._tracks
+
+    def _split_tracks(
+        self, data: mmap.mmap, start: int, end: int, chunks: int
+    ) -> List[int]:
+        """Splits the TRACK elements of an XML into chunks of similar size.
+
+        Args:
+            data: Memory map of a Rekordbox XML file.
+            start: Offset of the end of the COLLECTION element's start tag.
+            end: Offset of the start of the COLLECTION element's end tag.
+            chunks: Number of chunks to split the TRACK elements into.
+
+        Returns:
+            Offsets of the boundaries between chunks, including the start and
+                end, with every boundary other than those at the start of a
+                TRACK element.
+        """
+        boundaries = [start]
+        for index in range(1, chunks):
+            position = data.find(
+                b"<TRACK",
+                max(
+                    boundaries[-1] + 1, start + (end - start) * index // chunks
+                ),
+                end,
+            )
+            if position < 0:
+                break
+            boundaries.append(position)
+        boundaries.append(end)
+
+        return boundaries
+
+    def _start_element(self, name: str, attrs: Dict[str, str]):
+        """Handles the start of an element.
+
+        Args:
+            name: Name of the element.
+            attrs: Attributes of the element.
+        """
+        self._elements += 1
+        if name == "TRACK":
+            # TRACK elements within a playlist only reference a track by key.
+            if self._nodes:
+                self._nodes[-1][1].append(attrs.get("Key"))
+            else:
+                self._track = (attrs, [], [], self._get_start())
+        elif name == "TEMPO" and self._track is not None:
+            self._track[1].append(attrs)
+        elif name == "POSITION_MARK" and self._track is not None:
+            self._track[2].append(attrs)
+        elif name == "NODE":
+            self._nodes.append((attrs, [], self._get_start()))
+        elif name == "COLLECTION":
+            self._collection = self._get_start()
+        elif name in self.HEADER_TAGS:
+            self._header[name] = attrs
+
+    def get_collection_span(self) -> Optional[Span]:
+        """Returns the span of the COLLECTION element.
+
+        Returns:
+            Span of the COLLECTION element.
+        """
+        return self._collection
+
+    def get_header(self) -> Dict[str, Dict[str, str]]:
+        """Returns the attributes of the DJ_PLAYLISTS and PRODUCT elements.
+
+        Returns:
+            Dict of element names to their attributes.
+        """
+        return self._header
+
+    def get_playlists(self) -> Optional[PlaylistRecord]:
+        """Returns the record of the root playlist.
+
+        Returns:
+            Record of the root NODE element.
+        """
+        return self._playlists
+
+    def get_tracks(self) -> List[TrackRecord]:
+        """Returns the records of the tracks in the collection.
+
+        Returns:
+            List of TRACK element records in document order.
+        """
+        return self._tracks
+
+    @make_path
+    def parse(
+        self, path: Path, workers: Optional[int] = None
+    ) -> "RekordboxParser":
+        """Streams an XML file through the parser.
+
+        Args:
+            path: Path to a Rekordbox XML file.
+            workers: Number of processes to parse the TRACK elements in. The
+                rest of the XML is parsed in this process meanwhile.
+
+        Returns:
+            This parser.
+        """
+        tracks = None
+        if workers and workers > 1:
+            with (
+                open(path, mode="rb") as _file,
+                mmap.mmap(_file.fileno(), 0, access=mmap.ACCESS_READ) as data,
+            ):
+                tracks = self._find_tracks(data)
+                if tracks:
+                    boundaries = self._split_tracks(
+                        data, *tracks, chunks=workers * self.CHUNKS_PER_WORKER
+                    )
+
+        if tracks:
+            # pylint: disable=protected-access
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        RekordboxParser()._parse_tracks, path, start, end
+                    )
+                    for start, end in zip(boundaries, boundaries[1:])
+                ]
+                self._parse_rest(path, *tracks)
+                for future in futures:
+                    self._tracks.extend(future.result())
+
+            return self
+
+        parser = self._create_parser()
+        with open(path, mode="rb") as _file:
+            parser.ParseFile(_file)
+        self._parser = None
+
+        return self
@@ -6,15 +6,22 @@ format that Rekordbox exports.
 
 import inspect
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 import bs4
 
 from djtools.collection.base_playlist import Playlist
-from djtools.collection.rekordbox_track import RekordboxTrack
+from djtools.collection.rekordbox_track import RekordboxTrack, Span
 
 # pylint: disable=duplicate-code
 
+# A NODE element's attributes along with either the records of its child NODE
+# elements, for folders, or the Key attributes of its TRACK elements and its
+# span, if it was parsed from an XML file.
+PlaylistRecord = Tuple[
+    Dict[str, str], List[Union["PlaylistRecord", str]], Optional[Span]
+]
+
 
 class RekordboxPlaylist(Playlist):
     "Playlist implementation for usage with Rekordbox."
@@ -40,6 +47,7 @@ class RekordboxPlaylist(Playlist):
         self._tracks = None
         self._playlists = None
         self._parent = parent
+        self.__span = None
         tracks = tracks or {}
 
         # Set this object's attributes with the NODE Tag's attributes.
@@ -104,7 +112,8 @@ class RekordboxPlaylist(Playlist):
             if not (
                 key.startswith(f"_{type(self).__name__}")
                 or not key.startswith("_")
-                or key in {"_parent", "_aggregate"}
+                or key
+                in {"_parent", "_aggregate", "_index", "_modified", "_size"}
             )
         }
 
@@ -158,6 +167,75 @@ class RekordboxPlaylist(Playlist):
         """
         return str(self.serialize())
 
+    @classmethod
+    def from_record(
+        cls,
+        record: PlaylistRecord,
+        tracks: Dict[str, RekordboxTrack],
+        parent: Optional["RekordboxPlaylist"] = None,
+    ) -> "RekordboxPlaylist":
+        """Deserialize a playlist from a record of NODE element data.
+
+        Records are produced by parsers that don't build a BeautifulSoup
+        document, such as the RekordboxParser.
+
+        Args:
+            record: Attributes of a NODE element, its children, and its span.
+            tracks: All the tracks in this collection.
+            parent: The folder this playlist is in.
+
+        Returns:
+            A RekordboxPlaylist.
+        """
+        attrs, children, span = record
+        playlist = cls(
+            bs4.Tag(name="NODE", attrs=attrs),
+            tracks=tracks,
+            playlist_tracks=children,
+            parent=parent,
+        )
+        playlist.__span = span  # pylint: disable=unused-private-member
+        if playlist.is_folder():
+            playlist._playlists = [
+                cls.from_record(child, tracks=tracks, parent=playlist)
+                for child in children
+            ]
+
+        return playlist
+
+    def get_attributes(self) -> Dict[str, str]:
+        """Gets the NODE attributes of this playlist.
+
+        Returns:
+            Dict of attribute names to values in their original order.
+        """
+        # Dunder members aren't serialized. Public members (i.e. methods)
+        # aren't serialized either. Playlists and tracks are serialized as
+        # child elements rather than attributes.
+        attributes = {
+            key[1:]: value
+            for key, value in self.__dict__.items()
+            if not (
+                key.startswith(f"_{type(self).__name__}")
+                or not key.startswith("_")
+                or key
+                in {
+                    "_parent",
+                    "_aggregate",
+                    "_index",
+                    "_modified",
+                    "_playlists",
+                    "_size",
+                    "_tracks",
+                }
+            )
+        }
+
+        # Update the Count or Entries attribute.
+        attributes["Count" if self.is_folder() else "Entries"] = str(len(self))
+
+        return attributes
+
     def get_name(self) -> str:
         """Returns the name of this playlist.
 
@@ -166,6 +244,15 @@ class RekordboxPlaylist(Playlist):
         """
         return self._Name  # pylint: disable=no-member
 
+    def get_span(self) -> Optional[Span]:
+        """Gets the bytes this playlist occupies in the XML it was parsed from.
+
+        Returns:
+            Span of this playlist's NODE element or None if it wasn't parsed
+                from an XML file.
+        """
+        return self.__span
+
     def is_folder(self) -> bool:
         """Returns whether this playlist is a folder or a playlist of tracks.
 
@@ -224,12 +311,13 @@ class RekordboxPlaylist(Playlist):
             ),
         )
         playlist = RekordboxPlaylist(
-            playlist_tag,
-            tracks=tracks,
-            playlist_tracks=(tracks or {}).keys(),
-            enable_aggregation=enable_aggregation,
+            playlist_tag, enable_aggregation=enable_aggregation
         )
         playlist._playlists = playlists
+        # The tracks, which may be a TrackSet, are held rather than copied.
+        playlist._tracks = tracks
+        for child in playlists or []:
+            child._parent = playlist  # pylint: disable=protected-access
 
         return playlist
 
@@ -241,52 +329,22 @@ class RekordboxPlaylist(Playlist):
         """
         # BeautifulSoup Tag to populate with attributes of this playlist.
         playlist_tag = bs4.Tag(name="NODE", can_be_empty_element=True)
-
-        # Dunder members aren't serialized. Public members (i.e. methods)
-        # aren't serialized either.
-        serialize_attrs = {
-            key[1:]: value
-            for key, value in self.__dict__.items()
-            if not (
-                key.startswith(f"_{type(self).__name__}")
-                or not key.startswith("_")
-                or key in {"_parent", "_aggregate"}
-            )
-        }
-
-        # Serialize attributes into a NODE Tag.
-        for key, value in serialize_attrs.items():
-            # Playlists and tracks are serialized as nested Tag objects.
-            if key in ["playlists", "tracks"]:
-                if not value:
-                    continue
-
-                # Iterate and serialize nested playlists.
-                if self.is_folder():
-                    for val in value:
-                        playlist_tag.extend(
-                            [bs4.NavigableString("\n"), val.serialize()]
-                        )
-                # Iterate and serialize tracks.
-                else:
-                    for val in value.values():
-                        playlist_tag.extend(
-                            [
-                                bs4.NavigableString("\n"),
-                                val.serialize(playlist=True),
-                            ]
-                        )
-
-                # Append a final newline character.
-                playlist_tag.append(bs4.NavigableString("\n"))
-                continue
-
-            # Otherwise the data is serialized as NODE Tag attributes.
-            playlist_tag[key] = value
-
-        # Update the Count or Entries attribute.
-        playlist_tag["Count" if self.is_folder() else "Entries"] = str(
-            len(self)
+        playlist_tag.attrs = self.get_attributes()
+
+        # Playlists and tracks are serialized as nested Tag objects.
+        children = (
+            [playlist.serialize() for playlist in self._playlists or []]
+            if self.is_folder()
+            else [
+                track.serialize(playlist=True)
+                for track in (self._tracks or {}).values()
+            ]
         )
+        for child in children:
+            playlist_tag.extend([bs4.NavigableString("\n"), child])
+
+        # Append a final newline character.
+        if children:
+            playlist_tag.append(bs4.NavigableString("\n"))
 
         return playlist_tag
@@ -0,0 +1,254 @@
+"""This module contains the class for the RekordboxSnapshot.
+
+RekordboxSnapshot is a binary sidecar file holding the records that the
+RekordboxParser produces from a Rekordbox XML. Snapshots are keyed by the size,
+modification time, and content hash of the XML they're created from so that an
+unchanged XML can be loaded without being parsed again.
+
+Snapshots start with a fixed-size header of plain bytes holding the key and a
+digest of the pickled records, so a stale or foreign snapshot is rejected
+without unpickling anything. The records' digest is checked before they're
+unpickled so that a corrupted snapshot is parsed again rather than loaded.
+
+Snapshots are trusted local data. The digests aren't keyed, so they detect
+corruption but not tampering, and unpickling a snapshot written by someone
+else can run arbitrary code. Snapshots must not be shared or loaded from
+untrusted locations.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from djtools.collection.rekordbox_parser import RekordboxParser
+from djtools.collection.rekordbox_playlist import PlaylistRecord
+from djtools.collection.rekordbox_track import Span, TrackRecord
+from djtools.utils.helpers import make_path
+
+logger = logging.getLogger(__name__)
+
+
+class RekordboxSnapshot:
+    "Binary snapshot of the records parsed from a Rekordbox XML."
+
+    # Size, in bytes, of the chunks read when hashing an XML.
+    CHUNK_SIZE = 1 << 20
+
+    # Header of a snapshot: the magic bytes, the snapshot version, the size,
+    # modification time, and SHA-256 digest of the XML, and the SHA-256
+    # digest of the pickled records.
+    HEADER = struct.Struct("<4sIQq32s32s")
+
+    # Magic bytes which start every snapshot.
+    MAGIC = b"DJRS"
+
+    # Suffix appended to the name of an XML to get the name of its snapshot.
+    SUFFIX = ".snapshot"
+
+    # Version of the snapshot format. This must be incremented whenever the
+    # structure of the records changes so that stale snapshots are ignored.
+    VERSION = 4
+
+    def __init__(
+        self,
+        header: Dict[str, Dict[str, str]],
+        tracks: List[TrackRecord],
+        playlists: Optional[PlaylistRecord],
+        collection_span: Optional[Span],
+    ):
+        """Constructor.
+
+        Args:
+            header: Attributes of the DJ_PLAYLISTS and PRODUCT elements.
+            tracks: Records of the tracks in the collection.
+            playlists: Record of the root playlist.
+            collection_span: Span of the COLLECTION element.
+        """
+        self._collection_span = collection_span
+        self._header = header
+        self._tracks = tracks
+        self._playlists = playlists
+
+    @classmethod
+    def _get_key(
+        cls, path: Path, stat: os.stat_result
+    ) -> Tuple[int, int, int, bytes]:
+        """Gets the key that identifies a version of an XML.
+
+        Args:
+            path: Path to a Rekordbox XML file.
+            stat: Status of the XML file.
+
+        Returns:
+            Tuple of the snapshot version and the size, modification time, and
+                SHA-256 digest of the XML.
+        """
+        content_hash = hashlib.sha256()
+        with open(path, mode="rb") as _file:
+            while chunk := _file.read(cls.CHUNK_SIZE):
+                content_hash.update(chunk)
+
+        return (
+            cls.VERSION,
+            stat.st_size,
+            stat.st_mtime_ns,
+            content_hash.digest(),
+        )
+
+    @classmethod
+    @make_path
+    def from_xml(
+        cls, path: Path, workers: Optional[int] = None
+    ) -> "RekordboxSnapshot":
+        """Loads the snapshot of an XML, creating it if it's not valid.
+
+        Args:
+            path: Path to a Rekordbox XML file.
+            workers: Number of processes to parse TRACK elements in if the
+                snapshot has to be created.
+
+        Returns:
+            A RekordboxSnapshot of the XML.
+        """
+        snapshot = cls.load(path)
+        if snapshot is not None:
+            return snapshot
+
+        parser = RekordboxParser().parse(path, workers=workers)
+        snapshot = cls(
+            parser.get_header(),
+            parser.get_tracks(),
+            parser.get_playlists(),
+            parser.get_collection_span(),
+        )
+        snapshot.save(path)
+
+        return snapshot
+
+    def get_collection_span(self) -> Optional[Span]:
+        """Returns the span of the COLLECTION element.
+
+        Returns:
+            Span of the COLLECTION element.
+        """
+        return self._collection_span
+
+    def get_header(self) -> Dict[str, Dict[str, str]]:
+        """Returns the attributes of the DJ_PLAYLISTS and PRODUCT elements.
+
+        Returns:
+            Dict of element names to their attributes.
+        """
+        return self._header
+
+    def get_playlists(self) -> Optional[PlaylistRecord]:
+        """Returns the record of the root playlist.
+
+        Returns:
+            Record of the root NODE element.
+        """
+        return self._playlists
+
+    @staticmethod
+    @make_path
+    def get_path(path: Path) -> Path:
+        """Gets the path of the snapshot for an XML.
+
+        Args:
+            path: Path to a Rekordbox XML file.
+
+        Returns:
+            Path to the snapshot of the XML.
+        """
+        return path.with_name(f"{path.name}{RekordboxSnapshot.SUFFIX}")
+
+    def get_tracks(self) -> List[TrackRecord]:
+        """Returns the records of the tracks in the collection.
+
+        Returns:
+            List of TRACK element records in document order.
+        """
+        return self._tracks
+
+    @classmethod
+    @make_path
+    def load(cls, path: Path) -> Optional["RekordboxSnapshot"]:
+        """Loads the snapshot of an XML.
+
+        Args:
+            path: Path to a Rekordbox XML file.
+
+        Returns:
+            A RekordboxSnapshot of the XML or None if there isn't a snapshot,
+                the XML has changed since the snapshot was saved, or the
+                snapshot is corrupted.
+        """
+        snapshot_path = cls.get_path(path)
+        if not snapshot_path.exists():
+            return None
+
+        try:
+            with open(snapshot_path, mode="rb") as _file:
+                # The header is stored ahead of the records so that a stale
+                # snapshot is rejected without reading the rest of the file.
+                header = _file.read(cls.HEADER.size)
+                if len(header) != cls.HEADER.size:
+                    return None
+
+                magic, *key, records_digest = cls.HEADER.unpack(header)
+                stat = path.stat()
+                if (
+                    magic != cls.MAGIC
+                    or tuple(key[:3])
+                    != (cls.VERSION, stat.st_size, stat.st_mtime_ns)
+                    or tuple(key) != cls._get_key(path, stat)
+                ):
+                    return None
+
+                records = _file.read()
+            if hashlib.sha256(records).digest() != records_digest:
+                raise ValueError("the digest of the records doesn't match")
+
+            return cls(*pickle.loads(records))
+        # A corrupted snapshot may raise any exception when it's unpickled.
+        except Exception as exc:
+            logger.warning(f"Failed to load snapshot {snapshot_path}: {exc}")
+
+        return None
+
+    @make_path
+    def save(self, path: Path):
+        """Saves this snapshot for an XML.
+
+        Args:
+            path: Path to the Rekordbox XML file this snapshot was created
+                from.
+        """
+        snapshot_path = self.get_path(path)
+        partial_path = snapshot_path.with_name(f"{snapshot_path.name}.part")
+        records = pickle.dumps(
+            (
+                self._header,
+                self._tracks,
+                self._playlists,
+                self._collection_span,
+            ),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        try:
+            with open(partial_path, mode="wb") as _file:
+                _file.write(
+                    self.HEADER.pack(
+                        self.MAGIC,
+                        *self._get_key(path, path.stat()),
+                        hashlib.sha256(records).digest(),
+                    )
+                )
+                _file.write(records)
+            os.replace(partial_path, snapshot_path)
+        except OSError as exc:
+            logger.warning(f"Failed to save snapshot {snapshot_path}: {exc}")
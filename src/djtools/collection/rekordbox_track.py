@@ -8,7 +8,7 @@ import os
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple
 from urllib.parse import quote, unquote
 
 import bs4
@@ -16,81 +16,391 @@ import bs4
 from djtools.collection.base_track import Track
 from djtools.utils.helpers import make_path
 
-# pylint: disable=no-member,duplicate-code
+# pylint: disable=no-member,duplicate-code,too-many-public-methods
+
+# The bytes an element occupies in an XML: the offset of its start tag, the
+# offset that expat reports at the end of the element, and whether or not it has
+# child elements. Expat reports the offset of the end tag of an element with
+# children but the offset after an element without children, which may or may
+# not have been written as an empty-element tag.
+Span = Tuple[int, int, bool]
+
+# A TRACK element's attributes along with the attributes of its TEMPO and
+# POSITION_MARK elements and its span, if it was parsed from an XML file.
+TrackRecord = Tuple[
+    Dict[str, str],
+    List[Dict[str, str]],
+    List[Dict[str, str]],
+    Optional[Span],
+]
+
+
+# Prefix of the path to the audio file corresponding to a track.
+LOCATION_PREFIX = (
+    "file://localhost" if os.name == "posix" else "file://localhost/"
+)
+
+# Percent-encoded characters of a location, which Rekordbox writes in lowercase.
+PERCENT_ENCODING = re.compile(r"%[0-9A-Z]{2}")
+
+# Values of the Rating attribute for each number of stars.
+RATINGS = {"0": 0, "51": 1, "102": 2, "153": 3, "204": 4, "255": 5}
+
+
+def _decode_date(value: str) -> datetime:
+    """Decodes the value of a DateAdded attribute.
+
+    Args:
+        value: Date formatted as YYYY-MM-DD.
+
+    Returns:
+        The date as a datetime.
+    """
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def _decode_genre(value: str) -> List[str]:
+    """Decodes the value of a Genre attribute.
+
+    Args:
+        value: Genre tags separated by forward slashes.
+
+    Returns:
+        The genre tags.
+    """
+    return [x.strip() for x in value.split("/")]
+
+
+def _decode_location(value: str) -> Path:
+    """Decodes the value of a Location attribute.
+
+    Args:
+        value: Quoted path prefixed with the location prefix.
+
+    Returns:
+        The path.
+    """
+    return Path(unquote(value).split(LOCATION_PREFIX)[-1])
+
+
+def _encode_bpm(value: float) -> str:
+    """Encodes the value of an AverageBpm attribute.
+
+    Args:
+        value: BPM.
+
+    Returns:
+        The BPM with increased precision to make serialization symmetrical.
+    """
+    return f"{value:0,.2f}"
+
+
+def _encode_date(value: datetime) -> str:
+    """Encodes the value of a DateAdded attribute.
+
+    Args:
+        value: Date.
+
+    Returns:
+        The date with the HH:MM:SS part truncated.
+    """
+    return value.strftime("%Y-%m-%d")
+
+
+def _encode_genre(value: List[str]) -> str:
+    """Encodes the value of a Genre attribute.
+
+    Args:
+        value: Genre tags.
+
+    Returns:
+        The genre tags joined with forward slashes.
+    """
+    return " / ".join(value)
+
+
+def _encode_location(value: Path) -> str:
+    """Encodes the value of a Location attribute.
+
+    Args:
+        value: Path.
+
+    Returns:
+        The quoted path prefixed with the location prefix.
+    """
+    track_path = quote(value.as_posix(), safe="/,()!+=#;$:")
+
+    return PERCENT_ENCODING.sub(
+        lambda x: x.group(0).lower(), f"{LOCATION_PREFIX}{track_path}"
+    )
+
+
+# Decoder and encoder of each TRACK attribute whose values aren't strings. The
+# values of other attributes are decoded as is and encoded with str.
+CODECS: Dict[str, Tuple[Callable[[str], Any], Callable[[Any], str]]] = {
+    "AverageBpm": (float, _encode_bpm),
+    "BitRate": (int, str),
+    "DateAdded": (_decode_date, _encode_date),
+    "DiscNumber": (int, str),
+    "Genre": (_decode_genre, _encode_genre),
+    "Location": (_decode_location, _encode_location),
+    "PlayCount": (int, str),
+    "Rating": (
+        RATINGS.get,
+        {stars: value for value, stars in RATINGS.items()}.get,
+    ),
+    "SampleRate": (int, str),
+    "Size": (int, str),
+    "TotalTime": (int, str),
+    "TrackNumber": (int, str),
+}
 
 
 class RekordboxTrack(Track):
     "Track implementation for usage with Rekordbox."
 
+    # Attributes of TRACK elements exported by Rekordbox. The raw value of each
+    # of these is stored in a slot of the same name prefixed with an
+    # underscore while any other attribute is stored in an overflow mapping.
+    SCHEMA = (
+        "TrackID",
+        "Name",
+        "Artist",
+        "Composer",
+        "Album",
+        "Grouping",
+        "Genre",
+        "Kind",
+        "Size",
+        "TotalTime",
+        "DiscNumber",
+        "TrackNumber",
+        "Year",
+        "AverageBpm",
+        "DateAdded",
+        "BitRate",
+        "SampleRate",
+        "Comments",
+        "PlayCount",
+        "Rating",
+        "Location",
+        "Remixer",
+        "Tonality",
+        "Label",
+        "Mix",
+    )
+
+    __slots__ = tuple(f"_{key}" for key in SCHEMA) + (
+        "_beat_grid",
+        "_decoded",
+        "_extra",
+        "_hot_cues",
+        "_modified",
+        "_order",
+        "_span",
+    )
+
+    # Orders of attribute names seen so far. Tracks with attributes in the
+    # same order share a single tuple.
+    _ORDERS: ClassVar[Dict[Tuple[str, ...], Tuple[str, ...]]] = {}
+
+    # Names of the slots holding the raw values of the schema's attributes.
+    _SLOTS: ClassVar[Dict[str, str]] = {key: f"_{key}" for key in SCHEMA}
+
     def __init__(self, track: bs4.element.Tag):
         """Deserialize a track from a BeautifulSoup TRACK Tag.
 
         Args:
             track: BeautifulSoup Tag representing a track.
         """
-        # Prefix of the path to the audio file corresponding to this track.
         super().__init__()
-        self.__location_prefix = (
-            "file://localhost" if os.name == "posix" else "file://localhost/"
+        self._deserialize(
+            track.attrs,
+            [point.attrs for point in track.find_all("TEMPO")],
+            [hot_cue.attrs for hot_cue in track.find_all("POSITION_MARK")],
+            None,
         )
 
-        # Set class attributes from TRACK Tag attributes.
-        for key, value in track.attrs.items():
-            parsed_value = value
-            if key in [
-                "BitRate",
-                "DiscNumber",
-                "PlayCount",
-                "SampleRate",
-                "Size",
-                "TotalTime",
-                "TrackNumber",
-            ]:
-                parsed_value = int(value)
-            if key == "AverageBpm":
-                parsed_value = float(value)
-            if key == "DateAdded":
-                # We need to keep the original date added string because
-                # Rekordbox doesn't format date strings consistently i.e.
-                # ensuring perfect serialization symmetry is not possible
-                # without this.
-                self.__original_date_added = value
-                parsed_value = datetime.strptime(value, "%Y-%m-%d")
-            if key == "Genre":
-                parsed_value = [x.strip() for x in value.split("/")]
-            if key == "Location":
-                parsed_value = Path(
-                    unquote(value).split(self.__location_prefix)[-1]
-                )
-            if key == "Rating":
-                parsed_value = {
-                    "0": 0,
-                    "51": 1,
-                    "102": 2,
-                    "153": 3,
-                    "204": 4,
-                    "255": 5,
-                }.get(value)
-            setattr(self, f"_{key}", parsed_value)
+    def _decode(self, key: str, value: str) -> Any:
+        """Decodes the value of a TRACK attribute.
+
+        Args:
+            key: Name of the attribute.
+            value: Value of the attribute as a string.
+
+        Returns:
+            The decoded value of the attribute.
+        """
+        codec = CODECS.get(key)
+
+        return value if codec is None else codec[0](value)
+
+    def _deserialize(
+        self,
+        attrs: Dict[str, str],
+        beat_grid: List[Dict[str, str]],
+        hot_cues: List[Dict[str, str]],
+        span: Optional[Span],
+    ):
+        """Sets the attributes of this track from TRACK element data.
+
+        Attribute values are kept as the original strings and are only
+        decoded the first time they're accessed.
+
+        Args:
+            attrs: Attributes of a TRACK element.
+            beat_grid: Attributes of the TRACK's TEMPO elements.
+            hot_cues: Attributes of the TRACK's POSITION_MARK elements.
+            span: Bytes the TRACK element occupies in the XML it was parsed
+                from.
+        """
+        extra = None
+        for key, value in attrs.items():
+            slot = self._SLOTS.get(key)
+            if slot is not None:
+                setattr(self, slot, value)
+                continue
+            if extra is None:
+                extra = {}
+            extra[key] = value
+        self._extra = extra
+        self._order = self._intern_order(tuple(attrs))
+        self._decoded = None
+
+        # TEMPO elements are the beat grid and POSITION_MARK elements are the
+        # hot cues.
+        self._beat_grid = beat_grid
+        self._hot_cues = hot_cues
+        self._modified = False
+        self._span = span
+
+    def _encode(self, key: str, value: Any) -> str:
+        """Encodes the value of a TRACK attribute.
+
+        Args:
+            key: Name of the attribute.
+            value: Decoded value of the attribute.
+
+        Returns:
+            The value of the attribute as a string.
+        """
+        codec = CODECS.get(key)
+
+        return str(value) if codec is None else codec[1](value)
+
+    def _get_my_tags(self) -> List[str]:
+        """Gets the MyTags of the track.
+
+        Returns:
+            A list of the track's MyTags parsed from its comments.
+        """
+        decoded = self._get_decoded()
+        try:
+            return decoded["MyTags"]
+        except KeyError:
+            pass
 
         # Parse MyTag data from Comments attribute.
-        my_tags = re.search(r"(?<=\/\*).*(?=\*\/)", self._Comments)
-        self._MyTags = (  # pylint: disable=invalid-name
+        my_tags = re.search(r"(?<=\/\*).*(?=\*\/)", self.get_comments())
+        my_tags = (
             [x.strip() for x in my_tags.group().split("/")] if my_tags else []
         )
+        decoded["MyTags"] = my_tags
+
+        return my_tags
+
+    def _get_decoded(self) -> Dict[str, Any]:
+        """Gets the cache of decoded values, creating it if necessary.
+
+        Returns:
+            Dict of attribute names to decoded values.
+        """
+        if self._decoded is None:
+            self._decoded = {}
+
+        return self._decoded
 
-        # Merge Genre and MyTag data into a new attribute.
-        self._Tags = self._Genre + self._MyTags  # pylint: disable=invalid-name
+    def _get_raw_value(self, key: str) -> str:
+        """Gets the raw value of a TRACK attribute.
 
-        # Parse TEMPO Tags as the beat grid attribute.
-        self._beat_grid = track.find_all("TEMPO")
-        if self._beat_grid:
-            self._beat_grid = [point.attrs for point in self._beat_grid]
+        Args:
+            key: Name of the attribute.
+
+        Raises:
+            AttributeError: The track must have the attribute.
+
+        Returns:
+            The value of the attribute as a string.
+        """
+        slot = self._SLOTS.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        if self._extra is None or key not in self._extra:
+            raise AttributeError(
+                f"{type(self).__name__} has no attribute {key}"
+            )
 
-        # Parse POSITION_MARK Tags as the hot cues attribute.
-        self._hot_cues = track.find_all("POSITION_MARK")
-        if self._hot_cues:
-            self._hot_cues = [hot_cue.attrs for hot_cue in self._hot_cues]
+        return self._extra[key]
+
+    def _get_value(self, key: str) -> Any:
+        """Gets the decoded value of a TRACK attribute.
+
+        Args:
+            key: Name of the attribute.
+
+        Returns:
+            The decoded value of the attribute.
+        """
+        decoded = self._get_decoded()
+        try:
+            return decoded[key]
+        except KeyError:
+            pass
+
+        value = self._decode(key, self._get_raw_value(key))
+        decoded[key] = value
+
+        return value
+
+    @classmethod
+    def _intern_order(cls, order: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Gets the shared tuple for an order of attribute names.
+
+        Args:
+            order: Names of attributes in the order they're serialized.
+
+        Returns:
+            Tuple equal to order that's shared between tracks.
+        """
+        return cls._ORDERS.setdefault(order, order)
+
+    def _set_value(self, key: str, value: Any):
+        """Sets the value of a TRACK attribute.
+
+        Args:
+            key: Name of the attribute.
+            value: Decoded value of the attribute.
+        """
+        # Setting an attribute to its current value keeps the original
+        # encoding of the value.
+        try:
+            if self._get_value(key) == value:
+                return
+        except AttributeError:
+            pass
+
+        raw_value = self._encode(key, value)
+        if key not in self._order:
+            self._order = self._intern_order(self._order + (key,))
+        slot = self._SLOTS.get(key)
+        if slot is not None:
+            setattr(self, slot, raw_value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = raw_value
+        self._get_decoded()[key] = value
+        self._modified = True
 
     def __repr__(self) -> str:
         """Produces a string representation of this track.
@@ -105,16 +415,17 @@ class RekordboxTrack(Track):
         # Body of the repr string to fill out with track contents.
         body = " " * 4
 
-        # Dunder members aren't represented. Public members (i.e. methods)
-        # aren't represented either.
-        repr_attrs = {
-            key[1:]: value
-            for key, value in self.__dict__.items()
-            if not (
-                key.startswith(f"_{type(self).__name__}")
-                or not key.startswith("_")
-            )
-        }
+        # Represent the decoded TRACK attributes followed by the tags, beat
+        # grid, and hot cues.
+        repr_attrs = {key: self._get_value(key) for key in self._order}
+        repr_attrs.update(
+            {
+                "MyTags": self._get_my_tags(),
+                "Tags": self.get_tags(),
+                "beat_grid": self._beat_grid,
+                "hot_cues": self._hot_cues,
+            }
+        )
 
         # Build a representation of this track.
         for key, value in repr_attrs.items():
@@ -150,13 +461,59 @@ class RekordboxTrack(Track):
         """
         return str(self.serialize())
 
+    @classmethod
+    def from_record(cls, record: TrackRecord) -> "RekordboxTrack":
+        """Deserialize a track from a record of TRACK element data.
+
+        Records are produced by parsers that don't build a BeautifulSoup
+        document, such as the RekordboxParser.
+
+        Args:
+            record: Attributes of a TRACK element, the attributes of its
+                TEMPO and POSITION_MARK elements, and its span.
+
+        Returns:
+            A RekordboxTrack.
+        """
+        track = cls.__new__(cls)
+        track._deserialize(*record)
+
+        return track
+
     def get_artists(self) -> str:
         """Gets the track artists.
 
         Returns:
             A string representing the track's artists.
         """
-        return self._Artist
+        return self._get_value("Artist")
+
+    def get_attributes(self) -> Dict[str, str]:
+        """Gets the TRACK attributes of this track as serialized strings.
+
+        Attributes that haven't been set since this track was deserialized
+        are returned verbatim.
+
+        Returns:
+            Dict of attribute names to values in their original order.
+        """
+        return {key: self._get_raw_value(key) for key in self._order}
+
+    def get_beat_grid(self) -> List[Dict[str, str]]:
+        """Gets the beat grid of the track.
+
+        Returns:
+            A list of the attributes of the track's TEMPO elements.
+        """
+        return self._beat_grid
+
+    def get_bit_rate(self) -> int:
+        """Gets the track bit rate.
+
+        Returns:
+            An integer representing the track's bit rate.
+        """
+        return self._get_value("BitRate")
 
     def get_bpm(self) -> float:
         """Gets the track BPM.
@@ -164,7 +521,7 @@ class RekordboxTrack(Track):
         Returns:
             A float representing BPM.
         """
-        return self._AverageBpm
+        return self._get_value("AverageBpm")
 
     def get_comments(self) -> str:
         """Gets the track comments.
@@ -172,7 +529,7 @@ class RekordboxTrack(Track):
         Returns:
             A string representing the track's comments.
         """
-        return self._Comments
+        return self._get_value("Comments")
 
     def get_date_added(self) -> str:
         """Gets the track's date added.
@@ -180,7 +537,7 @@ class RekordboxTrack(Track):
         Returns:
             A datetime representing the track's date added.
         """
-        return self._DateAdded
+        return self._get_value("DateAdded")
 
     def get_genre_tags(self) -> List[str]:
         """Gets the genre tags of the track.
@@ -188,7 +545,15 @@ class RekordboxTrack(Track):
         Returns:
             A list of the track's genre tags.
         """
-        return self._Genre
+        return self._get_value("Genre")
+
+    def get_hot_cues(self) -> List[Dict[str, str]]:
+        """Gets the hot cues of the track.
+
+        Returns:
+            A list of the attributes of the track's POSITION_MARK elements.
+        """
+        return self._hot_cues
 
     def get_id(self) -> str:
         """Get the track ID.
@@ -196,7 +561,7 @@ class RekordboxTrack(Track):
         Returns:
             The ID of this track.
         """
-        return self._TrackID
+        return self._get_value("TrackID")
 
     def get_key(self) -> Any:
         """Gets the track key.
@@ -204,7 +569,7 @@ class RekordboxTrack(Track):
         Returns:
             The key of this track.
         """
-        return self._Tonality
+        return self._get_value("Tonality")
 
     def get_label(self) -> Any:
         """Gets the track label.
@@ -212,7 +577,7 @@ class RekordboxTrack(Track):
         Returns:
             The label of this track.
         """
-        return self._Label
+        return self._get_value("Label")
 
     def get_location(self) -> Path:
         """Gets the location of the track.
@@ -220,7 +585,15 @@ class RekordboxTrack(Track):
         Returns:
             The Path for the location of the track.
         """
-        return self._Location
+        return self._get_value("Location")
+
+    def get_play_count(self) -> int:
+        """Gets the track play count.
+
+        Returns:
+            An integer representing the number of times the track was played.
+        """
+        return self._get_value("PlayCount")
 
     def get_rating(self) -> int:
         """Gets the rating of the track.
@@ -228,7 +601,16 @@ class RekordboxTrack(Track):
         Returns:
             The rating of the track.
         """
-        return self._Rating
+        return self._get_value("Rating")
+
+    def get_span(self) -> Optional[Span]:
+        """Gets the bytes the track occupies in the XML it was parsed from.
+
+        Returns:
+            Span of the track's TRACK element or None if it wasn't parsed
+                from an XML file.
+        """
+        return self._span
 
     def get_tags(self) -> List[str]:
         """Gets the tags of the track.
@@ -236,7 +618,25 @@ class RekordboxTrack(Track):
         Returns:
             A set of the track's tags.
         """
-        return self._Tags
+        decoded = self._get_decoded()
+        try:
+            return decoded["Tags"]
+        except KeyError:
+            pass
+
+        # Merge Genre and MyTag data into the track's tags.
+        tags = self.get_genre_tags() + self._get_my_tags()
+        decoded["Tags"] = tags
+
+        return tags
+
+    def get_total_time(self) -> int:
+        """Gets the track duration.
+
+        Returns:
+            An integer representing the track's duration in seconds.
+        """
+        return self._get_value("TotalTime")
 
     def get_year(self) -> str:
         """Gets the year of the track.
@@ -244,7 +644,15 @@ class RekordboxTrack(Track):
         Returns:
             The year of the track.
         """
-        return self._Year
+        return self._get_value("Year")
+
+    def is_modified(self) -> bool:
+        """Returns whether the track has been modified since deserialization.
+
+        Returns:
+            Whether or not any of the track's attributes have been set.
+        """
+        return self._modified
 
     def serialize(
         self, *args, playlist: bool = False, **kwargs
@@ -255,10 +663,6 @@ class RekordboxTrack(Track):
             playlist: Whether or not to serialize this track as a member of a
                 playlist.
 
-        Raises:
-            ValueError: The DateAdded attribute must serialize into its
-                original format.
-
         Returns:
             BeautifulSoup Tag representing this track.
         """
@@ -272,99 +676,19 @@ class RekordboxTrack(Track):
 
             return track_tag
 
-        # Dunder members aren't serialized. Public members (i.e. methods)
-        # aren't serialized either.
-        serialize_attrs = {
-            key[1:]: value
-            for key, value in self.__dict__.items()
-            if not (
-                key.startswith(f"_{type(self).__name__}")
-                or not key.startswith("_")
-                or key in ["_MyTags", "_Tags"]
-            )
-        }
-
         # Serialize attributes into a TRACK Tag.
-        for key, value in serialize_attrs.items():
-            # Beat grid and hot cue data is serialized as TEMPO and
-            # POSITION_MARK Tags, respectively.
-            if key in ["beat_grid", "hot_cues"]:
-                for val in value:
-                    tag = bs4.Tag(
-                        name="POSITION_MARK" if key == "hot_cues" else "TEMPO",
-                        can_be_empty_element=True,
-                    )
-                    tag.attrs = val
-                    track_tag.extend([bs4.NavigableString("\n"), tag])
-                continue
-
-            # Cast integers back into a string.
-            serialized_value = value
-            if key in [
-                "BitRate",
-                "DiscNumber",
-                "PlayCount",
-                "SampleRate",
-                "Size",
-                "TotalTime",
-                "TrackNumber",
-            ]:
-                serialized_value = str(value)
-
-            # Increase BPM precision to make serialization 100% symmetrical.
-            if key == "AverageBpm":
-                serialized_value = f"{value:0,.2f}"
-
-            # Truncate the HH:MM:SS part of the datetime.
-            if isinstance(value, datetime):
-                # Rekordbox doesn't consistently format dates with or without
-                # leading zeros on the month and day portion of the date
-                # string, so we have to try all three of these formats to see
-                # if the resulting formatting matches the original one.
-                date_formats = [
-                    "%Y-%m-%d",
-                    ("%Y-%-m-%d" if os.name == "posix" else "%Y-%#m-%d"),
-                    ("%Y-%-m-%-d" if os.name == "posix" else "%Y-%#m-%#d"),
-                ]
-                for date_format in date_formats:
-                    attempt = value.strftime(date_format)
-                    if attempt == self.__original_date_added:
-                        break
-                serialized_value = attempt
-
-                if serialized_value != self.__original_date_added:
-                    raise ValueError(  # pragma: no cover
-                        f"Failed to serialize the datetime {serialized_value} "
-                        f"into its original format {self.__original_date_added}"
-                    )
-
-            # Re-join genre tags with forward slashes.
-            if key == "Genre":
-                serialized_value = " / ".join(value)
-
-            # Re-insert the location prefix and quote the path.
-            if key == "Location":
-                track_path = quote(value.as_posix(), safe="/,()!+=#;$:")
-                serialized_value = f"{self.__location_prefix}{track_path}"
-                serialized_value = re.sub(
-                    r"%[0-9A-Z]{2}",
-                    lambda x: x.group(0).lower(),
-                    serialized_value,
-                )
-
-            # Reverse the rating value to the range recognized by Rekordbox.
-            if key == "Rating":
-                serialized_value = {
-                    0: "0",
-                    1: "51",
-                    2: "102",
-                    3: "153",
-                    4: "204",
-                    5: "255",
-                }.get(value)
-
-            # Otherwise the data is serialized as TRACK Tag attributes.
-            track_tag[key] = serialized_value
+        track_tag.attrs = self.get_attributes()
+
+        # Beat grid and hot cue data is serialized as TEMPO and POSITION_MARK
+        # Tags, respectively.
+        for name, elements in [
+            ("TEMPO", self.get_beat_grid()),
+            ("POSITION_MARK", self.get_hot_cues()),
+        ]:
+            for attrs in elements:
+                tag = bs4.Tag(name=name, can_be_empty_element=True)
+                tag.attrs = attrs
+                track_tag.extend([bs4.NavigableString("\n"), tag])
 
         # If this TRACK Tag has children, append a final newline character.
         if len(track_tag) > 1:
@@ -379,7 +703,7 @@ class RekordboxTrack(Track):
         Args:
             location: New location of the track.
         """
-        self._Location = location  # pylint: disable=attribute-defined-outside-init,invalid-name
+        self._set_value("Location", location)
 
     def set_track_number(self, number: int):
         """Sets the track number of a track.
@@ -387,4 +711,4 @@ class RekordboxTrack(Track):
         Args:
             number: Number to set for TrackNumber.
         """
-        self._TrackNumber = number  # pylint: disable=attribute-defined-outside-init,invalid-name
+        self._set_value("TrackNumber", number)
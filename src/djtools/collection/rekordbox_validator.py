@@ -0,0 +1,304 @@
+"""This module contains the class for the RekordboxValidator.
+
+RekordboxValidator checks that a serialized Rekordbox XML matches the XML that
+its collection was deserialized from. Both files are streamed in fixed-size
+chunks, with their XML declarations skipped and each run of whitespace
+normalized to a single space, so that memory usage doesn't depend on the size
+of the collection and the comparison stops at the first divergence.
+"""
+
+import hashlib
+import re
+from itertools import zip_longest
+from os.path import commonprefix
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from djtools.utils.helpers import make_path
+
+
+class RekordboxValidator:
+    "Streaming comparison of two Rekordbox XML files."
+
+    # Size, in bytes, of the chunks read from each file.
+    CHUNK_SIZE = 1 << 20
+
+    # Maximum number of bytes of an element to include in a report.
+    CONTEXT_SIZE = 80
+
+    # XML declaration which differs between Rekordbox and the serializer.
+    DECLARATION = re.compile(rb"\s*<\?xml[^>]*\?>")
+
+    # Start of the elements whose content is hashed separately.
+    ELEMENT = re.compile(rb"<(?:NODE|TRACK)[\s/>]")
+
+    # Runs of whitespace which are normalized to a single space.
+    WHITESPACE = re.compile(rb"\s+")
+
+    @make_path
+    def __init__(self, input_xml: Path, output_xml: Path):
+        """Constructor.
+
+        Args:
+            input_xml: Path to an XML containing the original collection.
+            output_xml: Path to an XML containing the serialized collection.
+        """
+        self._input_xml = input_xml
+        self._output_xml = output_xml
+
+    def _describe(self, path: Path, offset: int) -> str:
+        """Describes the location of a byte in an XML.
+
+        Args:
+            path: Path to an XML file.
+            offset: Offset of a byte in the file.
+
+        Returns:
+            Description of the byte's offset, line, and the element it's in.
+        """
+        line = 1
+        with open(path, mode="rb") as _file:
+            remaining = offset
+            while remaining > 0:
+                chunk = _file.read(min(remaining, self.CHUNK_SIZE))
+                if not chunk:
+                    break
+                line += chunk.count(b"\n")
+                remaining -= len(chunk)
+
+            # The element is the last tag that starts before the offset.
+            start = max(offset - self.CHUNK_SIZE, 0)
+            _file.seek(start)
+            window = _file.read(offset - start + self.CONTEXT_SIZE)
+
+        tag_start = window.rfind(b"<", 0, offset - start + 1)
+        if tag_start < 0:
+            element = "no element"
+        else:
+            tag_end = window.find(b">", tag_start)
+            tag = window[
+                tag_start : tag_end + 1
+                if 0 <= tag_end < tag_start + self.CONTEXT_SIZE
+                else tag_start + self.CONTEXT_SIZE
+            ]
+            element = tag.decode("utf-8", errors="replace")
+
+        return f"{path} at byte {offset} (line {line}) in {element}"
+
+    @staticmethod
+    def _get_offsets(
+        chunk: bytes, offset: int, indices: List[int]
+    ) -> List[int]:
+        """Gets the offsets in a file of bytes of a normalized chunk.
+
+        Args:
+            chunk: Chunk of the file before it was normalized.
+            offset: Offset in the file of the start of the chunk.
+            indices: Ascending indices of bytes in the normalized chunk.
+
+        Returns:
+            Offsets of the bytes in the file.
+        """
+        offsets = []
+        removed = 0
+        runs = RekordboxValidator.WHITESPACE.finditer(chunk)
+        run = next(runs, None)
+        for index in indices:
+            # Skip past the runs of whitespace that precede the byte.
+            while run is not None and run.start() - removed < index:
+                removed += run.end() - run.start() - 1
+                run = next(runs, None)
+            offsets.append(offset + index + removed)
+
+        return offsets
+
+    @staticmethod
+    def _normalize(chunk: bytes) -> bytes:
+        """Normalizes each run of whitespace in a chunk to a single space.
+
+        Args:
+            chunk: Chunk of a file.
+
+        Returns:
+            Normalized chunk.
+        """
+        # Splitting and joining is much faster than substituting a regular
+        # expression but drops whitespace at the start and end of the chunk.
+        normalized = b" ".join(chunk.split())
+        if not normalized:
+            return b" " if chunk else b""
+        if chunk[:1].isspace():
+            normalized = b" " + normalized
+        if chunk[-1:].isspace():
+            normalized += b" "
+
+        return normalized
+
+    def _read(self, path: Path) -> Iterator[Tuple[bytes, bytes, int]]:
+        """Reads an XML in normalized chunks.
+
+        Chunks are cut before the last "<" they contain, or otherwise after
+        their last non-whitespace byte, so that neither runs of whitespace
+        nor tags are split between chunks.
+
+        Args:
+            path: Path to an XML file.
+
+        Yields:
+            Tuple of a normalized chunk, the chunk before it was normalized,
+                and the offset in the file of the start of the chunk.
+        """
+        offset = 0
+        carry = b""
+        with open(path, mode="rb") as _file:
+            while True:
+                data = _file.read(self.CHUNK_SIZE)
+                chunk = carry + data
+                if offset == 0 and (
+                    declaration := self.DECLARATION.match(chunk)
+                ):
+                    chunk = chunk[declaration.end() :]
+                    offset = declaration.end()
+                if not data:
+                    # Whitespace at the end of the file is ignored.
+                    chunk = chunk.rstrip()
+                    if chunk:
+                        yield self._normalize(chunk), chunk, offset
+                    return
+
+                cut = chunk.rfind(b"<")
+                if cut <= 0:
+                    cut = len(chunk.rstrip())
+                chunk, carry = chunk[:cut], chunk[cut:]
+                if chunk:
+                    yield self._normalize(chunk), chunk, offset
+                offset += len(chunk)
+
+    def find_divergence(
+        self, hashes: Optional[bool] = False
+    ) -> Optional[Tuple[int, int]]:
+        """Finds the first divergence between the normalized XML files.
+
+        Args:
+            hashes: Compare the content hashes of the NODE and TRACK elements
+                rather than the bytes of the files. Divergences are then
+                reported at the start of the element that differs.
+
+        Returns:
+            Offsets in the input and output XML files of the first divergence
+                or None if the files match.
+        """
+        if hashes:
+            for input_hash, output_hash in zip_longest(
+                self.get_hashes(self._input_xml),
+                self.get_hashes(self._output_xml),
+            ):
+                if input_hash is None or output_hash is None:
+                    return (
+                        self._input_xml.stat().st_size
+                        if input_hash is None
+                        else input_hash[0],
+                        self._output_xml.stat().st_size
+                        if output_hash is None
+                        else output_hash[0],
+                    )
+                if input_hash[1] != output_hash[1]:
+                    return input_hash[0], output_hash[0]
+
+            return None
+
+        streams = [self._read(self._input_xml), self._read(self._output_xml)]
+        chunks = [next(stream, None) for stream in streams]
+        indices = [0, 0]
+        while chunks[0] and chunks[1]:
+            length = min(
+                len(chunk[0]) - index for chunk, index in zip(chunks, indices)
+            )
+            compared = [
+                chunk[0][index : index + length]
+                for chunk, index in zip(chunks, indices)
+            ]
+            if compared[0] != compared[1]:
+                common = len(commonprefix(compared))
+                return tuple(
+                    self._get_offsets(chunk[1], chunk[2], [index + common])[0]
+                    for chunk, index in zip(chunks, indices)
+                )
+
+            # Advance past the compared bytes, reading the next chunk of any
+            # stream whose chunk has been exhausted.
+            for position, stream in enumerate(streams):
+                indices[position] += length
+                if indices[position] == len(chunks[position][0]):
+                    chunks[position] = next(stream, None)
+                    indices[position] = 0
+
+        if chunks[0] is None and chunks[1] is None:
+            return None
+
+        # One file ended before the other.
+        return tuple(
+            path.stat().st_size
+            if chunk is None
+            else self._get_offsets(chunk[1], chunk[2], [index])[0]
+            for path, chunk, index in zip(
+                [self._input_xml, self._output_xml], chunks, indices
+            )
+        )
+
+    @make_path
+    def get_hashes(self, path: Path) -> Iterator[Tuple[int, bytes]]:
+        """Hashes the normalized content of each NODE and TRACK element.
+
+        The content of an element is everything from its start tag up to the
+        start tag of the next NODE or TRACK element. Content before the first
+        of these elements is hashed as well.
+
+        Args:
+            path: Path to an XML file.
+
+        Yields:
+            Tuple of the offset in the file of an element and its hash.
+        """
+        offset = 0
+        content_hash = hashlib.blake2b(digest_size=16)
+        for normalized, chunk, chunk_offset in self._read(path):
+            # Normalizing whitespace doesn't change the start of elements so
+            # the elements are in the same order in both chunks.
+            position = 0
+            for start, element_offset in zip(
+                [match.start() for match in self.ELEMENT.finditer(normalized)],
+                [
+                    chunk_offset + match.start()
+                    for match in self.ELEMENT.finditer(chunk)
+                ],
+            ):
+                content_hash.update(normalized[position:start])
+                yield offset, content_hash.digest()
+                content_hash = hashlib.blake2b(digest_size=16)
+                offset = element_offset
+                position = start
+            content_hash.update(normalized[position:])
+
+        yield offset, content_hash.digest()
+
+    def validate(self, hashes: Optional[bool] = False):
+        """Validates that the normalized XML files match.
+
+        Args:
+            hashes: Compare the content hashes of the NODE and TRACK elements
+                rather than the bytes of the files.
+
+        Raises:
+            AssertionError: The normalized XML files must match.
+        """
+        divergence = self.find_divergence(hashes=hashes)
+        if divergence is None:
+            return
+
+        input_offset, output_offset = divergence
+        raise AssertionError(
+            "Failed RekordboxCollection validation! "
+            f"{self._describe(self._input_xml, input_offset)} differs from "
+            f"{self._describe(self._output_xml, output_offset)}"
+        )
@@ -4,6 +4,7 @@ sequential order after collecting the set of Tracks from the provided
 playlist(s).
 """
 
+# pylint: disable=duplicate-code
 import logging
 import os
 import random
@@ -31,7 +32,10 @@ def shuffle_playlists(config: BaseConfig, path: Optional[Path] = None):
     """
     # Load collection.
     collection = PLATFORM_REGISTRY[config.collection.platform]["collection"](
-        path=config.collection.collection_path
+        path=config.collection.collection_path,
+        streaming=config.collection.collection_streaming,
+        snapshot=config.collection.collection_snapshot,
+        workers=config.collection.collection_workers,
     )
 
     # Build a dict of tracks to shuffle from the provided list of playlists.
@@ -70,4 +74,6 @@ def shuffle_playlists(config: BaseConfig, path: Optional[Path] = None):
             tracks={track.get_id(): track for track in shuffled_tracks},
         )
     )
-    _ = collection.serialize(path=path)
+    _ = collection.serialize(
+        path=path, splice=config.collection.collection_splice
+    )
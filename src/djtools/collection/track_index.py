@@ -0,0 +1,189 @@
+"""This module contains the class for the TrackIndex.
+
+TrackIndex is a set of inverted indexes which map the values of track
+attributes, such as tags, artists, comments, and locations, to the tracks
+having those values. Looking tracks up by the value of an attribute is then a
+dict access rather than a scan over every track in a collection.
+
+Values of the case-insensitive attributes are indexed in lower case. Tracks
+are kept in the order of the collection under every value so that the tracks
+returned by the index are in the same order as those found by a scan. Values
+matching wildcard patterns are found with a WildcardIndex of the distinct
+values of an attribute, as strings, which is dropped when a track is moved to
+another location.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, ClassVar, Dict, List, Set, Tuple
+
+from djtools.collection.base_track import Track
+from djtools.collection.track_set import TrackOrdinals
+from djtools.collection.wildcard_index import WildcardIndex
+
+
+class TrackIndex:
+    "Inverted indexes of the values of track attributes."
+
+    # Track getters for the indexed attributes.
+    ATTRIBUTES: ClassVar[Dict[str, str]] = {
+        "artist": "get_artists",
+        "comment": "get_comments",
+        "genre": "get_genre_tags",
+        "key": "get_key",
+        "label": "get_label",
+        "location": "get_location",
+        "tag": "get_tags",
+    }
+
+    # Attributes whose values are indexed in lower case.
+    CASE_INSENSITIVE: ClassVar[Set[str]] = {
+        "artist",
+        "comment",
+        "key",
+        "label",
+    }
+
+    # Attributes whose getters return a list of values.
+    MULTI_VALUED: ClassVar[Set[str]] = {"genre", "tag"}
+
+    def __init__(self, tracks: Dict[str, Track]):
+        """Builds the indexes from tracks.
+
+        Args:
+            tracks: Tracks keyed by their IDs.
+        """
+        self._lock = threading.Lock()
+        self._ordinals = TrackOrdinals(tracks)
+        self._wildcards: Dict[str, Tuple[WildcardIndex, Dict[str, Any]]] = {}
+        self._indexes: Dict[str, Dict[Any, Dict[str, Track]]] = {
+            attribute: {} for attribute in self.ATTRIBUTES
+        }
+        for track_id, track in tracks.items():
+            for attribute, index in self._indexes.items():
+                for value in self._get_values(attribute, track):
+                    index.setdefault(value, {})[track_id] = track
+
+    def _get_values(self, attribute: str, track: Track) -> List[Any]:
+        """Gets the indexed values of a track's attribute.
+
+        Args:
+            attribute: Name of an indexed attribute.
+            track: Track to get the values of.
+
+        Returns:
+            Values under which the track is indexed.
+        """
+        try:
+            value = getattr(track, self.ATTRIBUTES[attribute])()
+        except AttributeError:
+            return []
+        if attribute in self.MULTI_VALUED:
+            return value
+        if not value:
+            return []
+        if attribute in self.CASE_INSENSITIVE:
+            return [value.lower()]
+
+        return [value]
+
+    def get_index(self, attribute: str) -> Dict[Any, Dict[str, Track]]:
+        """Gets the index of an attribute.
+
+        The index must not be modified; callers which need to add to it must
+        copy it first.
+
+        Args:
+            attribute: Name of an indexed attribute, such as "tag" or "label".
+
+        Returns:
+            Dict of values to dicts of the track IDs and tracks having them.
+        """
+        return self._indexes[attribute]
+
+    def get_ordinals(self) -> TrackOrdinals:
+        """Gets the ordinals of the indexed tracks.
+
+        Returns:
+            TrackOrdinals numbering the tracks in the order of the collection.
+        """
+        return self._ordinals
+
+    def get_tracks(self, attribute: str, value: Any) -> Dict[str, Track]:
+        """Gets the tracks having a value of an attribute.
+
+        Args:
+            attribute: Name of an indexed attribute.
+            value: Value of the attribute. Values of case-insensitive
+                attributes are matched regardless of case.
+
+        Returns:
+            Dict of track IDs to tracks in the order of the collection.
+        """
+        if attribute in self.CASE_INSENSITIVE:
+            value = value.lower()
+
+        return dict(self._indexes[attribute].get(value, {}))
+
+    def match(self, attribute: str, pattern: str) -> Dict[str, Track]:
+        """Gets the tracks having a value of an attribute matching a pattern.
+
+        A "*" in the pattern matches any sub-string. Values match if they
+        contain a match of the pattern or are equal to it.
+
+        Args:
+            attribute: Name of an indexed attribute. Values which aren't
+                strings, such as locations, are matched as strings.
+            pattern: Pattern which may contain "*".
+
+        Returns:
+            Dict of track IDs to tracks in the order of the collection.
+        """
+        if attribute in self.CASE_INSENSITIVE:
+            pattern = pattern.lower()
+        index = self._indexes[attribute]
+        with self._lock:
+            wildcards, keys = self._wildcards.get(attribute, (None, None))
+            if wildcards is None:
+                keys = {str(value): value for value in index}
+                wildcards = WildcardIndex(keys)
+                self._wildcards[attribute] = (wildcards, keys)
+        values = wildcards.search(pattern)
+        if pattern in keys and pattern not in values:
+            values = [
+                value for value in keys if value in values or value == pattern
+            ]
+        matches: List[Dict[str, Track]] = [
+            index[keys[value]] for value in values
+        ]
+        if len(matches) == 1:
+            return dict(matches[0])
+
+        tracks = {}
+        for match in matches:
+            tracks.update(match)
+
+        return {
+            track_id: tracks[track_id]
+            for track_id in sorted(tracks, key=self._ordinals.get_ordinal)
+        }
+
+    def set_location(self, track: Track, location: Path):
+        """Moves a track to a new location in the location index.
+
+        Tracks may be moved from multiple threads.
+
+        Args:
+            track: Track being moved, which is still at its old location.
+            location: New location of the track.
+        """
+        index = self._indexes["location"]
+        track_id = track.get_id()
+        with self._lock:
+            old_location = track.get_location()
+            tracks = index.get(old_location, {})
+            tracks.pop(track_id, None)
+            if not tracks:
+                index.pop(old_location, None)
+            index.setdefault(location, {})[track_id] = track
+            self._wildcards.pop("location", None)
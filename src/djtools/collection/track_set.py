@@ -0,0 +1,257 @@
+"""This module contains the classes for TrackOrdinals and TrackSet.
+
+TrackOrdinals numbers the tracks of a collection densely in the order of the
+collection. TrackSet is a set of those tracks stored as a bitset, a Python int
+whose bit at each ordinal is set if the track with that ordinal is a member,
+so that unions, intersections, differences, and counts of sets of tracks are
+word-parallel integer operations rather than loops over dicts.
+
+TrackSet is a read-only mapping of track IDs to tracks, like the dicts of
+tracks that playlists otherwise hold, whose tracks are materialized in the
+order of the collection only when it's iterated.
+"""
+
+import re
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from djtools.collection.base_track import Track
+
+# Positions of the set bits of each byte value.
+BYTE_BITS: List[Tuple[int, ...]] = [
+    tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)
+]
+
+# Runs of bytes with at least one set bit.
+NONZERO_BYTES = re.compile(rb"[^\x00]+")
+
+
+class TrackOrdinals:
+    "Dense ordinals of the tracks of a collection."
+
+    def __init__(self, tracks: Dict[str, Track]):
+        """Numbers tracks in the order of the collection.
+
+        Args:
+            tracks: Tracks keyed by their IDs.
+        """
+        self._ids = list(tracks)
+        self._ordinals = {track_id: row for row, track_id in enumerate(tracks)}
+        self._tracks = list(tracks.values())
+
+    def __len__(self) -> int:
+        """Returns the number of numbered tracks.
+
+        Returns:
+            Number of tracks.
+        """
+        return len(self._ids)
+
+    def get_bits(self, track_ids: Iterable[str]) -> int:
+        """Gets the bitset of tracks.
+
+        Args:
+            track_ids: IDs of tracks in the collection.
+
+        Returns:
+            Integer with the bits at the ordinals of the tracks set.
+        """
+        data = bytearray((len(self._ids) + 7) // 8)
+        for track_id in track_ids:
+            ordinal = self._ordinals[track_id]
+            data[ordinal >> 3] |= 1 << (ordinal & 7)
+
+        return int.from_bytes(data, "little")
+
+    def get_ordinal(self, track_id: str) -> int:
+        """Gets the ordinal of a track.
+
+        Args:
+            track_id: ID of a track in the collection.
+
+        Returns:
+            Position of the track in the collection.
+        """
+        return self._ordinals[track_id]
+
+    def get_track(self, ordinal: int) -> Tuple[str, Track]:
+        """Gets the track with an ordinal.
+
+        Args:
+            ordinal: Position of a track in the collection.
+
+        Returns:
+            Tuple of the track's ID and the track.
+        """
+        return self._ids[ordinal], self._tracks[ordinal]
+
+    @staticmethod
+    def iter_ordinals(bits: int) -> Iterator[int]:
+        """Iterates the set bits of a bitset in ascending order.
+
+        Args:
+            bits: Bitset of tracks.
+
+        Yields:
+            Ordinals of the tracks in the bitset.
+        """
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        # Runs of zero bytes are skipped by the regular expression engine.
+        for match in NONZERO_BYTES.finditer(data):
+            offset = match.start() << 3
+            for byte in match.group():
+                for bit in BYTE_BITS[byte]:
+                    yield offset + bit
+                offset += 8
+
+
+class TrackSet(Mapping):
+    "Bitset of tracks which is a read-only mapping of track IDs to tracks."
+
+    def __init__(self, ordinals: TrackOrdinals, bits: int = 0):
+        """Constructor.
+
+        Args:
+            ordinals: Ordinals of the tracks of the collection.
+            bits: Bitset of the tracks in the set.
+        """
+        self._ordinals = ordinals
+        self._bits = bits
+
+    def _get_bits(self, other: Union["TrackSet", Mapping]) -> int:
+        """Gets the bitset of another set of tracks.
+
+        Args:
+            other: TrackSet or mapping of track IDs to tracks.
+
+        Returns:
+            Bitset of the other tracks over this set's ordinals.
+        """
+        # pylint: disable=protected-access
+        if isinstance(other, TrackSet) and other._ordinals is self._ordinals:
+            return other._bits
+        if not other:
+            return 0
+
+        return self._ordinals.get_bits(other)
+
+    def __and__(self, other: Union["TrackSet", Mapping]) -> "TrackSet":
+        """Intersects this set with other tracks.
+
+        Args:
+            other: TrackSet or mapping of track IDs to tracks.
+
+        Returns:
+            TrackSet of the tracks in both.
+        """
+        return TrackSet(self._ordinals, self._bits & self._get_bits(other))
+
+    def __contains__(self, track_id: object) -> bool:
+        """Returns whether a track is in this set.
+
+        Args:
+            track_id: ID of a track.
+
+        Returns:
+            Whether or not the track is in this set.
+        """
+        try:
+            ordinal = self._ordinals.get_ordinal(track_id)
+        except (KeyError, TypeError):
+            return False
+
+        return bool(self._bits >> ordinal & 1)
+
+    def __getitem__(self, track_id: str) -> Track:
+        """Gets a track in this set.
+
+        Args:
+            track_id: ID of a track.
+
+        Raises:
+            KeyError: The track must be in this set.
+
+        Returns:
+            The track.
+        """
+        if track_id not in self:
+            raise KeyError(track_id)
+
+        _, track = self._ordinals.get_track(
+            self._ordinals.get_ordinal(track_id)
+        )
+
+        return track
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates the IDs of the tracks in this set.
+
+        Yields:
+            Track IDs in the order of the collection.
+        """
+        for ordinal in self._ordinals.iter_ordinals(self._bits):
+            yield self._ordinals.get_track(ordinal)[0]
+
+    def __len__(self) -> int:
+        """Returns the number of tracks in this set.
+
+        Returns:
+            Number of tracks.
+        """
+        return self._bits.bit_count()
+
+    def __or__(self, other: Union["TrackSet", Mapping]) -> "TrackSet":
+        """Unites this set with other tracks.
+
+        Args:
+            other: TrackSet or mapping of track IDs to tracks.
+
+        Returns:
+            TrackSet of the tracks in either.
+        """
+        return TrackSet(self._ordinals, self._bits | self._get_bits(other))
+
+    def __repr__(self) -> str:
+        """Produces a string representation of this set.
+
+        Returns:
+            TrackSet represented as a string.
+        """
+        return f"{type(self).__name__}(tracks={len(self)})"
+
+    def __sub__(self, other: Union["TrackSet", Mapping]) -> "TrackSet":
+        """Removes other tracks from this set.
+
+        Args:
+            other: TrackSet or mapping of track IDs to tracks.
+
+        Returns:
+            TrackSet of the tracks in this set but not the other.
+        """
+        return TrackSet(self._ordinals, self._bits & ~self._get_bits(other))
+
+    def get_bits(self) -> int:
+        """Gets the bitset of this set.
+
+        Returns:
+            Integer with the bits at the ordinals of the tracks set.
+        """
+        return self._bits
+
+    def items(self) -> Iterator[Tuple[str, Track]]:
+        """Iterates the tracks in this set.
+
+        Yields:
+            Tuples of track IDs and tracks in the order of the collection.
+        """
+        for ordinal in self._ordinals.iter_ordinals(self._bits):
+            yield self._ordinals.get_track(ordinal)
+
+    def values(self) -> Iterator[Track]:
+        """Iterates the tracks in this set.
+
+        Yields:
+            Tracks in the order of the collection.
+        """
+        for _, track in self.items():
+            yield track
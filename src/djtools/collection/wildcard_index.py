@@ -0,0 +1,177 @@
+"""This module contains the class for the WildcardIndex.
+
+WildcardIndex answers patterns containing "*", such as "*Techno", "Deep*", or
+"*House*", over a set of keys like the tags of a collection or the names of
+playlists without testing every key against the pattern. Keys are kept sorted,
+and sorted in reverse, so that the keys having a prefix or suffix are found by
+bisection, and the keys containing each trigram are kept in postings so that
+infixes narrow the candidates down to the keys containing all of their
+trigrams.
+
+Candidates are always confirmed with the same regular expression that a scan
+over the keys would use, so the index only changes which keys are tested.
+Patterns whose literal parts contain regular expression metacharacters are
+evaluated with a scan. Keys are returned in the order they were indexed and
+the keys matching each pattern are memoized.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Characters with a special meaning in regular expressions.
+METACHARACTERS = set(".^$*+?{}[]\\|()")
+
+
+class WildcardIndex:
+    "Index of keys answering prefix, suffix, and infix wildcard patterns."
+
+    def __init__(self, keys: Iterable[str]):
+        """Builds the index of keys.
+
+        Args:
+            keys: Keys in the order that matches are returned in.
+        """
+        self._keys = list(keys)
+        self._matches: Dict[Tuple[str, bool], List[str]] = {}
+        self._prefixes = sorted(
+            (key, position) for position, key in enumerate(self._keys)
+        )
+        self._suffixes = sorted(
+            (key[::-1], position) for position, key in enumerate(self._keys)
+        )
+        self._trigrams: Optional[Dict[str, Set[int]]] = None
+
+    @staticmethod
+    def _get_range(
+        sorted_keys: List[Tuple[str, int]], prefix: str
+    ) -> Set[int]:
+        """Gets the positions of the sorted keys starting with a prefix.
+
+        Args:
+            sorted_keys: Sorted tuples of keys and their positions.
+            prefix: Prefix of the keys.
+
+        Returns:
+            Positions of the keys.
+        """
+        positions = set()
+        start = bisect_left(sorted_keys, (prefix,))
+        for index in range(start, len(sorted_keys)):
+            key, position = sorted_keys[index]
+            if not key.startswith(prefix):
+                break
+            positions.add(position)
+
+        return positions
+
+    def _get_trigram_positions(self, infix: str) -> Set[int]:
+        """Gets the positions of the keys containing every trigram of an
+        infix.
+
+        The postings of the trigrams are built the first time they're needed.
+
+        Args:
+            infix: Infix at least three characters long.
+
+        Returns:
+            Positions of the keys.
+        """
+        if self._trigrams is None:
+            self._trigrams = {}
+            for position, key in enumerate(self._keys):
+                for index in range(len(key) - 2):
+                    self._trigrams.setdefault(
+                        key[index : index + 3], set()
+                    ).add(position)
+
+        postings = sorted(
+            (
+                self._trigrams.get(infix[index : index + 3], set())
+                for index in range(len(infix) - 2)
+            ),
+            key=len,
+        )
+
+        return postings[0].intersection(*postings[1:])
+
+    def _get_matches(self, pattern: str, anchored: bool) -> List[str]:
+        """Gets the keys matching a pattern.
+
+        Args:
+            pattern: Pattern which may contain "*".
+            anchored: Whether the pattern must match the whole key rather
+                than a sub-string of it.
+
+        Returns:
+            The matching keys in the order they were indexed.
+        """
+        parts = pattern.split("*")
+        exp = re.compile(r".*".join(parts) + ("$" if anchored else ""))
+        test = exp.match if anchored else exp.search
+        if any(METACHARACTERS.intersection(part) for part in parts):
+            return [key for key in self._keys if test(key)]
+
+        constraints = []
+        infixes = parts
+        if anchored:
+            infixes = parts[1:-1]
+            if parts[0]:
+                constraints.append(self._get_range(self._prefixes, parts[0]))
+            if len(parts) > 1 and parts[-1]:
+                constraints.append(
+                    self._get_range(self._suffixes, parts[-1][::-1])
+                )
+        constraints.extend(
+            self._get_trigram_positions(infix)
+            for infix in infixes
+            if len(infix) > 2
+        )
+        candidates = range(len(self._keys))
+        if constraints:
+            constraints.sort(key=len)
+            candidates = sorted(constraints[0].intersection(*constraints[1:]))
+
+        return [
+            self._keys[position]
+            for position in candidates
+            if test(self._keys[position])
+        ]
+
+    def match(self, pattern: str) -> List[str]:
+        """Gets the keys which a pattern matches in full.
+
+        Matches are memoized and must not be modified.
+
+        Args:
+            pattern: Pattern which may contain "*".
+
+        Returns:
+            The matching keys in the order they were indexed.
+        """
+        matches = self._matches.get((pattern, True))
+        if matches is None:
+            matches = self._matches[(pattern, True)] = self._get_matches(
+                pattern, True
+            )
+
+        return matches
+
+    def search(self, pattern: str) -> List[str]:
+        """Gets the keys containing a match of a pattern.
+
+        Matches are memoized and must not be modified.
+
+        Args:
+            pattern: Pattern which may contain "*".
+
+        Returns:
+            The matching keys in the order they were indexed.
+        """
+        matches = self._matches.get((pattern, False))
+        if matches is None:
+            matches = self._matches[(pattern, False)] = self._get_matches(
+                pattern, False
+            )
+
+        return matches
@@ -87,6 +87,14 @@ def get_arg_parser() -> ArgumentParser:
         action="store_true",
         help="Flag to trigger building collection playlists.",
     )
+    collection_parser.add_argument(
+        "--collection-playlists-cache",
+        action="store_true",
+        help=(
+            "Flag to reuse the combiner playlists of previous runs whose "
+            "tags, selectors, and referenced playlists haven't changed."
+        ),
+    )
     collection_parser.add_argument(
         "--collection-playlists-remainder",
         type=str,
@@ -98,6 +106,51 @@ def get_arg_parser() -> ArgumentParser:
             '(one for each tag) or an "Other" playlist based on this option.'
         ),
     )
+    collection_parser.add_argument(
+        "--collection-playlists-workers",
+        type=int,
+        default=None,
+        help=(
+            "Number of processes to build the top-level folders of the "
+            "playlist config in."
+        ),
+    )
+    collection_parser.add_argument(
+        "--collection-snapshot",
+        action="store_true",
+        help=(
+            "Flag to load the collection from a snapshot saved alongside it "
+            "when the collection hasn't changed since the last run."
+        ),
+    )
+    collection_parser.add_argument(
+        "--collection-splice",
+        action="store_true",
+        help=(
+            "Flag to write collections by splicing only the tracks and "
+            "playlists that changed into a copy of the original collection. "
+            "This requires the collection to be loaded by streaming or from a "
+            "snapshot."
+        ),
+    )
+    collection_parser.add_argument(
+        "--collection-streaming",
+        action="store_true",
+        help=(
+            "Flag to stream the collection through an incremental parser "
+            "rather than building a document from it. This is faster and uses "
+            "far less memory for large collections."
+        ),
+    )
+    collection_parser.add_argument(
+        "--collection-workers",
+        type=int,
+        default=None,
+        help=(
+            "Number of processes to parse the tracks of the collection in. "
+            "This implies streaming the collection."
+        ),
+    )
     collection_parser.add_argument(
         "--copy-playlists",
         type=str,
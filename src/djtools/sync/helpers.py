@@ -99,15 +99,25 @@ def rewrite_track_paths(config: BaseConfig, other_user_collection: Path):
     """
     music_path = Path("DJ Music")
     collection = PLATFORM_REGISTRY[config.collection.platform]["collection"](
-        path=other_user_collection
+        path=other_user_collection,
+        streaming=config.collection.collection_streaming,
+        snapshot=config.collection.collection_snapshot,
+        workers=config.collection.collection_workers,
     )
-    for track in collection.get_tracks().values():
-        loc = track.get_location().as_posix()
+    # Tracks are grouped by their location in the collection's location index
+    # so that each location is only rewritten once.
+    locations = collection.get_track_index().get_index("location")
+    for location, tracks in list(locations.items()):
+        loc = location.as_posix()
         common_path = (
             music_path / loc.split(str(music_path) + "/", maxsplit=-1)[-1]
         )
-        track.set_location(config.sync.usb_path / common_path)
-    collection.serialize(path=other_user_collection)
+        for track in list(tracks.values()):
+            collection.set_location(track, config.sync.usb_path / common_path)
+    collection.serialize(
+        path=other_user_collection,
+        splice=config.collection.collection_splice,
+    )
 
 
 def run_sync(_cmd: str, bucket_url: str) -> str:
@@ -312,18 +312,15 @@ def make_path(func: Callable) -> Callable:
         # kwargs.
         path_types = (pathlib.Path, typing.Union[pathlib.Path, None])
         num_args = 0
-        num_kwargs = 0
-        type_hints = list(typing.get_type_hints(func).values())
+        kwarg_type_hints = typing.get_type_hints(func)
+        type_hints = list(kwarg_type_hints.values())
         sig = inspect.signature(func)
         for parameter in sig.parameters.values():
-            if parameter.name == "self":
+            if parameter.name in ("cls", "self"):
                 type_hints.insert(0, "self")
-            if parameter.name in kwargs:
-                num_kwargs += 1
-            else:
+            if parameter.name not in kwargs:
                 num_args += 1
         arg_type_hints = type_hints[:num_args]
-        kwarg_type_hints = type_hints[:num_kwargs]
 
         # Convert each arg to a Path if the annotation type is pathlib.Path.
         # Use strict=False because we process only the args actually passed,
@@ -350,10 +347,10 @@ def make_path(func: Callable) -> Callable:
         args = tuple(args)
 
         # Convert each kwarg to a Path if the annotation type is pathlib.Path.
-        # Use strict=False because we process only the kwargs actually passed.
-        for (key, value), arg_type in zip(
-            kwargs.items(), kwarg_type_hints, strict=False
-        ):
+        # Kwargs are matched to their annotations by name since they may be
+        # passed in any order.
+        for key, value in kwargs.items():
+            arg_type = kwarg_type_hints.get(key)
             # Skip if the arg value shouldn't be a path or it should be a Path
             # but already is.
             if arg_type not in path_types or (